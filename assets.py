@@ -0,0 +1,171 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pyglet
+
+from stats import frame_stats
+
+
+class Asset:
+    '''
+    Handle to an asset that is decoded in the background.
+    `value` is None until the render loop has uploaded it; callbacks passed
+    to `then` run on the main thread once it is ready.
+    '''
+    def __init__(self, manager, key:tuple):
+        self.manager = manager
+        self.key = key
+        self.refs = 0
+        self.future = None
+        self.value = None
+        self.error: BaseException = None
+        self.ready = False
+        self.callbacks = []
+
+    @property
+    def path(self) -> str:
+        return self.key[1]
+
+    def then(self, callback):
+        '''
+        Call callback(value) once the asset is ready (now, if it already is)
+        '''
+        if self.ready:
+            callback(self.value)
+        else:
+            self.callbacks.append(callback)
+        return self
+
+    def release(self):
+        self.manager.release(self)
+
+    def _resolve(self, value):
+        self.value = value
+        self.ready = True
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback(value)
+
+
+def decode_texture(path:str):
+    return pyglet.image.load(path)
+
+
+def upload_texture(image) -> pyglet.image.Texture:
+    return image.get_texture()
+
+
+def decode_mesh(path:str):
+    from model.obj import load_obj_file
+    return [mesh.as_geometry() for mesh in load_obj_file(path)]
+
+
+class AssetManager:
+    """
+    Loads textures and meshes without blocking the render loop.
+    Files are decoded in a thread pool; the decoded data is turned into GL
+    objects by `upload`, which the render loop calls once per frame and which
+    stops after `upload_budget` seconds. Assets are cached by (kind, path) and
+    reference counted: every load is matched by one release, and the GL
+    object is deleted with the last one.
+    """
+    kinds = {
+        "texture": (decode_texture, upload_texture),
+        "mesh": (decode_mesh, None),
+    }
+
+    def __init__(self, workers:int = 4, upload_budget:float = 0.002):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.upload_budget = upload_budget
+        self.cache: dict[tuple, Asset] = {}
+        # filled from pool threads, drained on the main thread
+        self.decoded = deque()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, kind:str, path:str) -> Asset:
+        key = (kind, path)
+        asset = self.cache.get(key)
+        if asset is not None:
+            self.hits += 1
+            frame_stats.add('asset_cache_hits')
+        else:
+            self.misses += 1
+            frame_stats.add('asset_cache_misses')
+            asset = Asset(self, key)
+            self.cache[key] = asset
+            decode, _ = self.kinds[kind]
+            asset.future = self.pool.submit(decode, path)
+            asset.future.add_done_callback(lambda future: self.decoded.append(asset))
+        asset.refs += 1
+        return asset
+
+    def load_texture(self, path:str) -> Asset:
+        return self.load("texture", path)
+
+    def load_mesh(self, path:str) -> Asset:
+        '''
+        Asset whose value is a list of Geometry, one per mesh of the OBJ file
+        '''
+        return self.load("mesh", path)
+
+    def release(self, asset:Asset):
+        asset.refs -= 1
+        if asset.refs > 0:
+            return
+        del self.cache[asset.key]
+        if not asset.ready:
+            asset.future.cancel()
+        elif isinstance(asset.value, pyglet.image.Texture):
+            from object import CustomGroup
+            CustomGroup.forget_texture(asset.value.id)
+            asset.value.delete()
+        asset.value = None
+
+    @property
+    def pending(self) -> int:
+        return sum(not asset.ready for asset in self.cache.values())
+
+    def upload(self, budget:float = None) -> int:
+        '''
+        Finish decoded assets until the budget (seconds) is spent.
+        At least one asset is finished per call, so loading always progresses.
+        Returns the number of finished assets.
+        '''
+        budget = self.upload_budget if budget is None else budget
+        start = time.perf_counter()
+        count = 0
+        while self.decoded and (count == 0 or time.perf_counter() - start < budget):
+            asset = self.decoded.popleft()
+            if asset.refs <= 0 or asset.future.cancelled():
+                continue
+            upload_start = time.perf_counter()
+            try:
+                data = asset.future.result()
+                _, upload = self.kinds[asset.key[0]]
+                value = upload(data) if upload is not None else data
+            except Exception as error:
+                asset.error = error
+                print(f"failed to load {asset.path}: {error!r}")
+                value = None
+            elapsed = time.perf_counter() - upload_start
+            frame_stats.add('asset_uploads')
+            frame_stats.add('asset_upload_ms', elapsed * 1000)
+            asset._resolve(value)
+            count += 1
+        return count
+
+    def flush(self):
+        '''
+        Block until everything requested so far is decoded and uploaded,
+        e.g. behind a loading screen.
+        '''
+        while self.pending:
+            for asset in list(self.cache.values()):
+                if not asset.ready:
+                    asset.future.exception()
+            self.upload(budget=float("inf"))
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,71 @@
+'''
+Bullet collision scaling: CollisionWorld.step on 100 to 100k projectiles at
+constant density (the volume grows with the count), against a field of
+robot-sized boxes, with the spatial hash and with all-pairs testing.
+Run from the repository root: python3 -m benchmark.collision
+'''
+import pyglet
+pyglet.options['shadow_window'] = False
+
+import argparse
+import time
+
+import numpy as np
+from pyglet.math import Vec3
+
+from collision import CollisionWorld
+from geometry import Cube
+from object import Object3D
+from projectile import ProjectilePool
+
+
+def make_scene(count:int, boxes:int, rng:np.random.Generator, density:float = 2.0):
+    '''
+    count projectiles and boxes unit cubes spread over a cube holding `density` projectiles per unit^3
+    '''
+    side = (count / density) ** (1 / 3)
+    pool = ProjectilePool(0.12, (0, -9.8, 0), 0.01, capacity=count)
+    for _ in range(count):
+        pool.acquire(rng.uniform(0, side, 3), rng.normal(0, 5, 3))
+    objects = []
+    for _ in range(boxes):
+        box = Object3D(Cube())
+        box.set_position(Vec3(*rng.uniform(0, side, 3)))
+        objects.append(box)
+    Object3D.store.update()
+    return pool, objects
+
+
+def time_steps(world:CollisionWorld, pool:ProjectilePool, steps:int) -> float:
+    start = time.perf_counter()
+    for _ in range(steps):
+        world.step(pool, Object3D.store)
+    return (time.perf_counter() - start) / steps
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projectiles", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--boxes", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--brute-force-max", type=int, default=3000, help="largest count also timed with all pairs")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    previous = None
+    for count in args.projectiles:
+        pool, objects = make_scene(count, args.boxes, rng)
+        world = CollisionWorld(cell_size=2 * pool.r, brute_force=0)
+        world.add_colliders(objects)
+        per_step = time_steps(world, pool, args.steps)
+        line = f"{count:7d} projectiles: hashed {per_step * 1000:8.2f} ms/step ({per_step / count * 1e6:5.2f} us/projectile)"
+        if previous is not None:
+            line += f", x{per_step / previous[1]:5.1f} time for x{count / previous[0]:.0f} projectiles"
+        if count <= args.brute_force_max:
+            brute = CollisionWorld(cell_size=2 * pool.r, brute_force=np.iinfo(np.int64).max)
+            brute.add_colliders(objects)
+            line += f", all pairs {time_steps(brute, pool, args.steps) * 1000:8.2f} ms/step"
+        print(line)
+        previous = (count, per_step)
+        for box in objects:
+            box.delete()
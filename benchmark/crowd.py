@@ -0,0 +1,31 @@
+'''
+Fixed-update cost of the batched crowd gait.
+Run from the repository root: python3 -m benchmark.crowd
+'''
+import argparse
+import time
+
+import numpy as np
+
+from crowd import Crowd
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--robots", type=int, nargs="+", default=[1, 50, 500, 2000])
+    parser.add_argument("--steps", type=int, default=1200)
+    parser.add_argument("--dt", type=float, default=1/120)
+    args = parser.parse_args()
+
+    for count in args.robots:
+        rng = np.random.default_rng(0)
+        crowd = Crowd(count)
+        area = np.sqrt(count) * 2
+        start = time.perf_counter()
+        for step in range(args.steps):
+            if step % 240 == 0:
+                crowd.wander(rng, area)
+            crowd.fixed_update(args.dt)
+        elapsed = time.perf_counter() - start
+        per_step = elapsed / args.steps
+        print(f"{count:6d} robots: {per_step * 1000:7.3f} ms/step "
+              f"({'real-time' if per_step <= args.dt else 'slower than real-time'} at {1 / args.dt:.0f} Hz)")
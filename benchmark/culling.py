@@ -0,0 +1,40 @@
+'''
+Frustum culling cost: oriented-box test of n objects against the default
+camera, with the perspective and the orthographic projection.
+Run from the repository root: python3 -m benchmark.culling
+'''
+import pyglet
+pyglet.options['shadow_window'] = False
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmark.lod import default_camera
+from crowd import rotation_matrices
+from culling import FrustumCuller
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--frames", type=int, default=50)
+    args = parser.parse_args()
+
+    projections, view = default_camera(1280, 720)
+    rng = np.random.default_rng(0)
+    for name, proj in projections.items():
+        culler = FrustumCuller()
+        culler.set_camera(proj @ view)
+        for count in args.objects:
+            world = rotation_matrices(rng.uniform(0, 2 * np.pi, count), (0, 1, 0))
+            world[:, 3, :3] = rng.uniform(-40, 40, (count, 3))
+            centers = np.zeros((count, 3))
+            extents = np.full((count, 3), 0.5)
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                visible = culler.box_mask(world, centers, extents)
+            per_frame = (time.perf_counter() - start) / args.frames
+            print(f"{name:>12} {count:7d} objects: {per_frame * 1000:7.3f} ms/frame, "
+                  f"{np.count_nonzero(visible)} drawn, {count - np.count_nonzero(visible)} culled")
@@ -0,0 +1,41 @@
+'''
+Geometry generation time for high segment counts, and the cost of a
+repeat request through the geometry cache.
+Run from the repository root: python3 -m benchmark.geometry
+'''
+import argparse
+import time
+
+from geometry import Sphere, Plane, Cylinder, Cube, Rod, GeometryCache
+
+CASES = [
+    ("Sphere 1024x512", Sphere, (1, 1024, 512)),
+    ("Plane 1000x1000", Plane, (1, 1, 1000, 1000)),
+    ("Cylinder 1024x256", Cylinder, (1, 1, 1, 1024, 256)),
+    ("Cube", Cube, ()),
+    ("Rod", Rod, (0.7, 0.3, 0.4)),
+]
+
+
+def best_of(repeat:int, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cache = GeometryCache()
+    for name, cls, params in CASES:
+        generate = best_of(args.repeat, cls, *params)
+        geometry = cache.get(cls, *params)
+        hit = best_of(1000, cache.get, cls, *params)
+        vertices = geometry.vertices.size // 3
+        print(f"{name:>18}: {vertices:8d} vertices, generate {generate * 1000:9.3f} ms, "
+              f"cached {hit * 1e6:6.2f} us")
@@ -0,0 +1,29 @@
+'''
+Bytes of vertex and index data uploaded per geometry: unindexed float32
+(how Plane and Cube were uploaded before), float32 with uint32 indices
+(how Sphere and Cylinder were), and the current upload formats.
+Run from the repository root: python3 -m benchmark.geometry_bytes
+'''
+from geometry import Sphere, Plane, Cylinder, Cube, Rod
+
+CASES = [
+    ("floor Plane(50, 50, 10, 10)", Plane(50, 50, 10, 10)),
+    ("Plane(1, 1, 1000, 1000)", Plane(1, 1, 1000, 1000)),
+    ("Cube()", Cube()),
+    ("leg Rod(0.7, 0.3, 0.4)", Rod(0.7, 0.3, 0.4)),
+    ("bullet Sphere(0.12)", Sphere(radius=0.12)),
+    ("barrel Cylinder", Cylinder(radiusTop=0.15, radiusBottom=0.12, height=1.0)),
+]
+
+# vertices, normals and uvs as float32
+FLOAT_VERTEX = (3 + 3 + 2) * 4
+
+if __name__ == '__main__':
+    print(f"{'':>28}  {'unindexed f32':>14}  {'f32 + u32 idx':>14}  {'now':>12}")
+    for name, geometry in CASES:
+        count = len(geometry.vertices) // 3
+        index_count = len(geometry.indices)
+        unindexed = index_count * FLOAT_VERTEX
+        indexed = count * FLOAT_VERTEX + index_count * 4
+        now = geometry.upload_size()
+        print(f"{name:>28}  {unindexed:14d}  {indexed:14d}  {now:12d}  ({now / unindexed:.1%} of unindexed)")
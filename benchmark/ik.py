@@ -0,0 +1,53 @@
+'''
+Scalar IK2Link.set_target versus IK2Link.solve_batch (tests/test_ik.py checks
+that they agree).
+Run from the repository root: python3 -m benchmark.ik
+'''
+import argparse
+import time
+
+import numpy as np
+
+from ulility import IK2Link
+
+
+def random_targets(rng:np.random.Generator, n:int, l1:np.ndarray, l2:np.ndarray):
+    '''
+    Targets covering the reachable, unreachable, too-close and folded branches,
+    with 10% of them just inside or outside a branch boundary (or at r = 0).
+    '''
+    reach = l1 + l2
+    r = rng.uniform(0, 1.5, n) * reach
+    edge = rng.random(n) < 0.1
+    boundary = np.stack([reach, np.abs(l1 - l2), np.zeros(n)])[rng.integers(0, 3, n), np.arange(n)]
+    boundary += np.where(boundary > 0, rng.choice([-1e-9, 1e-9], n), 0)
+    r[edge] = boundary[edge]
+    phi = rng.uniform(-np.pi, np.pi, n)
+    return r * np.cos(phi), r * np.sin(phi)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--legs", type=int, nargs="+", default=[4, 400, 40000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    l1, l2 = 0.7, 1.3
+    for n in args.legs:
+        x, y = random_targets(rng, n, np.full(n, l1), np.full(n, l2))
+        ik = IK2Link(l1, l2)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for i in range(n):
+                ik.set_target(x[i], y[i])
+        scalar = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            IK2Link.solve_batch(x, y, l1, l2)
+        batch = (time.perf_counter() - start) / args.repeat
+
+        print(f"{n:6d} legs: scalar {n / scalar:12.0f} legs/s, batch {n / batch:12.0f} legs/s "
+              f"({scalar / batch:.1f}x)")
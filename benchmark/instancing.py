@@ -0,0 +1,103 @@
+'''
+InstancedMesh on Mesa's software rasterizer (llvmpipe): creates the mesh in a
+hidden window, uploads n sphere instances, draws one frame and checks that
+the instances were drawn (and counts the GL calls of that frame), then
+times upload + draw per frame.
+LIBGL_ALWAYS_SOFTWARE=1 is set unless given; without an X display pyglet's
+headless (EGL) context is used.
+Run from the repository root: python3 -m benchmark.instancing
+'''
+import os
+os.environ.setdefault('LIBGL_ALWAYS_SOFTWARE', '1')
+
+import pyglet
+pyglet.options['shadow_window'] = False
+if 'DISPLAY' not in os.environ:
+    pyglet.options['headless'] = True
+
+import argparse
+import time
+
+import numpy as np
+from pyglet.gl import *
+from pyglet.gl import gl_info
+from pyglet.math import Mat4, Vec3
+
+import shader.shader as shader
+from geometry import Sphere
+from instancing import InstancedMesh
+from stats import frame_stats, count_gl_calls
+
+
+def grid(n:int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    (offsets, scales, colors) of n instances covering clip space
+    '''
+    side = int(np.ceil(np.sqrt(n)))
+    cells = np.arange(n)
+    offsets = np.zeros((n, 3))
+    offsets[:, 0] = (cells % side + 0.5) / side * 2 - 1
+    offsets[:, 1] = (cells // side + 0.5) / side * 2 - 1
+    scales = np.full(n, 0.8 / side)
+    colors = np.tile([1.0, 0.5, 0.25, 1.0], (n, 1))
+    return offsets, scales, colors
+
+
+def drawn_pixels(width:int, height:int) -> int:
+    '''
+    Pixels of the framebuffer that are not the black clear color
+    '''
+    pixels = (GLubyte * (width * height * 4))()
+    glReadPixels(0, 0, width, height, GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+    rgb = np.frombuffer(pixels, dtype=np.uint8).reshape(-1, 4)[:, :3]
+    return int(np.count_nonzero(rgb.any(axis=1)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instances", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--size", type=int, default=256, help="window width and height")
+    args = parser.parse_args()
+
+    try:
+        window = pyglet.window.Window(args.size, args.size, visible=False)
+    except Exception as error:
+        raise SystemExit(f"no OpenGL context: {error}")
+    print(f"renderer: {gl_info.get_renderer()}")
+    count_gl_calls()
+
+    width, height = window.get_framebuffer_size()
+    glViewport(0, 0, width, height)
+    glEnable(GL_DEPTH_TEST)
+    glClearColor(0, 0, 0, 1)
+    mesh = InstancedMesh(Sphere(radius=1.0, widthSegments=16, heightSegments=8), source=None)
+    mesh.create()
+    # instances are placed in clip space directly
+    shader.set_uniform(mesh.shader_program, 'view_proj', Mat4())
+    shader.set_uniform(mesh.shader_program, 'dir_light', Vec3(0, 0, -1))
+    shader.set_uniform(mesh.shader_program, 'dot_light', Vec3(0, 0, -10))
+    shader.set_uniform(mesh.shader_program, 'cam_eye', Vec3(0, 0, -10))
+
+    for n in args.instances:
+        offsets, scales, colors = grid(n)
+        frame_stats.end_frame()
+        window.clear()
+        mesh.upload(offsets, scales, colors)
+        mesh.draw()
+        glFinish()
+        frame_stats.end_frame()
+        pixels = drawn_pixels(width, height)
+        if mesh.count != n or pixels == 0:
+            raise SystemExit(f"{n} instances: nothing was drawn")
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            window.clear()
+            mesh.upload(offsets, scales, colors)
+            mesh.draw()
+            glFinish()
+        elapsed = (time.perf_counter() - start) / max(args.frames, 1)
+        print(f"{n:6d} instances: {pixels:6d} pixels drawn, {frame_stats.get('gl_calls')} GL calls, "
+              f"{elapsed * 1000:7.2f} ms per frame (upload + draw)")
+    mesh.delete()
+    window.close()
@@ -0,0 +1,58 @@
+'''
+LOD selection for bullets under RenderWindow's default camera: cost of
+picking levels for every instance, and triangles drawn with and without LOD.
+Run from the repository root: python3 -m benchmark.lod
+'''
+import pyglet
+pyglet.options['shadow_window'] = False
+
+import argparse
+import time
+
+import numpy as np
+from pyglet.math import Mat4, Vec3
+
+from geometry import Sphere
+from lod import LODGeometry, LODSystem, SPHERE_LEVELS
+from robot import RigidSphere
+
+
+def default_camera(width:int, height:int):
+    '''
+    view_proj and proj of RenderWindow.calc_matrices (orthographic) and of its perspective variant
+    '''
+    view = Mat4.look_at(Vec3(20, 13, 20), target=Vec3(0, 0, 0), up=Vec3(0, 1, 0))
+    aspect = width / height
+    H = 12; W = H * aspect
+    ortho = Mat4.orthogonal_projection(-W/2, W/2, -H/2, H/2, z_near=0.1, z_far=100)
+    perspective = Mat4.perspective_projection(aspect=aspect, z_near=0.1, z_far=100, fov=60)
+    return {"orthographic": ortho, "perspective": perspective}, view
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bullets", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    lod = LODGeometry(Sphere, SPHERE_LEVELS, radius=RigidSphere.r)
+    triangles = np.array([len(geometry.indices) // 3 for geometry in lod.geometries])
+    projections, view = default_camera(args.height * 16 // 9, args.height)
+    rng = np.random.default_rng(0)
+    for name, proj in projections.items():
+        system = LODSystem()
+        system.set_camera(proj @ view, proj, args.height)
+        for count in args.bullets:
+            offsets = rng.uniform(-10, 10, (count, 3))
+            scales = rng.uniform(0, 1, count)
+            levels = np.zeros(count, dtype=np.int64)
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                radius = system.screen_radius(offsets, lod.radius * scales)
+                levels = lod.select(radius, levels, system.hysteresis)
+            per_frame = (time.perf_counter() - start) / args.frames
+            drawn = triangles[levels].sum()
+            print(f"{name:>12} {count:6d} bullets: select {per_frame * 1000:6.3f} ms/frame, "
+                  f"{drawn:8d} triangles ({triangles[0] * count} without LOD), "
+                  f"levels {np.bincount(levels, minlength=len(lod)).tolist()}")
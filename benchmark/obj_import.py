@@ -0,0 +1,47 @@
+'''
+Bulk OBJ import (import_obj_files) with 1..N worker processes against
+parsing the same files one by one on the main thread, on a directory of
+generated grid meshes. The cache is disabled so every run parses.
+Run from the repository root: python3 -m benchmark.obj_import
+'''
+import pyglet
+pyglet.options['shadow_window'] = False
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmark.obj_load import write_grid_obj
+from model.obj import parse_obj_file, import_obj_files
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=32)
+    parser.add_argument("--side", type=int, default=150, help="grid side; 2 * side^2 triangles per file")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="default: 1, 2, 4, ... up to the CPU count")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus} | {cpus})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filenames = [os.path.join(tmp, f"mesh{i}.obj") for i in range(args.files)]
+        for filename in filenames:
+            write_grid_obj(filename, args.side)
+        size_mb = sum(os.path.getsize(filename) for filename in filenames) / (1 << 20)
+        print(f"{args.files} files, {size_mb:.0f} MB, {cpus} CPUs")
+
+        start = time.perf_counter()
+        for filename in filenames:
+            parse_obj_file(filename)
+        serial = time.perf_counter() - start
+        print(f"main thread: {serial:6.2f}s ({args.files / serial:6.1f} files/s)")
+
+        for count in workers:
+            start = time.perf_counter()
+            for filename, mesh_list in import_obj_files(filenames, count, cache=False):
+                pass
+            elapsed = time.perf_counter() - start
+            print(f"{count:3d} workers: {elapsed:6.2f}s ({args.files / elapsed:6.1f} files/s, {serial / elapsed:4.2f}x)")
@@ -0,0 +1,78 @@
+'''
+OBJ loading: vectorized parse, first load (parse and write the binary cache)
+and repeat load (memory-mapped cache), on the bundled models and on a
+synthetic grid of quads with v/vt/vn corners.
+Run from the repository root: python3 -m benchmark.obj_load
+'''
+import pyglet
+pyglet.options['shadow_window'] = False
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from model.obj import parse_obj_file, load_obj_file
+
+
+def write_grid_obj(path:str, side:int, objects:int = 1, rows_per_chunk:int = 256):
+    '''
+    `objects` side x side grids of quads (2 * side^2 triangles each), written in row chunks.
+    '''
+    with open(path, 'w') as f:
+        f.write(f'# synthetic grid {side}x{side}, {objects} objects\n')
+        for k in range(objects):
+            base = k * (side + 1) ** 2
+            f.write(f'o grid{k}\n')
+            for start in range(0, side + 1, rows_per_chunk):
+                rows = np.arange(start, min(start + rows_per_chunk, side + 1))
+                y, x = np.meshgrid(rows, np.arange(side + 1), indexing='ij')
+                xyz = np.stack([x + k * side, np.sin(x * 0.1) * np.cos(y * 0.1), y], axis=-1).reshape(-1, 3) / side
+                f.write(('v %.6f %.6f %.6f\n' * len(xyz)) % tuple(xyz.ravel()))
+                f.write(('vt %.6f %.6f\n' * len(xyz)) % tuple(xyz[:, [0, 2]].ravel()))
+                f.write(('vn 0 1 0\n' * len(xyz)))
+            for start in range(0, side, rows_per_chunk):
+                rows = np.arange(start, min(start + rows_per_chunk, side))
+                y, x = np.meshgrid(rows, np.arange(side), indexing='ij')
+                a = (y * (side + 1) + x + 1 + base).ravel()
+                quad = np.stack([a, a + side + 1, a + side + 2, a + 1], axis=1)
+                corners = np.repeat(quad, 3, axis=1).ravel()
+                f.write(('f %d/%d/%d %d/%d/%d %d/%d/%d %d/%d/%d\n' * len(quad)) % tuple(corners))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def report(path:str):
+    cache = path + '.meshcache'
+    if os.path.exists(cache):
+        os.remove(cache)
+    meshes, parse = timed(parse_obj_file, path)
+    _, first = timed(load_obj_file, path)
+    _, repeat = timed(load_obj_file, path)
+    triangles = sum(len(mesh.indices) // 3 for mesh in meshes)
+    print(f"{os.path.basename(path):>16}: {triangles:9d} triangles, parse {parse * 1000:8.1f} ms "
+          f"({triangles / parse / 1e6:5.2f} M tri/s), first load {first * 1000:8.1f} ms, "
+          f"cached {repeat * 1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grid", type=int, nargs="+", default=[100, 707], help="grid side; 707 is about 1M triangles")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("bunny.obj", "monkey.obj"):
+            path = os.path.join(tmp, name)
+            with open(os.path.join("model", name), 'rb') as src, open(path, 'wb') as dst:
+                dst.write(src.read())
+            report(path)
+        for side in args.grid:
+            path = os.path.join(tmp, f"grid{side}.obj")
+            write_grid_obj(path, side)
+            report(path)
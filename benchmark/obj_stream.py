@@ -0,0 +1,77 @@
+'''
+Streaming OBJ parse (iter_obj_file) on a large synthetic file: throughput
+and peak resident memory. The file is generated and each parse is run in
+a fresh process, so a parse's peak RSS (getrusage, Unix only) is not mixed
+with the others. Pages of the memory-mapped output buffers count as
+resident while they are read.
+--compare also runs the whole-file parse_obj_file, which needs several
+times the file size in memory.
+Run from the repository root: python3 -m benchmark.obj_stream --size-mb 2048
+'''
+import pyglet
+pyglet.options['shadow_window'] = False
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from benchmark.obj_load import write_grid_obj
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / (1 << 10)
+
+
+def parse(mode:str, path:str, directory:str, chunk_mb:int, results):
+    from model.obj import parse_obj_file, iter_obj_file
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    meshes = triangles = 0
+    if mode == 'stream':
+        for mesh in iter_obj_file(path, directory, chunk_mb << 20):
+            meshes += 1
+            triangles += len(mesh.indices) // 3
+    else:
+        for mesh in parse_obj_file(path):
+            meshes += 1
+            triangles += len(mesh.indices) // 3
+    results.put((mode, time.perf_counter() - start, meshes, triangles, baseline, peak_rss_mb()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=2048, help="approximate size of the generated OBJ")
+    parser.add_argument("--objects", type=int, default=8)
+    parser.add_argument("--chunk-mb", type=int, default=64)
+    parser.add_argument("--compare", action="store_true", help="also run the in-memory parser")
+    parser.add_argument("--dir", default=None, help="where to put the OBJ and the parsed buffers")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        path = os.path.join(tmp, "synthetic.obj")
+        # about 150 bytes of v/vt/vn/f records per grid cell
+        side = int(((args.size_mb << 20) / args.objects / 150) ** 0.5)
+        context = multiprocessing.get_context('spawn')
+        start = time.perf_counter()
+        process = context.Process(target=write_grid_obj, args=(path, side, args.objects))
+        process.start()
+        process.join()
+        size_mb = os.path.getsize(path) / (1 << 20)
+        print(f"generated {size_mb:.0f} MB ({args.objects} objects of {side}x{side} quads) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        results = context.Queue()
+        for mode in ['stream'] + (['memory'] if args.compare else []):
+            process = context.Process(target=parse, args=(mode, path, os.path.join(tmp, mode), args.chunk_mb, results))
+            process.start()
+            mode, elapsed, meshes, triangles, baseline, peak = results.get()
+            process.join()
+            print(f"{mode:>6}: {meshes} meshes, {triangles} triangles in {elapsed:.1f}s "
+                  f"({size_mb / elapsed:.1f} MB/s), peak RSS {peak:.0f} MB ({peak - baseline:.0f} MB above start)")
@@ -0,0 +1,45 @@
+'''
+Projectile pool under sustained fire: n bullets per tick living 3 s, with a
+growing pool and with a fixed pool that recycles its oldest bullets.
+Run from the repository root: python3 -m benchmark.pool
+'''
+import pyglet
+pyglet.options['shadow_window'] = False
+
+import argparse
+import time
+
+import numpy as np
+
+from projectile import ProjectilePool
+
+
+def fire(pool:ProjectilePool, per_tick:int, ticks:int, dt:float = 1/120, duration:float = 3.0) -> tuple[float, float]:
+    '''
+    Mean and worst tick time in ms
+    '''
+    times = []
+    for tick in range(ticks):
+        start = time.perf_counter()
+        for _ in range(per_tick):
+            pool.acquire((0, 1, 0), (50, 5, 0), duration=duration)
+        for slot in pool.step(dt):
+            pool.release(slot)
+        times.append(time.perf_counter() - start)
+    return np.mean(times) * 1000, np.max(times) * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--per-tick", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--capacity", type=int, default=256)
+    parser.add_argument("--ticks", type=int, default=600)
+    args = parser.parse_args()
+
+    for per_tick in args.per_tick:
+        for recycle in (False, True):
+            pool = ProjectilePool(0.12, (0, -9.8, 0), 0.01, capacity=args.capacity, recycle=recycle)
+            mean, worst = fire(pool, per_tick, args.ticks)
+            print(f"{per_tick:3d}/tick {'recycle' if recycle else 'grow   '}: {mean:6.3f} ms/tick (worst {worst:6.3f}), "
+                  f"capacity {pool.capacity:6d}, utilization {pool.utilization:4.0%}, "
+                  f"allocations avoided {pool.reused}/{pool.acquired}, recycled {pool.recycled}")
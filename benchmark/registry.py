@@ -0,0 +1,98 @@
+'''
+Scene bookkeeping under churn: 10k objects spawned and expired per second at
+60 frames per second. Each frame creates the new objects, deletes the expired
+ones and runs the removal pass of RenderWindow.update and the culler, once
+with lists (list.remove while iterating, as before) and once with ObjectRegistry.
+Run from the repository root: python3 -m benchmark.registry
+'''
+import pyglet
+pyglet.options['shadow_window'] = False
+
+import argparse
+import time
+from collections import deque
+
+import numpy as np
+
+from geometry import Cube
+from geometry.cache import get_geometry
+from object import Object3D
+from registry import ObjectRegistry
+
+
+class ListScene:
+    def __init__(self):
+        self.objects = []
+        self.culled = []
+
+    def add(self, object):
+        self.objects.append(object)
+        self.culled.append(object)
+
+    def update(self):
+        for object in self.objects:
+            if object.deleted:
+                self.objects.remove(object)
+                self.culled.remove(object)
+
+
+class RegistryScene:
+    def __init__(self):
+        self.objects = ObjectRegistry()
+        self.culled = ObjectRegistry()
+
+    def add(self, object):
+        self.objects.add(object)
+        self.culled.add(object)
+
+    def update(self):
+        for object in self.objects:
+            if object.deleted:
+                self.objects.remove(self.objects.handle(object))
+                self.culled.remove(self.culled.handle(object))
+        self.objects.flush()
+        self.culled.flush()
+
+
+def run(scene, rate:int, lifetime:float, seconds:float, fps:int = 60) -> tuple[np.ndarray, int]:
+    '''
+    Frame times in ms and the objects left in the scene at the end
+    '''
+    geometry = get_geometry(Cube)
+    per_frame = rate // fps
+    alive = deque()
+    times = []
+    for frame in range(int(seconds * fps)):
+        start = time.perf_counter()
+        for _ in range(per_frame):
+            object = Object3D(geometry)
+            scene.add(object)
+            alive.append((frame + lifetime * fps, object))
+        while alive and alive[0][0] <= frame:
+            alive.popleft()[1].delete()
+        scene.update()
+        times.append(time.perf_counter() - start)
+    left = len(scene.objects)
+    for _, object in alive:
+        object.delete()
+    scene.update()
+    return np.array(times) * 1000, left
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=int, default=10000, help="objects spawned (and expired) per second")
+    parser.add_argument("--lifetime", type=float, nargs="+", default=[0.5, 2.0])
+    parser.add_argument("--seconds", type=float, default=4.0)
+    args = parser.parse_args()
+    if int(args.seconds * 60) <= int(max(args.lifetime) * 60):
+        # the first lifetime is warm-up, nothing would be left to measure
+        parser.error("--seconds must be longer than the longest --lifetime")
+
+    for lifetime in args.lifetime:
+        for name, scene in (("lists   ", ListScene()), ("registry", RegistryScene())):
+            times, left = run(scene, args.rate, lifetime, args.seconds)
+            # skip the first lifetime, while the scene is still filling up
+            steady = times[int(lifetime * 60):]
+            print(f"lifetime {lifetime:3.1f}s, {left:6d} live, {name}: frame {steady.mean():7.2f} ms mean, "
+                  f"{np.percentile(steady, 99):7.2f} ms p99, {steady.max():7.2f} ms max")
@@ -0,0 +1,60 @@
+'''
+Trail recording cost per tick for n bullets: the former per-bullet Python list
+(extend, slice, then re-upload the whole line) against TrailBuffer.push (one
+vectorized write, then upload of the newest row only), for several history lengths.
+Run from the repository root: python3 -m benchmark.trails
+'''
+import pyglet
+pyglet.options['shadow_window'] = False
+
+import argparse
+import time
+
+import numpy as np
+
+from trail import TrailBuffer
+
+
+def list_trails(positions:np.ndarray, ticks:int, history:int) -> tuple[float, int]:
+    trails = [list(p) for p in positions[0]]
+    uploaded = 0
+    start = time.perf_counter()
+    for tick in range(ticks):
+        for trail, x in zip(trails, positions[tick % len(positions)]):
+            trail.extend(x)
+            if len(trail) > 3 * history:
+                trail[:] = trail[3:]
+            # ObjectLine.update: resize and upload the whole strip
+            data = np.asarray(trail, dtype=np.float32)
+            uploaded += data.nbytes
+    return (time.perf_counter() - start) / ticks, uploaded // ticks
+
+
+def buffer_trails(positions:np.ndarray, ticks:int, history:int) -> tuple[float, int]:
+    trails = TrailBuffer(history, capacity=positions.shape[1])
+    for slot, x in enumerate(positions[0]):
+        trails.start(slot, x, (255, 255, 255, 255))
+    row = trails.points[0].nbytes + trails.colors[0].nbytes
+    start = time.perf_counter()
+    for tick in range(ticks):
+        trails.push(positions[tick % len(positions)])
+        trails.dirty_rows.clear()
+    # both copies of one row per tick
+    return (time.perf_counter() - start) / ticks, 2 * row
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bullets", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--history", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for history in args.history:
+        for count in args.bullets:
+            positions = rng.uniform(-10, 10, (16, count, 3))
+            old_time, old_bytes = list_trails(positions, args.ticks, history)
+            new_time, new_bytes = buffer_trails(positions, args.ticks, history)
+            print(f"history {history:4d}, {count:5d} bullets: lists {old_time * 1000:7.3f} ms/tick ({old_bytes:8d} B uploaded), "
+                  f"ring buffer {new_time * 1000:7.3f} ms/tick ({new_bytes:6d} B uploaded)")
@@ -0,0 +1,325 @@
+import itertools
+
+import numpy as np
+
+from stats import frame_stats
+
+# cell coordinates are packed into 21 bits each (+-2^20 cells per axis)
+CELL_BIAS = 1 << 20
+CELL_MASK = (1 << 21) - 1
+NEIGHBORS = np.array(list(itertools.product((-1, 0, 1), repeat=3)), dtype=np.int64)
+
+
+def cell_keys(cells:np.ndarray) -> np.ndarray:
+    '''
+    One int64 key per integer cell coordinate (..., 3)
+    '''
+    c = np.clip(cells + CELL_BIAS, 0, CELL_MASK).astype(np.int64)
+    return (c[..., 0] << 42) | (c[..., 1] << 21) | c[..., 2]
+
+
+def expand_ranges(starts:np.ndarray, counts:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    For ranges [start, start + count): (range index, value) of every element
+    '''
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.repeat(starts, counts) + offsets
+
+
+class SpatialHash:
+    """
+    Uniform grid stored as (cell key, item) entries sorted by key.
+    It is rebuilt from arrays every tick: building is one argsort and a query
+    is two searchsorted calls, so no per-item Python work is done.
+    """
+    def __init__(self, cell_size:float):
+        self.cell_size = cell_size
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.items = np.zeros(0, dtype=np.int64)
+
+    def cells(self, points) -> np.ndarray:
+        return np.floor(np.asarray(points) / self.cell_size).astype(np.int64)
+
+    def build(self, keys:np.ndarray, items:np.ndarray):
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.items = items[order]
+
+    def insert_points(self, points:np.ndarray):
+        '''
+        Item i goes into the cell holding points[i]
+        '''
+        self.build(cell_keys(self.cells(points)), np.arange(len(points)))
+
+    def insert_boxes(self, low:np.ndarray, high:np.ndarray):
+        '''
+        Item i goes into every cell overlapped by the box [low[i], high[i]]
+        '''
+        box, keys = self.box_keys(low, high)
+        self.build(keys, box)
+
+    def box_keys(self, low:np.ndarray, high:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        (box index, cell key) for every cell overlapped by each box [low[i], high[i]]
+        '''
+        lo = self.cells(low)
+        span = self.cells(high) - lo + 1
+        box, local = expand_ranges(np.zeros(len(lo), dtype=np.int64), np.prod(span, axis=1))
+        sy, sz = span[box, 1], span[box, 2]
+        cells = lo[box] + np.stack([local // (sy * sz), local // sz % sy, local % sz], axis=1)
+        return box, cell_keys(cells)
+
+    def query(self, keys:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        (query index, item) for every item stored under each of the keys
+        '''
+        start = np.searchsorted(self.keys, keys, side='left')
+        end = np.searchsorted(self.keys, keys, side='right')
+        query, entry = expand_ranges(start, end - start)
+        return query, self.items[entry]
+
+
+def world_boxes(world:np.ndarray, centers:np.ndarray, extents:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    World axis-aligned (low, high) of local boxes (center, half extent)
+    placed by column-major world matrices
+    '''
+    axes = world[:, :3, :3]
+    center = np.einsum('ni,nij->nj', centers, axes) + world[:, 3, :3]
+    extent = np.einsum('ni,nij->nj', extents, np.abs(axes))
+    return center - extent, center + extent
+
+
+class CollisionWorld:
+    """
+    Collisions of a ProjectilePool with itself and with the boxes of scene objects.
+    Spheres are hashed into cells of at least their diameter, so sphere pairs are
+    found among the 27 neighboring cells. Boxes (world bounds of registered objects,
+    grown by the largest sphere radius) are hashed into a coarser grid, which is
+    then queried with each sphere center. Pairs are narrowed down and resolved
+    for all spheres at once.
+    Callbacks receive arrays: on_sphere_hit(slots_a, slots_b) and
+    on_box_hit(slots, owners, boxes).
+    A sphere does not hit boxes of its own source (ProjectilePool.source)
+    during its first `grace` seconds, so bullets leave the barrel.
+    Up to `brute_force` candidate pairs are simply all tested, which is
+    cheaper than building a grid for a handful of bullets.
+    sweep() gives ProjectilePool.step the time of impact of each tick's motion
+    against the boxes, so fast spheres do not pass through thin parts.
+    """
+    def __init__(self, cell_size:float = 0.5, box_cell_size:float = 2.0, grace:float = 0.1, brute_force:int = 4096):
+        self.cell_size = cell_size
+        self.box_cell_size = box_cell_size
+        self.grace = grace
+        self.brute_force = brute_force
+        self.nodes = np.zeros(0, dtype=np.int64)
+        self.centers = np.zeros((0, 3))
+        self.extents = np.zeros((0, 3))
+        self.owners = np.zeros(0, dtype=np.int64)
+        # all-pairs indices by sphere count, for the brute force path
+        self.triangles: dict[int, tuple] = {}
+        self.sphere_callbacks = []
+        self.box_callbacks = []
+
+    def add_colliders(self, objects:list, owner:int = -1):
+        '''
+        Collide with the geometry bounds of objects (Object3D); owner is matched against ProjectilePool.source
+        '''
+        bounds = [object.geometry.bounds() for object in objects]
+        self.nodes = np.concatenate([self.nodes, [object.node for object in objects]]).astype(np.int64)
+        self.centers = np.concatenate([self.centers, np.reshape([center for center, _ in bounds], (-1, 3))])
+        self.extents = np.concatenate([self.extents, np.reshape([extent for _, extent in bounds], (-1, 3))])
+        self.owners = np.concatenate([self.owners, np.full(len(objects), owner)]).astype(np.int64)
+
+    def remove_colliders(self, owner:int):
+        '''
+        Stop colliding with every object added under owner (e.g. a deleted robot)
+        '''
+        keep = self.owners != owner
+        self.nodes = self.nodes[keep]
+        self.centers = self.centers[keep]
+        self.extents = self.extents[keep]
+        self.owners = self.owners[keep]
+
+    def world_bounds(self, store) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        World axis-aligned (low, high) of the colliders, placed by store.world
+        '''
+        return world_boxes(store.world[self.nodes], self.centers, self.extents)
+
+    def on_sphere_hit(self, callback):
+        self.sphere_callbacks.append(callback)
+
+    def on_box_hit(self, callback):
+        self.box_callbacks.append(callback)
+
+    def sphere_pairs(self, centers:np.ndarray, radii:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Index pairs (i < j) of overlapping spheres
+        '''
+        n = len(centers)
+        if n * (n - 1) // 2 <= self.brute_force:
+            if n not in self.triangles:
+                self.triangles[n] = np.triu_indices(n, 1)
+            i, j = self.triangles[n]
+        else:
+            grid = SpatialHash(max(self.cell_size, 2 * float(radii.max())))
+            grid.insert_points(centers)
+            cells = grid.cells(centers)
+            query, j = grid.query(cell_keys(cells[:, None, :] + NEIGHBORS).ravel())
+            i = query // len(NEIGHBORS)
+            keep = i < j
+            i, j = i[keep], j[keep]
+        d = centers[j] - centers[i]
+        hit = np.sum(d * d, axis=1) < (radii[i] + radii[j]) ** 2
+        return i[hit], j[hit]
+
+    def box_pairs(self, centers:np.ndarray, radii:np.ndarray, low:np.ndarray, high:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        (sphere, box) pairs where the sphere touches the box
+        '''
+        if len(centers) * len(low) <= self.brute_force:
+            i, b = np.divmod(np.arange(len(centers) * len(low)), len(low))
+        else:
+            grid = SpatialHash(self.box_cell_size)
+            margin = float(radii.max())
+            grid.insert_boxes(low - margin, high + margin)
+            i, b = grid.query(cell_keys(grid.cells(centers)))
+        closest = np.clip(centers[i], low[b], high[b])
+        d = centers[i] - closest
+        hit = np.sum(d * d, axis=1) < radii[i] ** 2
+        return i[hit], b[hit]
+
+    def segment_pairs(self, start:np.ndarray, end:np.ndarray, low:np.ndarray, high:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        (segment, box) pairs where the bounds of segment start -> end overlap the box
+        '''
+        seg_low, seg_high = np.minimum(start, end), np.maximum(start, end)
+        if len(start) * len(low) <= self.brute_force:
+            i, b = np.divmod(np.arange(len(start) * len(low)), len(low))
+        else:
+            grid = SpatialHash(self.box_cell_size)
+            grid.insert_boxes(low, high)
+            segment, keys = grid.box_keys(seg_low, seg_high)
+            query, b = grid.query(keys)
+            # a segment spanning several cells finds a box once per shared cell
+            i, b = np.divmod(np.unique(segment[query] * len(low) + b), len(low))
+        overlap = np.all((seg_low[i] <= high[b]) & (seg_high[i] >= low[b]), axis=1)
+        return i[overlap], b[overlap]
+
+    def sweep(self, pool, store, slots:np.ndarray, start:np.ndarray, end:np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        '''
+        Earliest time of impact (fraction of start -> end, inf for none), surface
+        normal and collider index of each sphere moving from start to end.
+        The spheres are swept as points against the boxes grown by the radius
+        (slab test), which is slightly conservative at box edges. Spheres already
+        inside a box are left to the overlap test in step().
+        '''
+        toi = np.full(len(slots), np.inf)
+        normal = np.zeros((len(slots), 3))
+        box = np.full(len(slots), -1, dtype=np.int64)
+        if len(self.nodes) == 0 or len(slots) == 0:
+            return toi, normal, box
+        low, high = self.world_bounds(store)
+        low, high = low - pool.r, high + pool.r
+        # skip the test when no motion comes near any box
+        if np.any(np.minimum(start, end).min(axis=0) > high.max(axis=0)) or np.any(np.maximum(start, end).max(axis=0) < low.min(axis=0)):
+            return toi, normal, box
+        i, b = self.segment_pairs(start, end, low, high)
+        own = (pool.lifetime[slots[i]] < self.grace) & (self.owners[b] >= 0) & (self.owners[b] == pool.source[slots[i]])
+        i, b = i[~own], b[~own]
+        p, d = start[i], end[i] - start[i]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t0 = (low[b] - p) / d
+            t1 = (high[b] - p) / d
+        # an axis without motion is crossed at no time: always inside its slab or never
+        still = d == 0
+        inside = (p >= low[b]) & (p <= high[b])
+        near = np.where(still, np.where(inside, -np.inf, np.inf), np.minimum(t0, t1))
+        far = np.where(still, np.where(inside, np.inf, -np.inf), np.maximum(t0, t1))
+        enter, exit = near.max(axis=1), far.min(axis=1)
+        hit = (enter <= exit) & (enter >= 0) & (enter <= 1)
+        i, b, enter, near, d = i[hit], b[hit], enter[hit], near[hit], d[hit]
+        # keep the first box entered by each sphere
+        order = np.lexsort((enter, i))
+        first = order[np.unique(i[order], return_index=True)[1]]
+        i, b, enter = i[first], b[first], enter[first]
+        axis = np.argmax(near[first], axis=1)
+        toi[i] = enter
+        normal[i, axis] = -np.sign(d[first, axis])
+        box[i] = b
+        return toi, normal, box
+
+    def dispatch_box_hits(self, slots:np.ndarray, boxes:np.ndarray):
+        frame_stats.add('box_hits', len(slots))
+        for callback in self.box_callbacks:
+            callback(slots, self.owners[boxes], boxes)
+
+    def step(self, pool, store):
+        '''
+        Find and resolve the collisions of the live projectiles in pool against
+        each other and against the colliders placed by store.world
+        '''
+        slots = pool.live_slots()
+        if len(slots) == 0:
+            return
+        x = pool.position[slots]
+        v = pool.velocity[slots]
+        radii = np.full(len(slots), float(pool.r))
+        e = pool.restitution
+
+        a = b = np.zeros(0, dtype=np.int64)
+        if len(slots) > 1:
+            a, b = self.sphere_pairs(x, radii)
+        if len(a):
+            d = x[b] - x[a]
+            dist = np.sqrt(np.sum(d * d, axis=1))
+            n = d / np.maximum(dist, 1e-9)[:, None]
+            # equal masses: push apart and exchange the approaching normal velocity
+            push = n * ((radii[a] + radii[b] - dist) / 2)[:, None]
+            vn = np.sum((v[a] - v[b]) * n, axis=1)
+            impulse = n * (np.maximum(vn, 0) * (1 + e) / 2)[:, None]
+            np.add.at(x, a, -push)
+            np.add.at(x, b, push)
+            np.add.at(v, a, -impulse)
+            np.add.at(v, b, impulse)
+            frame_stats.add('sphere_hits', len(a))
+
+        hits, boxes = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        if len(self.nodes):
+            low, high = self.world_bounds(store)
+        # skip the box test when no sphere is near any box
+        if len(self.nodes) and np.all(x.min(axis=0) - pool.r <= high.max(axis=0)) and np.all(x.max(axis=0) + pool.r >= low.min(axis=0)):
+            hits, boxes = self.box_pairs(x, radii, low, high)
+            young = pool.lifetime[slots[hits]] < self.grace
+            own = (self.owners[boxes] >= 0) & (self.owners[boxes] == pool.source[slots[hits]])
+            hits, boxes = hits[~(young & own)], boxes[~(young & own)]
+        if len(hits):
+            closest = np.clip(x[hits], low[boxes], high[boxes])
+            d = x[hits] - closest
+            dist = np.sqrt(np.sum(d * d, axis=1))
+            # centers inside a box leave through its nearest face
+            inside = dist < 1e-9
+            if np.any(inside):
+                p = x[hits][inside]
+                lo, hi = low[boxes][inside], high[boxes][inside]
+                depth = np.concatenate([p - lo, hi - p], axis=1)
+                face = np.argmin(depth, axis=1)
+                d[inside] = 0
+                d[inside, face % 3] = np.where(face < 3, -1.0, 1.0)
+                dist[inside] = -depth[np.arange(len(face)), face]
+            n = d / np.maximum(np.abs(dist), 1e-9)[:, None]
+            n[inside] = d[inside]
+            np.add.at(x, hits, n * (radii[hits] - dist)[:, None])
+            vn = np.sum(v[hits] * n, axis=1)
+            np.add.at(v, hits, -n * (np.minimum(vn, 0) * (1 + e))[:, None])
+
+        if len(a) or len(hits):
+            pool.position[slots] = x
+            pool.velocity[slots] = v
+        if len(a):
+            for callback in self.sphere_callbacks:
+                callback(slots[a], slots[b])
+        if len(hits):
+            self.dispatch_box_hits(slots[hits], boxes)
@@ -0,0 +1,240 @@
+import numpy as np
+from pyglet.math import Vec3
+
+from ulility import SecondOrderBank, IK2Link
+
+
+def rotation_matrices(angle, axis) -> np.ndarray:
+    '''
+    Batched Mat4.from_rotation. Returns (..., 4, 4) matrices in pyglet's
+    column-major layout, i.e. M[..., c, r] is row r of column c.
+    With this layout A @ B (math) is B_cm @ A_cm and M v is v @ M_cm.
+    '''
+    angle = np.asarray(angle, dtype=np.float64)
+    axis = np.broadcast_to(np.asarray(axis, dtype=np.float64), angle.shape + (3,))
+    x, y, z = axis[..., 0], axis[..., 1], axis[..., 2]
+    c = np.cos(angle)
+    s = np.sin(angle)
+    t = 1 - c
+    out = np.zeros(angle.shape + (4, 4))
+    out[..., 0, 0] = c + t * x * x
+    out[..., 0, 1] = t * x * y + s * z
+    out[..., 0, 2] = t * x * z - s * y
+    out[..., 1, 0] = t * y * x - s * z
+    out[..., 1, 1] = c + t * y * y
+    out[..., 1, 2] = t * y * z + s * x
+    out[..., 2, 0] = t * z * x + s * y
+    out[..., 2, 1] = t * z * y - s * x
+    out[..., 2, 2] = c + t * z * z
+    out[..., 3, 3] = 1
+    return out
+
+
+def normalize(v:np.ndarray) -> np.ndarray:
+    '''
+    Row-wise Vec3.normalize: zero vectors stay zero.
+    '''
+    mag = np.linalg.norm(v, axis=-1, keepdims=True)
+    return np.divide(v, mag, out=np.zeros_like(v), where=mag > 0)
+
+
+class Crowd:
+    """
+    Many walkers simulated at once.
+    Robot state (ground position, rotation, step targets, grounded flags,
+    step distances) lives in arrays and Engine's gait (procedural_animate,
+    including the diagonal cross_grounded rule) is evaluated for all robots
+    and legs together. Gait parameters match Engine.
+    dynamics_mode selects the SecondOrderBank integrator: "euler" matches
+    the single-robot Engine, "exact" stays stable for any dt.
+    """
+    body_offset = 0.6
+    leg1_length = 0.7
+    leg2_length = 1.3
+    joint_offset = 1.0
+    stride = 1.2
+    step_boundary = 0.7
+    step_speed = 3.0
+    step_h = 0.5
+
+    def __init__(self, count:int, spacing:float = 4.0, dynamics_mode:str = "euler"):
+        self.count = count
+        j = self.joint_offset / 2
+        s = self.stride
+        self.joint_positions = np.array([[j, 0, j], [-j, 0, j], [-j, 0, -j], [j, 0, -j]])
+        self.step_offsets = np.array([[s, 0, s], [-s, 0, s], [-s, 0, -s], [s, 0, -s]])
+        self.step_offset_mags = np.linalg.norm(self.step_offsets, axis=1)
+        # legs 0,2 and 1,3 are the two diagonal pairs
+        self.parity = np.arange(4) % 2
+
+        side = int(np.ceil(np.sqrt(count)))
+        grid = np.arange(count)
+        self.ground_position = np.zeros((count, 3))
+        self.ground_position[:, 0] = (grid % side - (side - 1) / 2) * spacing
+        self.ground_position[:, 2] = (grid // side - (side - 1) / 2) * spacing
+        self.rotation = np.zeros(count)
+        self.targets = self.ground_position.copy()
+        self.cursors = self.ground_position + np.array([1.0, 0, 0])
+
+        self.position_system = SecondOrderBank(0.3, 0.5, 0.5, self.ground_position, dynamics_mode)
+        self.rotation_system = SecondOrderBank(1, 1, 1, self.rotation, dynamics_mode)
+
+        self.grounded = np.ones((count, 4), dtype=bool)
+        self.step_dists = np.zeros((count, 4))
+        self.curr_step_positions = self.ground_position[:, None, :] + self.step_offsets
+        self.target_step_positions = self.curr_step_positions.copy()
+        self.avg_end_height = np.zeros(count)
+
+        # outputs, column-major like TransformStore
+        self.body_position = self.ground_position.copy()
+        self.body_rotation_mat = np.tile(np.eye(4), (count, 1, 1))
+        self.leg1_rotation_mat = np.tile(np.eye(4), (count, 4, 1, 1))
+        self.leg2_rotation_mat = np.tile(np.eye(4), (count, 4, 1, 1))
+        self.th1 = np.zeros((count, 4))
+        self.th2 = np.zeros((count, 4))
+
+        self.store = None
+
+    def step_height(self, rem, step):
+        x = rem/step
+        return (x**2)*((x-1)**2)*8*self.step_h
+
+    def procedural_animate(self, dt):
+        n = self.count
+        body_rot_y = rotation_matrices(self.rotation, (0, 1, 0))[:, :3, :3]
+        pos_vel = self.position_system.yd
+        pos_vel_dir = normalize(pos_vel)
+        pos_vel_mag = np.linalg.norm(pos_vel, axis=1)
+        rot_vel = self.rotation_system.yd
+
+        lead = pos_vel_dir * np.minimum(pos_vel_mag * 0.1, 1.0)[:, None]
+        end_positions = self.curr_step_positions.copy()
+        self.avg_end_height = np.zeros(n)
+
+        for i in range(4):
+            target = self.ground_position + self.step_offsets[i] @ body_rot_y + lead
+            curr = self.curr_step_positions[:, i]
+            dist = np.linalg.norm(target - curr, axis=1)
+            grounded = self.grounded[:, i].copy()
+
+            # lift: the other diagonal pair must be on the ground (uses this tick's updates)
+            cross_grounded = np.all(self.grounded[:, self.parity != i % 2], axis=1)
+            lift = grounded & (dist > self.step_boundary) & cross_grounded
+            self.target_step_positions[lift, i] = target[lift]
+            self.grounded[lift, i] = False
+            self.step_dists[lift, i] = dist[lift]
+
+            # swing
+            m = ~grounded
+            if np.any(m):
+                rem = self.target_step_positions[m, i] - curr[m]
+                rem_dist = np.linalg.norm(rem, axis=1)
+                step_move_dir = normalize(rem)
+                rot_vel_mag = rot_vel[m] * self.step_offset_mags[i]
+                velocity = np.maximum(np.sqrt(pos_vel_mag[m]**2 + rot_vel_mag**2), 0.3)
+                ds = self.step_speed * velocity * dt
+                moved = curr[m] + step_move_dir * ds[:, None]
+                end_positions[m, i, 1] += self.step_height(rem_dist, self.step_dists[m, i])
+                self.avg_end_height[m] += end_positions[m, i, 1] / 4
+                arrived = rem_dist < ds
+                moved[arrived] = self.target_step_positions[m, i][arrived]
+                self.curr_step_positions[m, i] = moved
+                landed = np.flatnonzero(m)[arrived]
+                self.grounded[landed, i] = True
+
+        # end positions in body space: R^T (p - t)
+        rot = self.body_rotation_mat[:, :3, :3]
+        local_end = np.einsum('nlj,nij->nli', end_positions - self.body_position[:, None, :], rot)
+        v = local_end - self.joint_positions
+        pi = np.arctan2(-v[..., 2], v[..., 0])
+        r = np.hypot(v[..., 0], v[..., 2])
+        self.th1, self.th2 = IK2Link.solve_batch(r, v[..., 1], self.leg1_length, self.leg2_length, self.th1, self.th2)
+
+        # R1 = Ry(pi) @ Rz(th1), R2 = Rz(th2)
+        self.leg1_rotation_mat = rotation_matrices(self.th1, (0, 0, 1)) @ rotation_matrices(pi, (0, 1, 0))
+        self.leg2_rotation_mat = rotation_matrices(self.th2, (0, 0, 1))
+
+    def fixed_update(self, dt):
+        self.position_system.update(dt, self.targets)
+        self.ground_position = self.position_system.y
+        self.body_position = self.ground_position + np.array([0, 1, 0]) * (self.body_offset + self.avg_end_height / 2)[:, None]
+
+        input_body_dir = normalize(self.cursors - self.ground_position)
+        body_dir = np.stack([np.cos(self.rotation), np.zeros(self.count), -np.sin(self.rotation)], axis=1)
+        cross_y = body_dir[:, 2] * input_body_dir[:, 0] - body_dir[:, 0] * input_body_dir[:, 2]
+        input_body_rotation = self.rotation + np.arcsin(np.clip(cross_y, -1, 1))
+        self.rotation_system.update(dt, input_body_rotation)
+        self.rotation = self.rotation_system.y
+
+        pos_vel = self.position_system.yd
+        pos_vel_mag = np.linalg.norm(pos_vel, axis=1)
+        tilt_angle = 0.3*np.minimum(pos_vel_mag/10, 1)
+        tilt_axis = normalize(np.stack([pos_vel[:, 2], np.zeros(self.count), -pos_vel[:, 0]], axis=1))
+        tilt_mat = rotation_matrices(tilt_angle, tilt_axis)
+        self.body_rotation_mat = rotation_matrices(self.rotation, (0, 1, 0)) @ tilt_mat
+
+        self.procedural_animate(dt)
+        if self.store is not None:
+            self.write_transforms()
+
+    def attach(self, renderer, texture = None):
+        '''
+        Build renderable robots (body, legs and RobotBody parts) for every walker.
+        Their local transforms are written to the transform store in bulk each tick.
+        '''
+        from object import Object3D
+        from robot import RobotBody, RigidSphere
+        from geometry import Geometry, Rod, get_geometry
+
+        self.store = Object3D.store
+        self.body_nodes = np.zeros(self.count, dtype=np.int64)
+        self.leg1_nodes = np.zeros((self.count, 4), dtype=np.int64)
+        self.leg2_nodes = np.zeros((self.count, 4), dtype=np.int64)
+        for k in range(self.count):
+            body_obj = Object3D(Geometry())
+            renderer.add_object(body_obj)
+            self.body_nodes[k] = body_obj.node
+            legs = []
+            for i, joint_position in enumerate(self.joint_positions):
+                rod_obj = Object3D(get_geometry(Rod, self.leg1_length, 0.3, 0.4), texture)
+                rod_obj.set_position(Vec3(*joint_position))
+                body_obj.add_child(rod_obj)
+                renderer.add_object(rod_obj)
+                subrod_obj = Object3D(get_geometry(Rod, self.leg2_length, 0.3, 0.4), texture)
+                subrod_obj.set_position(Vec3(self.leg1_length, 0.0, 0.0))
+                rod_obj.add_child(subrod_obj)
+                renderer.add_object(subrod_obj)
+                self.leg1_nodes[k, i] = rod_obj.node
+                self.leg2_nodes[k, i] = subrod_obj.node
+                legs += [rod_obj, subrod_obj]
+            robot = RobotBody(body_obj, renderer, texture)
+            RigidSphere.collisions.add_colliders(legs, robot.id)
+        self.write_transforms()
+
+    def write_transforms(self):
+        self.store.set_local_batch(self.body_nodes, self.body_rotation_mat, self.body_position)
+        self.store.set_local_batch(self.leg1_nodes.ravel(), self.leg1_rotation_mat.reshape(-1, 4, 4))
+        self.store.set_local_batch(self.leg2_nodes.ravel(), self.leg2_rotation_mat.reshape(-1, 4, 4))
+
+    def wander(self, rng:np.random.Generator, area:float):
+        '''
+        Give every robot a new random target and cursor.
+        '''
+        self.targets = rng.uniform(-area, area, (self.count, 3)) * np.array([1, 0, 1])
+        self.cursors = rng.uniform(-area, area, (self.count, 3)) * np.array([1, 0, 1])
+
+
+if __name__ == '__main__':
+    import sys
+    import pyglet
+    from render import RenderWindow
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    renderer = RenderWindow(1280, 720, "Robot Crowd", resizable = True)
+    crowd = Crowd(count)
+    crowd.attach(renderer, renderer.load_texture("textures/steel.jpeg"))
+    renderer.fixed_update = crowd.fixed_update
+    rng = np.random.default_rng(0)
+    area = np.sqrt(count) * 2
+    pyglet.clock.schedule_interval(lambda dt: crowd.wander(rng, area), 3.0)
+    renderer.run()
@@ -0,0 +1,117 @@
+import numpy as np
+
+from object import Object3D
+from registry import ObjectRegistry
+from stats import frame_stats
+
+
+def frustum_planes(view_proj) -> np.ndarray:
+    '''
+    The six clip planes (a, b, c, d), a x + b y + c z + d >= 0 inside, of a
+    column-major view-projection Mat4 (Gribb & Hartmann). Normals are unit
+    length, so plane distances are in world units. Works for orthographic
+    and perspective projections alike.
+    '''
+    m = np.array(view_proj, dtype=np.float64).reshape(4, 4)
+    # column-major: row r of the matrix is m[:, r]
+    rows = m.T
+    planes = np.array([
+        rows[3] + rows[0], rows[3] - rows[0],
+        rows[3] + rows[1], rows[3] - rows[1],
+        rows[3] + rows[2], rows[3] - rows[2],
+    ])
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+
+class FrustumCuller:
+    """
+    Hides objects outside the view frustum before the batch is drawn.
+    Every registered Object3D is bounded by the box of its geometry (computed
+    once per geometry); each frame the boxes are placed with the world matrices
+    of the transform store and tested against the frustum planes as oriented
+    boxes, all objects at once. Only groups whose visibility changed are touched,
+    since every change makes the batch rebuild its draw list.
+    """
+    def __init__(self):
+        self.planes = np.zeros((6, 4))
+        self.planes[:, 3] = 1
+        self.objects = ObjectRegistry()
+        self.dirty = True
+        self.nodes = np.zeros(0, dtype=np.int64)
+        self.centers = np.zeros((0, 3))
+        self.extents = np.zeros((0, 3))
+        self.visible = np.ones(0, dtype=bool)
+
+    def set_camera(self, view_proj):
+        self.planes = frustum_planes(view_proj)
+
+    def add(self, object:Object3D):
+        self.objects.add(object)
+        self.dirty = True
+
+    def remove(self, object:Object3D):
+        '''
+        Applied at the next cull
+        '''
+        self.objects.remove(self.objects.handle(object))
+        self.dirty = True
+
+    def _rebuild(self):
+        self.objects.flush()
+        bounds = [object.geometry.bounds() for object in self.objects]
+        self.nodes = np.array([object.node for object in self.objects], dtype=np.int64)
+        self.centers = np.array([center for center, _ in bounds]).reshape(-1, 3)
+        self.extents = np.array([extent for _, extent in bounds]).reshape(-1, 3)
+        self.visible = np.array([not object.culled for object in self.objects], dtype=bool)
+        self.dirty = False
+
+    def box_mask(self, world:np.ndarray, centers:np.ndarray, extents:np.ndarray) -> np.ndarray:
+        '''
+        Whether each box (local center, half extent, column-major world matrix) touches the frustum
+        '''
+        axes = world[:, :3, :3]
+        world_centers = np.einsum('ni,nij->nj', centers, axes) + world[:, 3, :3]
+        normals = self.planes[:, :3]
+        distance = world_centers @ normals.T + self.planes[:, 3]
+        # projected half size of each oriented box on each plane normal
+        projected = (np.ascontiguousarray(axes).reshape(-1, 3) @ normals.T).reshape(len(axes), 3, -1)
+        reach = np.einsum('ni,nip->np', extents, np.abs(projected))
+        return np.all(distance >= -reach, axis=1)
+
+    def sphere_mask(self, centers:np.ndarray, radii) -> np.ndarray:
+        '''
+        Whether each world-space sphere touches the frustum
+        '''
+        distance = np.asarray(centers, dtype=np.float64).reshape(-1, 3) @ self.planes[:, :3].T + self.planes[:, 3]
+        return np.all(distance >= -np.reshape(radii, (-1, 1)), axis=1)
+
+    def instance_mask(self, sphere:tuple, offsets, scales) -> np.ndarray:
+        '''
+        Whether each instance is visible; sphere is the local (center, radius)
+        of the instanced geometry, placed with each offset and scale
+        '''
+        center, radius = sphere
+        scales = np.asarray(scales)
+        visible = self.sphere_mask(np.asarray(offsets) + scales[:, None] * center, radius * scales)
+        drawn = int(np.count_nonzero(visible))
+        frame_stats.add('instances_drawn', drawn)
+        frame_stats.add('instances_culled', len(visible) - drawn)
+        return visible
+
+    def cull(self, store):
+        '''
+        Update group visibility from the drawn world matrices in store
+        (store.draw_world, interpolated between steps like the groups are drawn)
+        '''
+        if self.dirty:
+            self._rebuild()
+        visible = self.box_mask(store.draw_world[self.nodes], self.centers, self.extents)
+        for i in np.flatnonzero(visible != self.visible):
+            object = self.objects[i]
+            object.culled = not visible[i]
+            if object.group is not None:
+                object.group.visible = bool(visible[i])
+        self.visible = visible
+        drawn = int(np.count_nonzero(visible))
+        frame_stats.add('objects_drawn', drawn)
+        frame_stats.add('objects_culled', len(visible) - drawn)
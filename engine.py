@@ -11,6 +11,7 @@ from ulility import *
 from object import Object3D
 from control import Control
 from robot import RobotBody, RigidSphere
+from lod import LODGeometry, LODObject, LODInstancedMesh, SPHERE_LEVELS
 
 
 class Engine:
@@ -61,21 +62,22 @@ class Engine:
         self.setup()
       
     def setup(self):
-        body_tex = pyglet.image.load("textures/steel.jpeg").get_texture()
+        body_tex = self.renderer.load_texture("textures/steel.jpeg")
+        self.body_tex = body_tex
         body_geo = Geometry()
         body_obj = Object3D(body_geo)
         self.body_obj = body_obj
         self.renderer.add_object(body_obj)
         
         for joint_position in self.joint_positions:
-            rod = Rod(self.leg1_length, 0.3, 0.4)
+            rod = get_geometry(Rod, self.leg1_length, 0.3, 0.4)
             rod_obj = Object3D(rod, body_tex)
             rod_obj.set_position(joint_position)
             self.leg1_objs.append(rod_obj)
             self.renderer.add_object(rod_obj)
             
             body_obj.add_child(rod_obj)
-            subrod = Rod(self.leg2_length, 0.3, 0.4)
+            subrod = get_geometry(Rod, self.leg2_length, 0.3, 0.4)
             subrod_obj = Object3D(subrod, body_tex)
             subrod_obj.set_position(Vec3(self.leg1_length, 0.0, 0.0))
             self.leg2_objs.append(subrod_obj)
@@ -84,18 +86,41 @@ class Engine:
         
         
         floor_geo = Plane(50, 50, 10, 10)
-        floor_tex = pyglet.image.load("textures/floor.jpg").get_texture()
+        floor_tex = self.renderer.load_texture("textures/floor.jpg")
+        self.floor_tex = floor_tex
         floor_obj = Object3D(floor_geo, floor_tex)
         floor_obj.set_rotation(Mat4.from_rotation(-np.pi/2, Vec3(1,0,0)))
         self.floor_obj = floor_obj
         self.renderer.add_object(floor_obj)
         
-        tracker_geo = Sphere(radius=0.3)
-        tracker_obj = Object3D(tracker_geo, color=Vec4(255,0,0,128))
+        tracker_lod = LODGeometry(Sphere, SPHERE_LEVELS, radius=0.3)
+        tracker_obj = LODObject(tracker_lod, color=Vec4(255,0,0,128))
         self.tracker_obj = tracker_obj
         self.renderer.add_object(tracker_obj)
         
         self.robot_body = RobotBody(body_obj, self.renderer, body_tex)
+        RigidSphere.collisions.add_colliders(self.leg1_objs + self.leg2_objs, self.robot_body.id)
+        
+        bullet_lod = LODGeometry(Sphere, SPHERE_LEVELS, radius=RigidSphere.r)
+        bullet_mesh = LODInstancedMesh(bullet_lod, RigidSphere.instance_data, ids=RigidSphere.pool.live_slots)
+        self.renderer.add_instanced(bullet_mesh)
+        # trails end where the interpolated bullets are drawn
+        RigidSphere.trails.head = lambda: RigidSphere.pool.draw_position
+        self.renderer.add_instanced(RigidSphere.trails)
+        self.renderer.add_interpolated(RigidSphere.pool)
+        
+    def delete(self):
+        '''
+        Tear the robot and its scene down and release the textures it loaded;
+        its leg colliders go with RobotBody.delete
+        '''
+        self.robot_body.delete()
+        for object in self.leg1_objs + self.leg2_objs + [self.body_obj, self.floor_obj, self.tracker_obj]:
+            object.delete()
+        for texture in (self.body_tex, self.floor_tex):
+            # HeadlessRenderer loads no textures
+            if texture is not None:
+                texture.release()
         
     def step_height(self, rem, step):
         h = 0.5
@@ -187,8 +212,7 @@ class Engine:
         
         self.tracker_obj.set_position(self.controller.cursor)
         
-        for obj in RigidSphere.instance_list:
-            obj.update(dt)
+        RigidSphere.step_all(dt)
         
         for cmd in self.controller.command_queue:
             try:
@@ -2,4 +2,5 @@ from .cylinder import Cylinder
 from .cube import Cube, Rod
 from .plane import Plane
 from .sphere import Sphere
-from .geom import Geometry
\ No newline at end of file
+from .geom import Geometry
+from .cache import GeometryCache, geometry_cache, get_geometry
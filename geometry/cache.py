@@ -0,0 +1,63 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from geometry.geom import Geometry
+from stats import frame_stats
+
+
+def _freeze(value):
+    '''
+    Hashable form of a constructor argument (Vec3 and lists become tuples)
+    '''
+    if isinstance(value, (str, bytes)) or not hasattr(value, '__iter__'):
+        return value
+    return tuple(_freeze(item) for item in value)
+
+
+class GeometryCache:
+    '''
+    LRU cache of generated geometry keyed on the class and constructor arguments.
+    Cached geometries are shared, so their buffers are made read-only.
+    '''
+    def __init__(self, maxsize:int = 128):
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple, Geometry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cls:type, *args, **kwargs) -> Geometry:
+        key = (cls, _freeze(args), _freeze(sorted(kwargs.items())))
+        geometry = self.entries.get(key)
+        if geometry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            frame_stats.add('geometry_cache_hits')
+            return geometry
+
+        self.misses += 1
+        frame_stats.add('geometry_cache_misses')
+        geometry = cls(*args, **kwargs)
+        for name in ('vertices', 'normals', 'uvs', 'indices'):
+            buffer = getattr(geometry, name)
+            if buffer is not None:
+                buffer = np.asarray(buffer)
+                buffer.setflags(write=False)
+                setattr(geometry, name, buffer)
+        self.entries[key] = geometry
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return geometry
+
+    def clear(self):
+        self.entries.clear()
+
+
+geometry_cache = GeometryCache()
+
+
+def get_geometry(cls:type, *args, **kwargs) -> Geometry:
+    '''
+    Shared, read-only cls(*args, **kwargs), e.g. get_geometry(Sphere, radius=0.12)
+    '''
+    return geometry_cache.get(cls, *args, **kwargs)
@@ -9,68 +9,56 @@ class Cube(Geometry):
     def __init__(self, scale=Vec3(1.0, 1.0, 1.0), translate=Vec3()):
         super().__init__()
 
+        # four corners per face, uvs (0, 0), (0, 1), (1, 0), (1, 1)
         self.vertices = [
-            -0.5, -0.5,  -0.5,
-            -0.5,  0.5,  -0.5,
-            0.5, -0.5,  -0.5,
-            -0.5,  0.5,  -0.5,
-            0.5,  0.5,  -0.5,
-            0.5, -0.5,  -0.5,
+            -0.5, -0.5, -0.5,
+            -0.5,  0.5, -0.5,
+            0.5, -0.5, -0.5,
+            0.5,  0.5, -0.5,
 
-            -0.5, -0.5,   0.5,
-            0.5, -0.5,   0.5,
-            -0.5,  0.5,   0.5,
-            -0.5,  0.5,   0.5,
-            0.5, -0.5,   0.5,
-            0.5,  0.5,   0.5,
+            -0.5, -0.5,  0.5,
+            0.5, -0.5,  0.5,
+            -0.5,  0.5,  0.5,
+            0.5,  0.5,  0.5,
 
-            -0.5,   0.5, -0.5,
-            -0.5,   0.5,  0.5,
-            0.5,   0.5, -0.5,
-            -0.5,   0.5,  0.5,
-            0.5,   0.5,  0.5,
-            0.5,   0.5, -0.5,
+            -0.5,  0.5, -0.5,
+            -0.5,  0.5,  0.5,
+            0.5,  0.5, -0.5,
+            0.5,  0.5,  0.5,
 
-            -0.5,  -0.5, -0.5,
-            0.5,  -0.5, -0.5,
-            -0.5,  -0.5,  0.5,
-            -0.5,  -0.5,  0.5,
-            0.5,  -0.5, -0.5,
-            0.5,  -0.5,  0.5,
+            -0.5, -0.5, -0.5,
+            0.5, -0.5, -0.5,
+            -0.5, -0.5,  0.5,
+            0.5, -0.5,  0.5,
 
-            -0.5,  -0.5, -0.5,
-            -0.5,  -0.5,  0.5,
-            -0.5,   0.5, -0.5,
-            -0.5,  -0.5,  0.5,
-            -0.5,   0.5,  0.5,
-            -0.5,   0.5, -0.5,
+            -0.5, -0.5, -0.5,
+            -0.5, -0.5,  0.5,
+            -0.5,  0.5, -0.5,
+            -0.5,  0.5,  0.5,
 
-            0.5,  -0.5, -0.5,
-            0.5,   0.5, -0.5,
-            0.5,  -0.5,  0.5,
-            0.5,  -0.5,  0.5,
-            0.5,   0.5, -0.5,
-            0.5,   0.5,  0.5,
+            0.5, -0.5, -0.5,
+            0.5,  0.5, -0.5,
+            0.5, -0.5,  0.5,
+            0.5,  0.5,  0.5,
         ]
-        
+
         self.uvs = [
             0, 0,
             0, 1,
             1, 0,
-            0, 1,
             1, 1,
-            1, 0,
         ] * 6
-        
-        self.vertices = [scale[idx % 3] * x + translate[idx % 3] for idx,
-                         x in enumerate(self.vertices)]
 
-        self.normals = [0.0, 0.0, -1.0] * 6 \
-                     + [0.0, 0.0, 1.0] * 6 \
-                     + [0.0, 1.0, 0.0] * 6 \
-                     + [0.0, -1.0, 0.0] * 6 \
-                     + [-1.0, 0.0, 0.0] * 6 \
-                     + [1.0, 0.0, 0.0] * 6
+        vertices = np.array(self.vertices).reshape(-1, 3) * np.array(scale) + np.array(translate)
+        self.vertices = vertices.astype(np.float32).ravel()
+        self.uvs = np.array(self.uvs, dtype=np.float32)
+        self.indices = (np.array([0, 1, 2, 1, 3, 2], dtype=np.uint32) + 4 * np.arange(6, dtype=np.uint32)[:, None]).ravel()
+
+        face_normals = np.array([[0, 0, -1], [0, 0, 1], [0, 1, 0], [0, -1, 0], [-1, 0, 0], [1, 0, 0]], dtype=np.float32)
+        self.normals = np.repeat(face_normals, 4, axis=0).ravel()
+
+        self.normal_format = 'bn'
+        self.uv_format = 'Bn'
 
 class Rod(Cube):
     def __init__(self, l=1.0, t=0.2, w=0.2):
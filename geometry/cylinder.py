@@ -17,126 +17,71 @@ class Cylinder(Geometry):
             'thetaLength': thetaLength
         }
 
-        self.vertices = []
-        self.normals = []
-        self.uvs = []
-        self.indices = []
-        self.index = 0
-        self.index_array = []
-        self.group_start = 0
-
         self.half_height = height / 2
-
-        self.generate_torso()
+        # (vertices, normals, uvs, indices) of the torso and each cap
+        parts = [self.generate_torso()]
         
         if not openEnded:
             if radiusTop > 0:
-                self.generate_cap(True)
+                parts.append(self.generate_cap(True, sum(len(part[0]) for part in parts)))
             if radiusBottom > 0:
-                self.generate_cap(False)
+                parts.append(self.generate_cap(False, sum(len(part[0]) for part in parts)))
 
-        # Convert lists to NumPy arrays
-        self.vertices = np.array(self.vertices, dtype=np.float32)
-        self.normals = np.array(self.normals, dtype=np.float32)
-        self.uvs = np.array(self.uvs, dtype=np.float32)
-        self.indices = np.array(self.indices, dtype=np.uint32)
+        vertices, normals, uvs, indices = zip(*parts)
+        self.vertices = np.concatenate(vertices).astype(np.float32).ravel()
+        self.normals = np.concatenate(normals).astype(np.float32).ravel()
+        self.uvs = np.concatenate(uvs).astype(np.float32).ravel()
+        self.indices = np.concatenate(indices).astype(np.uint32).ravel()
 
     def generate_torso(self):
-        slope = (self.parameters['radiusBottom'] - self.parameters['radiusTop']) / self.parameters['height']
-
-        for y in range(self.parameters['heightSegments'] + 1):
-            index_row = []
-            v = y / self.parameters['heightSegments']
-            radius = v * (self.parameters['radiusBottom'] - self.parameters['radiusTop']) + self.parameters['radiusTop']
-
-            for x in range(self.parameters['radialSegments'] + 1):
-                u = x / self.parameters['radialSegments']
-                theta = u * self.parameters['thetaLength'] + self.parameters['thetaStart']
-                sin_theta = np.sin(theta)
-                cos_theta = np.cos(theta)
-
-                # vertex
-                vertex = np.array([
-                    radius * sin_theta,
-                    -v * self.parameters['height'] + self.half_height,
-                    radius * cos_theta
-                ])
-                self.vertices.extend(vertex)
-
-                # normal
-                normal = np.array([sin_theta, slope, cos_theta])
-                normal /= np.linalg.norm(normal)
-                self.normals.extend(normal)
-
-                # uv
-                self.uvs.extend([u, 1 - v])
-
-                # save index of vertex in respective row
-                index_row.append(self.index)
-                self.index += 1
-
-            self.index_array.append(index_row)
-
-        # generate indices
-        for x in range(self.parameters['radialSegments']):
-            for y in range(self.parameters['heightSegments']):
-                a = self.index_array[y][x]
-                b = self.index_array[y + 1][x]
-                c = self.index_array[y + 1][x + 1]
-                d = self.index_array[y][x + 1]
-
-                self.indices.extend([a, b, d])
-                self.indices.extend([b, c, d])
-
-        self.group_start += len(self.indices)
-
-    def generate_cap(self, top):
-        center_index_start = self.index
-
-        radius = self.parameters['radiusTop'] if top else self.parameters['radiusBottom']
+        p = self.parameters
+        slope = (p['radiusBottom'] - p['radiusTop']) / p['height']
+
+        # (heightSegments + 1) rows of (radialSegments + 1) vertices
+        v, u = np.meshgrid(np.arange(p['heightSegments'] + 1) / p['heightSegments'],
+                           np.arange(p['radialSegments'] + 1) / p['radialSegments'], indexing='ij')
+        radius = v * (p['radiusBottom'] - p['radiusTop']) + p['radiusTop']
+        theta = u * p['thetaLength'] + p['thetaStart']
+        sin_theta = np.sin(theta)
+        cos_theta = np.cos(theta)
+
+        vertices = np.stack([radius * sin_theta, -v * p['height'] + self.half_height, radius * cos_theta], axis=-1)
+        normals = np.stack([sin_theta, np.full_like(theta, slope), cos_theta], axis=-1)
+        normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+        uvs = np.stack([u, 1 - v], axis=-1)
+
+        # indices, column by column
+        grid = np.arange(v.size).reshape(v.shape).T
+        a = grid[:-1, :-1]
+        b = grid[:-1, 1:]
+        c = grid[1:, 1:]
+        d = grid[1:, :-1]
+        indices = np.stack([a, b, d, b, c, d], axis=-1)
+
+        return vertices.reshape(-1, 3), normals.reshape(-1, 3), uvs.reshape(-1, 2), indices.ravel()
+
+    def generate_cap(self, top, center_index_start):
+        p = self.parameters
+        segments = p['radialSegments']
+        radius = p['radiusTop'] if top else p['radiusBottom']
         sign = 1 if top else -1
 
-        for x in range(1, self.parameters['radialSegments'] + 1):
-            self.vertices.extend([0, self.half_height * sign, 0])
-            self.normals.extend([0, sign, 0])
-            self.uvs.extend([0.5, 0.5])
-            self.index += 1
-
-        center_index_end = self.index
-
-        for x in range(self.parameters['radialSegments'] + 1):
-            u = x / self.parameters['radialSegments']
-            theta = u * self.parameters['thetaLength'] + self.parameters['thetaStart']
-            cos_theta = np.cos(theta)
-            sin_theta = np.sin(theta)
-
-            # vertex
-            vertex = np.array([
-                radius * sin_theta,
-                self.half_height * sign,
-                radius * cos_theta
-            ])
-            self.vertices.extend(vertex)
-
-            # normal
-            self.normals.extend([0, sign, 0])
-
-            # uv
-            uv = np.array([
-                (cos_theta * 0.5) + 0.5,
-                (sin_theta * 0.5 * sign) + 0.5
-            ])
-            self.uvs.extend(uv)
-
-            self.index += 1
-
-        for x in range(self.parameters['radialSegments']):
-            c = center_index_start + x
-            i = center_index_end + x
-
-            if top:
-                self.indices.extend([i, i + 1, c])
-            else:
-                self.indices.extend([i + 1, i, c])
-
-        self.group_start += len(self.indices)
\ No newline at end of file
+        # one center vertex per segment, then the rim
+        theta = np.arange(segments + 1) / segments * p['thetaLength'] + p['thetaStart']
+        cos_theta = np.cos(theta)
+        sin_theta = np.sin(theta)
+        center = np.tile([0, self.half_height * sign, 0], (segments, 1))
+        rim = np.stack([radius * sin_theta, np.full_like(theta, self.half_height * sign), radius * cos_theta], axis=-1)
+        vertices = np.concatenate([center, rim])
+        normals = np.tile([0, sign, 0], (2 * segments + 1, 1))
+        uvs = np.concatenate([np.full((segments, 2), 0.5),
+                              np.stack([(cos_theta * 0.5) + 0.5, (sin_theta * 0.5 * sign) + 0.5], axis=-1)])
+
+        c = center_index_start + np.arange(segments)
+        i = c + segments
+        if top:
+            indices = np.stack([i, i + 1, c], axis=-1)
+        else:
+            indices = np.stack([i + 1, i, c], axis=-1)
+
+        return vertices, normals, uvs, indices.ravel()
@@ -1,6 +1,84 @@
+import numpy as np
+
+# numpy types of pyglet attribute formats; an 'n' suffix (e.g. 'bn') means normalized
+attribute_dtypes = {
+    'b': np.int8,
+    'B': np.uint8,
+    's': np.int16,
+    'S': np.uint16,
+    'i': np.int32,
+    'I': np.uint32,
+    'f': np.float32,
+}
+
+
+def index_dtype(vertex_count:int) -> type:
+    '''
+    Smallest unsigned type that can index vertex_count vertices
+    '''
+    if vertex_count <= 0xff:
+        return np.uint8
+    if vertex_count <= 0xffff:
+        return np.uint16
+    return np.uint32
+
+
+def encode_attribute(data, fmt:str) -> np.ndarray:
+    '''
+    data as the numpy type of the pyglet attribute format fmt
+    '''
+    dtype = attribute_dtypes[fmt[0]]
+    data = np.asarray(data)
+    if 'n' in fmt:
+        info = np.iinfo(dtype)
+        data = np.clip(np.round(data * info.max), info.min, info.max)
+    return data.astype(dtype)
+
+
 class Geometry:
     def __init__(self):
         self.vertices = []
         self.indices = None
         self.normals = None
-        self.uvs = None
\ No newline at end of file
+        self.uvs = None
+        # attribute formats used when uploading (see Object3D.set_batch)
+        self.normal_format = 'f'
+        self.uv_format = 'f'
+        self.box = None
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        (center, half extent) of the local axis-aligned bounding box, computed once
+        '''
+        if self.box is None:
+            vertices = np.asarray(self.vertices, dtype=np.float64).reshape(-1, 3)
+            if len(vertices) == 0:
+                self.box = np.zeros(3), np.zeros(3)
+            else:
+                low, high = vertices.min(axis=0), vertices.max(axis=0)
+                self.box = (low + high) / 2, (high - low) / 2
+        return self.box
+
+    def bounding_sphere(self) -> tuple[np.ndarray, float]:
+        '''
+        (center, radius) of a sphere around the bounding box center holding every vertex
+        '''
+        center, _ = self.bounds()
+        vertices = np.asarray(self.vertices, dtype=np.float64).reshape(-1, 3)
+        if len(vertices) == 0:
+            return center, 0.0
+        return center, float(np.sqrt(np.max(np.sum((vertices - center)**2, axis=1))))
+
+    def upload_size(self) -> int:
+        '''
+        Bytes of vertex and index data uploaded for this geometry
+        '''
+        count = len(self.vertices) // 3
+        size = count * 3 * 4
+        if self.normals is not None:
+            size += count * 3 * np.dtype(attribute_dtypes[self.normal_format[0]]).itemsize
+        if self.uvs is not None:
+            size += count * 2 * np.dtype(attribute_dtypes[self.uv_format[0]]).itemsize
+        if self.indices is not None:
+            size += len(self.indices) * np.dtype(index_dtype(count)).itemsize
+        return size
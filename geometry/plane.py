@@ -18,42 +18,27 @@ class Plane(Geometry):
         segment_width = width / gridX
         segment_height = height / gridY
 
-        self.vertices = []
-        self.normals = []
-        self.uvs = []
-        
-        tmp_vertices = []
-        tmp_normals = []
+        # (gridY + 1) rows of (gridX + 1) grid points
+        y, x = np.meshgrid(np.arange(gridY1) * segment_height - height_half,
+                           np.arange(gridX1) * segment_width - width_half, indexing='ij')
+        grid_vertices = np.stack([x, -y, np.zeros_like(x)], axis=-1).reshape(-1, 3)
 
-        for iy in range(gridY1):
-            y = iy * segment_height - height_half
-            for ix in range(gridX1):
-                x = ix * segment_width - width_half
-                tmp_vertices.append([ x, - y, 0 ])
-                tmp_normals.append([ 0, 0, 1 ])
+        # two triangles (a, b, d), (b, c, d) per quad
+        iy, ix = np.meshgrid(np.arange(gridY), np.arange(gridX), indexing='ij')
+        a = ix + gridX1 * iy
+        b = ix + gridX1 * (iy + 1)
+        c = (ix + 1) + gridX1 * (iy + 1)
+        d = (ix + 1) + gridX1 * iy
+        self.indices = np.stack([a, b, d, b, c, d], axis=-1).astype(np.uint32).ravel()
+
+        self.vertices = grid_vertices.astype(np.float32).ravel()
+        # one texture tile per quad: uvs count grid cells and rely on GL_REPEAT
+        v, u = np.meshgrid(np.arange(gridY1), np.arange(gridX1), indexing='ij')
+        self.uvs = np.stack([u, v], axis=-1).astype(np.float32).ravel()
 
-        for iy in range(gridY):
-            for ix in range(gridX):
-                a = ix + gridX1 * iy
-                b = ix + gridX1 * ( iy + 1 )
-                c = ( ix + 1 ) + gridX1 * ( iy + 1 )
-                d = ( ix + 1 ) + gridX1 * iy
-                
-                self.vertices.extend(tmp_vertices[a])
-                self.vertices.extend(tmp_vertices[b])
-                self.vertices.extend(tmp_vertices[d])
-                
-                self.vertices.extend(tmp_vertices[b])
-                self.vertices.extend(tmp_vertices[c])
-                self.vertices.extend(tmp_vertices[d])
-                
-                self.uvs.extend([0, 0])
-                self.uvs.extend([0, 1])
-                self.uvs.extend([1, 0])
-                
-                self.uvs.extend([0, 1])
-                self.uvs.extend([1, 1])
-                self.uvs.extend([1, 0])
-        
         cnt = len(self.vertices) // 3
-        self.normals = [ 0, 0, 1 ] * cnt
\ No newline at end of file
+        self.normals = np.tile(np.array([0, 0, 1], dtype=np.float32), cnt)
+
+        self.normal_format = 'bn'
+        if max(gridX1, gridY1) <= 0xffff:
+            self.uv_format = 'S'
@@ -21,59 +21,42 @@ class Sphere(Geometry):
 
         thetaEnd = min(thetaStart + thetaLength, np.pi)
 
-        self.indices = []
-        self.vertices = []
-        self.normals = []
-        self.uvs = []
-
-        index = 0
-        grid = []
-
-        # generate vertices, normals, and uvs
-        for iy in range(heightSegments + 1):
-            verticesRow = []
-
-            v = iy / heightSegments
-
-            # special case for the poles
-            uOffset = 0
-            if iy == 0 and thetaStart == 0:
-                uOffset = 0.5 / widthSegments
-            elif iy == heightSegments and thetaEnd == np.pi:
-                uOffset = -0.5 / widthSegments
-
-            for ix in range(widthSegments + 1):
-                u = ix / widthSegments
-
-                # vertex
-                x = -radius * np.cos(phiStart + u * phiLength) * np.sin(thetaStart + v * thetaLength)
-                y = radius * np.cos(thetaStart + v * thetaLength)
-                z = radius * np.sin(phiStart + u * phiLength) * np.sin(thetaStart + v * thetaLength)
-
-                self.vertices.extend([x, y, z])
-
-                # normal
-                normal = np.array([x, y, z])
-                normal /= np.linalg.norm(normal)
-                self.normals.extend(normal)
-
-                # uv
-                self.uvs.extend([u + uOffset, 1 - v])
-
-                verticesRow.append(index)
-                index += 1
-
-            grid.append(verticesRow)
-
-        # indices
-        for iy in range(heightSegments):
-            for ix in range(widthSegments):
-                a = grid[iy][ix + 1]
-                b = grid[iy][ix]
-                c = grid[iy + 1][ix]
-                d = grid[iy + 1][ix + 1]
-
-                if iy != 0 or thetaStart > 0:
-                    self.indices.extend([a, b, d])
-                if iy != heightSegments - 1 or thetaEnd < np.pi:
-                    self.indices.extend([b, c, d])
\ No newline at end of file
+        # (heightSegments + 1) rows of (widthSegments + 1) vertices
+        v, u = np.meshgrid(np.arange(heightSegments + 1) / heightSegments,
+                           np.arange(widthSegments + 1) / widthSegments, indexing='ij')
+        phi = phiStart + u * phiLength
+        theta = thetaStart + v * thetaLength
+
+        # vertices
+        x = -radius * np.cos(phi) * np.sin(theta)
+        y = radius * np.cos(theta)
+        z = radius * np.sin(phi) * np.sin(theta)
+        vertices = np.stack([x, y, z], axis=-1).reshape(-1, 3)
+        self.vertices = vertices.astype(np.float32).ravel()
+
+        # normals
+        normals = vertices / np.linalg.norm(vertices, axis=1, keepdims=True)
+        self.normals = normals.astype(np.float32).ravel()
+
+        # uvs, with the special case for the poles
+        u_offset = np.zeros(heightSegments + 1)
+        if thetaStart == 0:
+            u_offset[0] = 0.5 / widthSegments
+        if thetaEnd == np.pi:
+            u_offset[-1] = -0.5 / widthSegments
+        self.uvs = np.stack([u + u_offset[:, None], 1 - v], axis=-1).astype(np.float32).ravel()
+
+        # indices: two triangles per quad, none for the degenerate halves at the poles
+        grid = np.arange((heightSegments + 1) * (widthSegments + 1)).reshape(heightSegments + 1, widthSegments + 1)
+        a = grid[:-1, 1:]
+        b = grid[:-1, :-1]
+        c = grid[1:, :-1]
+        d = grid[1:, 1:]
+        triangles = np.stack([np.stack([a, b, d], axis=-1), np.stack([b, c, d], axis=-1)], axis=2)
+        keep = np.ones((heightSegments, 1, 2), dtype=bool)
+        if thetaStart <= 0:
+            keep[0, :, 0] = False
+        if thetaEnd >= np.pi:
+            keep[-1, :, 1] = False
+        keep = np.broadcast_to(keep, triangles.shape[:3])
+        self.indices = triangles[keep].astype(np.uint32).ravel()
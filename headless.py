@@ -0,0 +1,171 @@
+import pyglet
+# No window is ever opened, so do not let pyglet create its hidden GL context.
+pyglet.options['shadow_window'] = False
+
+import argparse
+import time
+
+import numpy as np
+from pyglet.math import Vec3
+
+from engine import Engine
+from object import Object3D
+from robot import RobotBody, RigidSphere
+from transform import TransformStore
+from registry import ObjectRegistry
+
+
+class HeadlessRenderer:
+    '''
+    Stand-in for RenderWindow used by the headless driver.
+    Objects are tracked for their transforms only; nothing is batched, so no
+    shader program, vertex list or texture is ever created.
+    '''
+    def __init__(self):
+        self.objects = ObjectRegistry()
+        self.instanced = []
+
+    def fixed_update(self, dt) -> None:
+        pass
+
+    def load_texture(self, path:str):
+        return None
+
+    def add_object(self, object):
+        self.objects.add(object)
+
+    def add_instanced(self, mesh):
+        self.instanced.append(mesh)
+
+    def add_interpolated(self, state):
+        # steps are never drawn in between
+        pass
+
+    def update(self, dt) -> None:
+        for object in self.objects:
+            if object.deleted:
+                self.objects.remove(self.objects.handle(object))
+        self.objects.flush()
+        Object3D.store.update()
+
+
+class ScriptedControl:
+    """
+    Replaces Control with a timed script of inputs.
+    Each event is (time, name, value): "cursor" and "target" set the
+    corresponding Vec3, any other name is pushed to the command queue.
+    """
+    def __init__(self, script:list[tuple] = ()):
+        self.script = sorted(script, key=lambda event: event[0])
+        self.cursor_index = 0
+        self.setup()
+
+    def __getitem__(self, key):
+        return self.data.get(key, False)
+
+    def __getattr__(self, name):
+        return self.data.get(name, False)
+
+    def setup(self):
+        self.data = {
+            "cursor": Vec3(),
+            "target": Vec3()
+        }
+        self.command_queue = []
+
+    def advance(self, t:float):
+        while self.cursor_index < len(self.script) and self.script[self.cursor_index][0] <= t:
+            _, name, value = self.script[self.cursor_index]
+            if name in ("cursor", "target"):
+                self.data[name] = Vec3(*value)
+            else:
+                self.command_queue.append(name)
+            self.cursor_index += 1
+
+
+def random_script(seed:int, duration:float, area:float = 10.0, fire_interval:float = 0.2) -> list[tuple]:
+    '''
+    Random walk & shoot scenario: a new target/cursor every second and a shot every fire_interval.
+    '''
+    rng = np.random.default_rng(seed)
+    script = []
+    for t in np.arange(0.0, duration, 1.0):
+        script.append((t, "target", (rng.uniform(-area, area), 0, rng.uniform(-area, area))))
+        script.append((t, "cursor", (rng.uniform(-area, area), 0, rng.uniform(-area, area))))
+    if fire_interval > 0:
+        for t in np.arange(0.0, duration, fire_interval):
+            script.append((t, "attack", None))
+    return script
+
+
+class HeadlessSimulation:
+    '''
+    Steps Engine.fixed_update (and with it procedural_animate) in a tight loop,
+    as fast as the CPU allows, with a constant dt.
+    controller replaces the ScriptedControl of script; it is advanced with the
+    simulated time before every step. seed makes the bullet colors reproducible.
+    Every simulation starts from an empty scene: the transform store, the
+    projectile pool, collisions, trails and robot ids of the previous one in
+    the same process are dropped.
+    '''
+    def __init__(self, script:list[tuple] = (), dt:float = 1/120, controller = None, seed:int = None):
+        self.dt = dt
+        self.time = 0.0
+        self.steps = 0
+        Object3D.store = TransformStore()
+        RigidSphere.reset(seed)
+        RobotBody.count = 0
+        self.renderer = HeadlessRenderer()
+        self.controller = controller if controller is not None else ScriptedControl(script)
+        self.engine = Engine(self.renderer, self.controller)
+        self.renderer.update(0)
+
+    def step(self):
+        self.controller.advance(self.time)
+        self.renderer.fixed_update(self.dt)
+        # world transforms are needed by the next step (e.g. weapon muzzle position)
+        self.renderer.update(self.dt)
+        self.time += self.dt
+        self.steps += 1
+
+    def run(self, steps:int) -> dict:
+        start = time.perf_counter()
+        for _ in range(steps):
+            self.step()
+        elapsed = time.perf_counter() - start
+        return {
+            "steps": steps,
+            "sim_time": steps * self.dt,
+            "wall_time": elapsed,
+            "steps_per_sec": steps / elapsed if elapsed > 0 else float("inf"),
+        }
+
+    def close(self):
+        '''
+        Delete the engine's robot and scene, with their colliders
+        '''
+        self.engine.delete()
+        self.renderer.update(0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the robot simulation without a window.")
+    parser.add_argument("--steps", type=int, default=12000, help="fixed steps per scenario")
+    parser.add_argument("--dt", type=float, default=1/120, help="fixed step length in seconds")
+    parser.add_argument("--scenarios", type=int, default=1, help="number of random scenarios")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fire-interval", type=float, default=0.2, help="seconds between shots, 0 to disable")
+    args = parser.parse_args()
+
+    total_steps = 0
+    total_time = 0.0
+    for i in range(args.scenarios):
+        script = random_script(args.seed + i, args.steps * args.dt, fire_interval=args.fire_interval)
+        simulation = HeadlessSimulation(script, args.dt, seed=args.seed + i)
+        stats = simulation.run(args.steps)
+        simulation.close()
+        total_steps += stats["steps"]
+        total_time += stats["wall_time"]
+        print(f"scenario {i}: {stats['steps']} steps, {stats['sim_time']:.1f}s simulated "
+              f"in {stats['wall_time']:.2f}s ({stats['steps_per_sec']:.0f} steps/s)")
+    print(f"total: {total_steps} steps in {total_time:.2f}s ({total_steps / total_time:.0f} steps/s)")
@@ -0,0 +1,136 @@
+import numpy as np
+from pyglet.gl import *
+from pyglet.graphics.vertexarray import VertexArray
+
+import shader.shader as shader
+from geometry import Geometry
+from geometry.geom import index_dtype
+from object import gl_index_types
+from stats import frame_stats
+
+
+class InstancedMesh:
+    '''
+    Draws every instance of one geometry with a single glDrawElementsInstanced call.
+    The geometry is uploaded once; a per-instance buffer of (offset.xyz, scale, rgba)
+    is refilled from `source` every frame. GL objects are created in `create`,
+    so building an InstancedMesh without a GL context is free.
+    '''
+    instance_floats = 8
+
+    def __init__(self, geometry: Geometry, source, capacity: int = 256):
+        self.geometry = geometry
+        self.source = source
+        self.capacity = capacity
+        self.count = 0
+        self.shader_program = None
+        self.vao = None
+        self.deleted = False
+        # FrustumCuller set by the renderer, None draws every instance
+        self.culler = None
+        self.sphere = geometry.bounding_sphere()
+
+    def create(self):
+        self.shader_program = shader.get_program(
+            shader.vertex_source_instanced,
+            shader.fragment_source_instanced
+        )
+        geo = self.geometry
+        n = len(geo.vertices) // 3
+        normals = geo.normals if geo.normals is not None else np.zeros(n * 3)
+        uvs = geo.uvs if geo.uvs is not None else np.zeros(n * 2)
+        vertex_data = np.hstack([
+            np.asarray(geo.vertices, dtype=np.float32).reshape(-1, 3),
+            np.asarray(normals, dtype=np.float32).reshape(-1, 3),
+            np.asarray(uvs, dtype=np.float32).reshape(-1, 2),
+        ])
+        vertex_data = np.ascontiguousarray(vertex_data, dtype=np.float32)
+        dtype = index_dtype(n)
+        if geo.indices is not None:
+            index_data = np.asarray(geo.indices, dtype=dtype)
+        else:
+            index_data = np.arange(n, dtype=dtype)
+        index_data = np.ascontiguousarray(index_data)
+        self.index_type = gl_index_types[dtype]
+        self.index_count = len(index_data)
+
+        self.vao = VertexArray()
+        self.vao.bind()
+
+        self.vertex_buffer = self._create_buffer(GL_ARRAY_BUFFER, vertex_data, GL_STATIC_DRAW)
+        stride = 8 * 4
+        for location, size, offset in ((0, 3, 0), (1, 3, 3), (2, 2, 6)):
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, size, GL_FLOAT, GL_FALSE, stride, offset * 4)
+
+        self.instance_data = np.zeros((self.capacity, self.instance_floats), dtype=np.float32)
+        self.instance_buffer = self._create_buffer(GL_ARRAY_BUFFER, self.instance_data, GL_DYNAMIC_DRAW)
+        stride = self.instance_floats * 4
+        for location, offset in ((3, 0), (4, 4)):
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, 4, GL_FLOAT, GL_FALSE, stride, offset * 4)
+            glVertexAttribDivisor(location, 1)
+
+        self.index_buffer = self._create_buffer(GL_ELEMENT_ARRAY_BUFFER, index_data, GL_STATIC_DRAW)
+
+        self.vao.unbind()
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    @staticmethod
+    def _create_buffer(target, data: np.ndarray, usage) -> GLuint:
+        buffer = GLuint()
+        glGenBuffers(1, buffer)
+        glBindBuffer(target, buffer)
+        glBufferData(target, data.nbytes, data.ctypes.data, usage)
+        return buffer
+
+    def update(self):
+        '''
+        Pull (offsets, scales, colors) from the source and upload them.
+        '''
+        offsets, scales, colors = self.source()
+        if self.culler is not None:
+            visible = self.culler.instance_mask(self.sphere, offsets, scales)
+            offsets, scales, colors = offsets[visible], scales[visible], colors[visible]
+        self.upload(offsets, scales, colors)
+
+    def upload(self, offsets, scales, colors):
+        '''
+        Upload per-instance data. The instance buffer doubles in size when it runs out of room.
+        '''
+        self.count = len(offsets)
+        if self.count == 0:
+            return
+        if self.count > self.capacity:
+            while self.capacity < self.count:
+                self.capacity *= 2
+            self.instance_data = np.zeros((self.capacity, self.instance_floats), dtype=np.float32)
+            glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+            glBufferData(GL_ARRAY_BUFFER, self.instance_data.nbytes, None, GL_DYNAMIC_DRAW)
+        data = self.instance_data[:self.count]
+        data[:, 0:3] = offsets
+        data[:, 3] = scales
+        data[:, 4:8] = colors
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data.ctypes.data)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self):
+        if self.count == 0:
+            return
+        self.shader_program.use()
+        self.vao.bind()
+        glDrawElementsInstanced(GL_TRIANGLES, self.index_count, self.index_type, None, self.count)
+        self.vao.unbind()
+        self.shader_program.stop()
+        frame_stats.add('triangles', self.index_count // 3 * self.count)
+
+    def delete(self):
+        self.deleted = True
+        if self.vao is None:
+            return
+        for buffer in (self.vertex_buffer, self.instance_buffer, self.index_buffer):
+            glDeleteBuffers(1, buffer)
+        self.vao.delete()
+        self.vao = None
+        self.shader_program = None
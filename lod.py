@@ -0,0 +1,212 @@
+import numpy as np
+import pyglet
+from pyglet.math import Vec4
+
+from geometry import Geometry, get_geometry
+from instancing import InstancedMesh
+from object import Object3D
+from stats import frame_stats
+
+
+def bounding_radius(geometry: Geometry) -> float:
+    '''
+    Radius of the sphere around the local origin that holds every vertex
+    '''
+    vertices = np.asarray(geometry.vertices, dtype=np.float64).reshape(-1, 3)
+    return float(np.sqrt(np.max(np.sum(vertices**2, axis=1))))
+
+
+class LODGeometry:
+    '''
+    Tessellation levels of one parametric geometry, finest first.
+    `levels` is a list of (min_radius, detail kwargs): level i is used while the
+    projected bounding radius is at least min_radius pixels. The last level
+    should have min_radius 0. Levels are built through the geometry cache, e.g.
+    LODGeometry(Sphere, SPHERE_LEVELS, radius=0.3)
+    '''
+    def __init__(self, cls: type, levels: list[tuple[float, dict]], **kwargs):
+        self.geometries = [get_geometry(cls, **kwargs, **detail) for _, detail in levels]
+        self.min_radius = np.array([min_radius for min_radius, _ in levels], dtype=np.float64)
+        # level i is used below max_radius[i] (i.e. above it level i-1 is finer)
+        self.max_radius = np.concatenate([[np.inf], self.min_radius[:-1]])
+        self.radius = bounding_radius(self.geometries[0])
+
+    def __len__(self):
+        return len(self.geometries)
+
+    def select(self, screen_radius: np.ndarray, previous: np.ndarray, hysteresis: float) -> np.ndarray:
+        '''
+        Level for each screen radius (pixels). A level is only left once the radius
+        is `hysteresis` (relative) beyond its band, so objects near a threshold do not pop.
+        '''
+        level = np.searchsorted(-self.min_radius, -screen_radius, side='left')
+        level = np.minimum(level, len(self) - 1)
+        if previous is None:
+            return level
+        keep = ((screen_radius >= self.min_radius[previous] * (1 - hysteresis)) &
+                (screen_radius < self.max_radius[previous] * (1 + hysteresis)))
+        return np.where(keep, previous, level)
+
+
+# (min projected radius in pixels, detail)
+SPHERE_LEVELS = [
+    (48, dict(widthSegments=32, heightSegments=16)),
+    (16, dict(widthSegments=16, heightSegments=8)),
+    (0, dict(widthSegments=8, heightSegments=6)),
+]
+CYLINDER_LEVELS = [
+    (64, dict(radialSegments=32)),
+    (24, dict(radialSegments=16)),
+    (0, dict(radialSegments=8)),
+]
+
+
+class LODObject(Object3D):
+    '''
+    Object3D drawing one level of a LODGeometry.
+    Every level gets its own group (sharing the object's transform node);
+    only the group of the current level is visible.
+    '''
+    def __init__(self, lod: LODGeometry, texture: pyglet.image.Texture = None, color: Vec4 = Vec4(255,0,0,255)):
+        super().__init__(lod.geometries[0], texture, color)
+        self.lod = lod
+        self.level = 0
+        self.groups = []
+
+    def set_batch(self, batch: pyglet.graphics.Batch):
+        self.groups = [self.make_group(geometry, batch) for geometry in self.lod.geometries]
+        for group in self.groups:
+            group.visible = False
+        self.group = self.groups[self.level]
+        self.group.visible = not self.culled
+
+    def set_level(self, level: int):
+        if level == self.level:
+            return
+        self.level = level
+        self.geometry = self.lod.geometries[level]
+        if not self.groups:
+            return
+        self.group.visible = False
+        self.group = self.groups[level]
+        self.group.visible = not self.culled
+        frame_stats.add('lod_switches')
+
+    def delete(self):
+        groups, self.groups = self.groups, []
+        for group in groups:
+            if group is not self.group:
+                group.vlist.delete()
+                group.visible = False
+        super().delete()
+
+
+class LODInstancedMesh:
+    '''
+    InstancedMesh with one instanced draw per LOD level.
+    Instances are sorted into levels every frame by their projected radius
+    (bounding radius times instance scale). If `ids` is given it returns a
+    stable id per instance (e.g. a pool slot), which keeps hysteresis per instance.
+    '''
+    def __init__(self, lod: LODGeometry, source, ids = None, capacity: int = 256):
+        self.lod = lod
+        self.source = source
+        self.ids = ids
+        self.meshes = [InstancedMesh(geometry, None, capacity) for geometry in lod.geometries]
+        self.sphere = lod.geometries[0].bounding_sphere()
+        self.levels = np.zeros(0, dtype=np.int64)
+        self.system: LODSystem = None
+        self.culler = None
+        self.deleted = False
+
+    def create(self):
+        for mesh in self.meshes:
+            mesh.create()
+
+    def update(self):
+        offsets, scales, colors = self.source()
+        offsets = np.asarray(offsets)
+        scales = np.asarray(scales)
+        colors = np.asarray(colors)
+        ids = self.ids() if self.ids is not None else None
+        if self.culler is not None:
+            visible = self.culler.instance_mask(self.sphere, offsets, scales)
+            offsets, scales, colors = offsets[visible], scales[visible], colors[visible]
+            if ids is not None:
+                ids = ids[visible]
+        radius = self.system.screen_radius(offsets, self.lod.radius * scales)
+        if ids is None:
+            level = self.lod.select(radius, None, self.system.hysteresis)
+        else:
+            if len(ids) and ids.max() >= len(self.levels):
+                grown = np.zeros(max(2 * len(self.levels), ids.max() + 1), dtype=np.int64)
+                grown[:len(self.levels)] = self.levels
+                self.levels = grown
+            level = self.lod.select(radius, self.levels[ids], self.system.hysteresis)
+            self.levels[ids] = level
+        for i, mesh in enumerate(self.meshes):
+            m = level == i
+            mesh.upload(offsets[m], scales[m], colors[m])
+
+    def draw(self):
+        for mesh in self.meshes:
+            mesh.draw()
+
+    def delete(self):
+        self.deleted = True
+        for mesh in self.meshes:
+            mesh.delete()
+
+
+class LODSystem:
+    '''
+    Picks the level of every LODObject once per frame, vectorized per LODGeometry.
+    The projected radius of a bounding sphere is r * proj[1][1] / w * (viewport height / 2),
+    with w the clip-space w of its center, so it holds for both the orthographic
+    and the perspective projection of RenderWindow.calc_matrices.
+    '''
+    def __init__(self, hysteresis: float = 0.15):
+        self.hysteresis = hysteresis
+        self.objects: dict[LODGeometry, list[LODObject]] = {}
+        self.view_proj = np.eye(4)
+        self.pixel_scale = 1.0
+
+    def set_camera(self, view_proj, proj, viewport_height: int):
+        '''
+        view_proj and proj are Mat4 (column-major)
+        '''
+        self.view_proj = np.array(view_proj, dtype=np.float64).reshape(4, 4)
+        self.pixel_scale = proj[5] * viewport_height / 2
+
+    def add(self, object: LODObject|LODInstancedMesh):
+        if isinstance(object, LODInstancedMesh):
+            object.system = self
+        else:
+            self.objects.setdefault(object.lod, []).append(object)
+
+    def screen_radius(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        '''
+        Projected radius in pixels of spheres (centers (n,3), radii (n,))
+        '''
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+        # clip w = row 3 of view_proj applied to (center, 1); column-major, so column 3 here
+        w = centers @ self.view_proj[:3, 3] + self.view_proj[3, 3]
+        return radii * self.pixel_scale / np.maximum(np.abs(w), 1e-6)
+
+    def update(self, store):
+        '''
+        Select levels from the drawn world transforms in store (store.draw_world)
+        '''
+        for lod, objects in self.objects.items():
+            objects[:] = [object for object in objects if not object.deleted]
+            if not objects:
+                continue
+            nodes = np.array([object.node for object in objects])
+            world = store.draw_world[nodes]
+            # largest axis scale of each world matrix
+            scale = np.sqrt(np.max(np.sum(world[:, :3, :3]**2, axis=2), axis=1))
+            radius = self.screen_radius(world[:, 3, :3], lod.radius * scale)
+            previous = np.array([object.level for object in objects])
+            level = lod.select(radius, previous, self.hysteresis)
+            for i in np.flatnonzero(level != previous):
+                objects[i].set_level(int(level[i]))
@@ -1,14 +1,26 @@
 import pyglet
 from pyglet.math import Mat4, Vec3
 
+import argparse
+import time
+
 from render import RenderWindow
 from geometry.geom import *
 from control import Control
 
 from object import Object3D
 from engine import Engine
+from robot import RigidSphere
+from replay import InputRecorder
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", help="log the inputs to this file, see replay.py")
+    parser.add_argument("--seed", type=int, help="seed of the bullet colors")
+    args = parser.parse_args()
+    seed = args.seed if args.seed is not None else time.time_ns() % 2**32
+    RigidSphere.seed(seed)
+
     width = 1280
     height = 720
 
@@ -22,5 +34,14 @@ if __name__ == '__main__':
     
     # rodObj.set_translation(translate_mat1)
 
+    recorder = None
+    if args.record:
+        recorder = InputRecorder(args.record, controller, renderer.scheduler.dt, seed)
+        renderer.scheduler.before_step.append(recorder.capture)
+
     #draw shapes
-    renderer.run()
+    try:
+        renderer.run()
+    finally:
+        if recorder is not None:
+            recorder.close()
@@ -1,12 +1,17 @@
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
 
+import numpy as np
 import pyglet
 
 from pyglet.gl import GL_TRIANGLES
-from pyglet.util import asstr
 
-from .. import Model, Material, MaterialGroup, TexturedMaterialGroup
-from . import ModelDecodeException, ModelDecoder
+from pyglet.model import Model, Material, MaterialGroup, TexturedMaterialGroup
+from pyglet.model.codecs import ModelDecodeException, ModelDecoder
+from geometry import Geometry
 
 
 class Mesh:
@@ -20,6 +25,15 @@ class Mesh:
         self.tex_coords = []
         self.colors = []
 
+    def as_geometry(self):
+        """Wrap the mesh buffers in a Geometry, e.g. to draw it with Object3D."""
+        geometry = Geometry()
+        geometry.vertices = self.vertices
+        geometry.normals = self.normals
+        geometry.uvs = self.tex_coords
+        geometry.indices = self.indices
+        return geometry
+
 
 def load_material_library(filename):
     file = open(filename, 'r')
@@ -83,110 +97,593 @@ def load_material_library(filename):
     return matlib
 
 
+# The file is parsed as one byte array: lines are classified by their first
+# two bytes, records of one kind are gathered with a mask and their numbers
+# converted in bulk by NumPy, so no Python code runs per line.
+_blank = np.zeros(256, dtype=bool)
+_blank[[ord(' '), ord('\t'), ord('\r'), ord('\n')]] = True
+
+
+def _gather(buf, starts, ends):
+    """Concatenate buf[starts[i]:ends[i] + 1] (up to and including the newline) for every i."""
+    if len(starts) == 0:
+        return buf[:0]
+    # records of one kind are usually in one block, so only mask that span
+    begin, end = starts[0], ends[-1] + 1
+    mark = np.zeros(end - begin + 1, dtype=np.int8)
+    mark[np.minimum(starts, ends) - begin] += 1
+    mark[ends + 1 - begin] -= 1
+    return buf[begin:end][np.cumsum(mark[:-1], dtype=np.int8).view(bool)]
+
+
+def _tokens(text):
+    """Offsets of the whitespace separated tokens in text, and the line of each token."""
+    gap = _blank[text]
+    starts = np.flatnonzero(~gap & np.concatenate(([True], gap[:-1])))
+    return starts, np.searchsorted(np.flatnonzero(text == ord('\n')), starts)
+
+
+def _parse_floats(text, count, width):
+    """Convert `count` gathered `v`/`vn`/`vt` records to a (count, width) array."""
+    out = np.zeros((count, width), dtype=np.float32)
+    if count == 0:
+        return out
+    starts, line = _tokens(text)
+    values = np.fromstring(text.tobytes(), dtype=np.float64, sep=' ')
+    if values.size != len(starts):
+        raise ModelDecodeException('Parsing error in vertex records')
+    columns = np.bincount(line, minlength=count)
+    if columns[0] >= width and np.all(columns == columns[0]):
+        out[:] = values.reshape(count, -1)[:, :width]
+        return out
+    # rows of different lengths, e.g. optional w or vertex colors
+    first = np.cumsum(columns) - columns
+    for column in range(width):
+        present = columns > column
+        out[present, column] = values[first[present] + column]
+    return out
+
+
+def _parse_faces(text, count):
+    """Split `count` gathered `f` records into (corners, counts, face of every corner).
+
+    corners is an (n, 3) array of v/vt/vn indices, 0 where absent, and
+    counts holds the number of corners of every face.
+    """
+    text = text.tobytes().replace(b'//', b'/0/')
+    buf = np.frombuffer(text, dtype=np.uint8)
+    starts, face_of_token = _tokens(buf)
+    counts = np.bincount(face_of_token, minlength=count)
+
+    slashes = np.flatnonzero(buf == ord('/'))
+    slashes_per_token = np.bincount(np.searchsorted(starts, slashes, side='right') - 1, minlength=len(starts))
+    width = int(slashes_per_token[0]) + 1 if len(starts) else 1
+    corners = np.zeros((len(starts), 3), dtype=np.int64)
+    if width <= 3 and np.all(slashes_per_token == width - 1):
+        fields = np.fromstring(text.replace(b'/', b' '), dtype=np.int64, sep=' ')
+        if fields.size != width * len(starts):
+            raise ModelDecodeException('Parsing error in face records')
+        corners[:, :width] = fields.reshape(-1, width)
+    else:
+        # mixed v, v/vt, v//vn and v/vt/vn corners
+        try:
+            for i, token in enumerate(text.split()):
+                fields = [int(j or 0) for j in token.split(b'/')[:3]]
+                corners[i, :len(fields)] = fields
+        except ValueError as ex:
+            raise ModelDecodeException(f'Parsing error: {ex}')
+    return corners, counts, face_of_token
+
+
+def _triangulate(counts):
+    """Corner numbers of the fan triangulation (0, i-1, i) of every face."""
+    triangles = np.maximum(counts - 2, 0)
+    first = np.cumsum(counts) - counts
+    face = np.repeat(np.arange(len(counts)), triangles)
+    k = np.arange(len(face)) - np.repeat(np.cumsum(triangles) - triangles, triangles)
+    start = first[face]
+    return np.stack([start, start + k + 1, start + k + 2], axis=1).ravel()
+
+
+def _dedupe(corners, sizes, name):
+    """De-duplicate (v, vt, vn) corners: returns the distinct corners, numbered
+    in order of first use, and the index of every corner into them.
+    """
+    if len(corners) and (corners.min() < 0 or np.any(corners.max(axis=0) >= sizes)):
+        raise ModelDecodeException(f'Face index out of range in mesh "{name}"')
+    key = (corners[:, 0] * sizes[1] + corners[:, 1]) * sizes[2] + corners[:, 2]
+    _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+    return corners[first[order]], remap[inverse.ravel()].astype(np.uint32)
+
+
+def _parse_block(file_contents, read=(0, 0, 0)):
+    """Parse a block of whole OBJ lines.
+
+    Returns the block's vertices, tex_coords and normals, the (v, vt, vn)
+    corners of its triangles, and its sections: (control record or None,
+    first triangle, end triangle) in file order. Relative indices are
+    resolved against `read`, the v/vt/vn counts of earlier blocks.
+    """
+    if not file_contents.endswith(b'\n'):
+        file_contents += b'\n'
+    buf = np.frombuffer(file_contents, dtype=np.uint8)
+    ends = np.flatnonzero(buf == ord('\n'))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    first = buf[starts]
+    for line in np.flatnonzero((first == ord(' ')) | (first == ord('\t'))):
+        # rare indented records
+        text = file_contents[starts[line]:ends[line]]
+        starts[line] += len(text) - len(text.lstrip(b' \t'))
+    first = buf[starts]
+    second = buf[np.minimum(starts + 1, ends)]
+    spaced = (second == ord(' ')) | (second == ord('\t'))
+    is_vertex = (first == ord('v')) & spaced
+    is_normal = (first == ord('v')) & (second == ord('n'))
+    is_tex_coord = (first == ord('v')) & (second == ord('t'))
+    is_face = (first == ord('f')) & spaced
+
+    vertices = _parse_floats(_gather(buf, starts[is_vertex] + 2, ends[is_vertex]), np.count_nonzero(is_vertex), 3)
+    normals = _parse_floats(_gather(buf, starts[is_normal] + 3, ends[is_normal]), np.count_nonzero(is_normal), 3)
+    tex_coords = _parse_floats(_gather(buf, starts[is_tex_coord] + 3, ends[is_tex_coord]), np.count_nonzero(is_tex_coord), 2)
+
+    face_lines = np.flatnonzero(is_face)
+    corners, counts, face_of_corner = _parse_faces(_gather(buf, starts[is_face] + 2, ends[is_face]), len(face_lines))
+    if len(corners) and corners.min() < 0:
+        # relative indices count back from the records read so far
+        for column, is_record in enumerate((is_vertex, is_tex_coord, is_normal)):
+            count = np.cumsum(is_record)[face_lines][face_of_corner] + read[column]
+            relative = corners[:, column] < 0
+            corners[relative, column] += count[relative] + 1
+    triangle_corners = corners[_triangulate(counts)]
+    first_triangle = np.concatenate(([0], np.cumsum(np.maximum(counts - 2, 0))))
+
+    controls = []
+    for line in np.flatnonzero(np.isin(first, (ord('o'), ord('u'), ord('m')))):
+        values = file_contents[starts[line]:ends[line]].decode().split()
+        if len(values) > 1 and values[0] in ('o', 'usemtl', 'usemat', 'mtllib'):
+            controls.append((line, values))
+    # faces between two control records belong to the same mesh and material
+    bounds = first_triangle[np.searchsorted(face_lines, [line for line, _ in controls])]
+    bounds = np.concatenate(([0], bounds, [first_triangle[-1]]))
+    sections = [(None, bounds[0], bounds[1])]
+    sections += [(values, bounds[i + 1], bounds[i + 2]) for i, (_, values) in enumerate(controls)]
+    return vertices, tex_coords, normals, triangle_corners, sections
+
+
+class _MeshState:
+    """The mesh and material state carried from record to record.
+
+    `on_mesh` is called with every mesh as it is started.
+    """
+    def __init__(self, location, on_mesh):
+        self.location = location
+        self.on_mesh = on_mesh
+        self.materials = {}
+        self.material = None
+        self.mesh = None
+
+        diffuse = [1.0, 1.0, 1.0, 1.0]
+        ambient = [1.0, 1.0, 1.0, 1.0]
+        specular = [1.0, 1.0, 1.0, 1.0]
+        emission = [0.0, 0.0, 0.0, 1.0]
+        shininess = 100.0
+
+        self.default_material = Material("Default", diffuse, ambient, specular, emission, shininess)
+
+    def control(self, values):
+        if values[0] == 'mtllib':
+            material_abspath = os.path.join(self.location, values[1])
+            self.materials = load_material_library(filename=material_abspath)
+        elif values[0] in ('usemtl', 'usemat'):
+            self.material = self.materials.get(values[1])
+            if self.mesh is not None:
+                self.mesh.material = self.material
+        elif values[0] == 'o':
+            self.mesh = Mesh(name=values[1])
+            self.mesh.material = self.default_material
+            self.on_mesh(self.mesh)
+
+    def faces(self):
+        """The mesh that receives the next faces."""
+        if self.mesh is None:
+            self.mesh = Mesh(name='')
+            self.on_mesh(self.mesh)
+        if self.material is None:
+            self.material = self.default_material
+        if self.mesh.material is None:
+            self.mesh.material = self.material
+        return self.mesh
+
+
 def parse_obj_file(filename, file=None):
-    materials = {}
+    """Parse an OBJ file into a list of indexed meshes.
+
+    Faces are fan-triangulated and every distinct (v, vt, vn) corner becomes
+    one vertex, so mesh.vertices/normals/tex_coords are flat float32 arrays
+    and mesh.indices is a uint32 index array.
+    """
     mesh_list = []
 
     location = os.path.dirname(filename)
 
     try:
         if file is None:
-            with open(filename, 'r') as f:
+            with open(filename, 'rb') as f:
                 file_contents = f.read()
         else:
-            file_contents = asstr(file.read())
+            file_contents = file.read()
+            if isinstance(file_contents, str):
+                file_contents = file_contents.encode()
     except (UnicodeDecodeError, OSError):
         raise ModelDecodeException
 
-    material = None
-    mesh = None
+    vertices, tex_coords, normals, triangle_corners, sections = _parse_block(file_contents)
+    # index 0 (absent) refers to a zero row
+    vertices, tex_coords, normals = (np.concatenate([np.zeros((1, a.shape[1]), dtype=a.dtype), a])
+                                     for a in (vertices, tex_coords, normals))
+    sizes = [len(vertices), len(tex_coords), len(normals)]
+
+    state = _MeshState(location, mesh_list.append)
+    mesh_corners = {}
+    for values, begin, end in sections:
+        if values is not None:
+            state.control(values)
+        if begin < end:
+            mesh_corners.setdefault(id(state.faces()), []).append(triangle_corners[begin * 3:end * 3])
+
+    for mesh in mesh_list:
+        corners = mesh_corners.get(id(mesh))
+        corners = np.concatenate(corners) if corners else np.zeros((0, 3), dtype=np.int64)
+        unique, mesh.indices = _dedupe(corners, sizes, mesh.name)
+        mesh.vertices = vertices[unique[:, 0]].ravel()
+        mesh.tex_coords = tex_coords[unique[:, 1]].ravel()
+        mesh.normals = normals[unique[:, 2]].ravel()
 
-    vertices = [[0., 0., 0.]]
-    normals = [[0., 0., 0.]]
-    tex_coords = [[0., 0.]]
+    return mesh_list
 
-    diffuse = [1.0, 1.0, 1.0, 1.0]
-    ambient = [1.0, 1.0, 1.0, 1.0]
-    specular = [1.0, 1.0, 1.0, 1.0]
-    emission = [0.0, 0.0, 0.0, 1.0]
-    shininess = 100.0
 
-    default_material = Material("Default", diffuse, ambient, specular, emission, shininess)
+class _DiskArray:
+    """Append-only (rows, width) array in a raw file, read through a memory map."""
+    def __init__(self, path, dtype, width):
+        self.path = path
+        self.dtype = dtype
+        self.width = width
+        self.rows = 0
+        self.file = open(path, 'wb')
+        self._map = None
+
+    def append(self, rows):
+        rows = np.ascontiguousarray(rows, dtype=self.dtype).reshape(-1, self.width)
+        self.file.write(rows.tobytes())
+        self.rows += len(rows)
+        self._map = None
+
+    def array(self):
+        if self._map is None:
+            self.file.flush()
+            if self.rows == 0:
+                self._map = np.zeros((0, self.width), dtype=self.dtype)
+            else:
+                self._map = np.memmap(self.path, dtype=self.dtype, mode='r', shape=(self.rows, self.width))
+        return self._map
+
+    def close(self):
+        self.file.close()
+
+
+class _MeshWriter:
+    """Appends one mesh's vertex and index buffers to files, a chunk at a time.
+
+    Corners are de-duplicated within each chunk only, so memory stays
+    bounded; a vertex shared across chunks is written once per chunk.
+    """
+    def __init__(self, mesh, path):
+        self.mesh = mesh
+        self.buffers = {name: _DiskArray(f'{path}.{name}', dtype, width) for name, dtype, width in
+                        (('vertices', np.float32, 3), ('tex_coords', np.float32, 2),
+                         ('normals', np.float32, 3), ('indices', np.uint32, 1))}
+
+    def add(self, corners, records):
+        unique, indices = _dedupe(corners, [len(r) for r in records], self.mesh.name)
+        indices += self.buffers['vertices'].rows
+        self.buffers['indices'].append(indices)
+        for name, column, record in zip(('vertices', 'tex_coords', 'normals'), range(3), records):
+            # read the referenced rows in file order
+            rows = unique[:, column]
+            order = np.argsort(rows, kind='stable')
+            data = np.empty((len(rows), record.shape[1]), dtype=np.float32)
+            data[order] = record[rows[order]]
+            self.buffers[name].append(data)
+
+    def finish(self):
+        for name, buffer in self.buffers.items():
+            setattr(self.mesh, name, buffer.array().ravel())
+            buffer.close()
+        return self.mesh
+
+
+def iter_obj_file(filename, directory, chunk_size=1 << 26):
+    """Parse an OBJ file in chunks of about `chunk_size` bytes.
+
+    Yields each mesh as soon as the file moves on to the next `o` record.
+    v/vt/vn records and the meshes' vertex and index buffers are written to
+    raw files in `directory` as they are parsed, and the yielded mesh
+    arrays are read-only memory maps of those files, so memory use depends
+    on the chunk size rather than on the size of the file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    records = [_DiskArray(os.path.join(directory, f'records.{name}'), np.float32, width)
+               for name, width in (('v', 3), ('vt', 2), ('vn', 3))]
+    for record in records:
+        # index 0 (absent) refers to a zero row
+        record.append(np.zeros(record.width))
+
+    writers = []
+    done = []
+
+    def start(mesh):
+        if writers:
+            done.append(writers[-1].finish())
+        writers.append(_MeshWriter(mesh, os.path.join(directory, f'mesh{len(writers)}')))
+
+    state = _MeshState(os.path.dirname(filename), start)
+    try:
+        with open(filename, 'rb') as f:
+            rest = b''
+            while True:
+                chunk = f.read(chunk_size)
+                block = rest + chunk
+                if chunk:
+                    cut = block.rfind(b'\n') + 1
+                    block, rest = block[:cut], block[cut:]
+                if block:
+                    read = [record.rows - 1 for record in records]
+                    *parsed, triangle_corners, sections = _parse_block(block, read)
+                    for record, data in zip(records, parsed):
+                        record.append(data)
+                    for values, begin, end in sections:
+                        if values is not None:
+                            state.control(values)
+                        if begin < end:
+                            state.faces()
+                            writers[-1].add(triangle_corners[begin * 3:end * 3], [r.array() for r in records])
+                yield from done
+                done.clear()
+                if not chunk:
+                    break
+        if writers:
+            yield writers[-1].finish()
+    finally:
+        for record in records:
+            record.close()
+
+
+# Binary cache: magic, header length (uint64), JSON header, then the mesh
+# arrays, each aligned so they can be used straight from a memory map.
+CACHE_MAGIC = b'OBJMESH1'
+_cache_alignment = 64
+_cache_arrays = (('vertices', np.float32), ('normals', np.float32), ('tex_coords', np.float32), ('indices', np.uint32))
+
+
+def _source_key(filename):
+    stat = os.stat(filename)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _source_hash(filename):
+    sha = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _material_dict(material):
+    return {slot: getattr(material, slot) for slot in Material.__slots__}
+
+
+def _pack_layout(mesh_list):
+    """Offsets of every mesh array in a packed buffer, and the buffer size."""
+    offset = 0
+    meshes = []
+    for mesh in mesh_list:
+        arrays = {}
+        for name, dtype in _cache_arrays:
+            data = np.asarray(getattr(mesh, name), dtype=dtype)
+            arrays[name] = [offset, len(data)]
+            offset += -(-data.nbytes // _cache_alignment) * _cache_alignment
+        meshes.append({'name': mesh.name, 'material': _material_dict(mesh.material), 'arrays': arrays})
+    return meshes, offset
+
+
+def _pack(buffer, mesh_list, meshes):
+    """Copy mesh arrays into a uint8 buffer laid out by _pack_layout."""
+    for mesh, entry in zip(mesh_list, meshes):
+        for name, dtype in _cache_arrays:
+            offset, count = entry['arrays'][name]
+            buffer[offset:offset + count * np.dtype(dtype).itemsize].view(dtype)[:] = getattr(mesh, name)
+
+
+def _unpack(buffer, meshes):
+    """Meshes whose arrays are views of a buffer laid out by _pack_layout."""
+    mesh_list = []
+    for entry in meshes:
+        mesh = Mesh(entry['name'])
+        mesh.material = Material(**entry['material'])
+        for name, dtype in _cache_arrays:
+            offset, count = entry['arrays'][name]
+            setattr(mesh, name, buffer[offset:offset + count * np.dtype(dtype).itemsize].view(dtype))
+        mesh_list.append(mesh)
+    return mesh_list
 
-    for line in file_contents.splitlines():
 
-        if line.startswith('#'):
-            continue
-        values = line.split()
-        if not values:
-            continue
+def write_mesh_cache(path, mesh_list, source_key, source_hash):
+    """Write meshes to a binary cache file next to their source."""
+    meshes, size = _pack_layout(mesh_list)
+    header = json.dumps({
+        'mtime_ns': source_key[0], 'size': source_key[1], 'sha1': source_hash, 'meshes': meshes,
+    }).encode()
+    data_start = -(-(len(CACHE_MAGIC) + 8 + len(header)) // _cache_alignment) * _cache_alignment
+
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(CACHE_MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        f.truncate(data_start + size)
+    if size:
+        _pack(np.memmap(temp_path, dtype=np.uint8, mode='r+', offset=data_start), mesh_list, meshes)
+    os.replace(temp_path, path)
+
+
+def read_mesh_cache(path, source_key=None, source_hash=None):
+    """Map a cache file written by write_mesh_cache.
+
+    Returns None if the file is missing, corrupt or does not match the
+    source: the mtime/size key is tried first, the content hash second.
+    The returned mesh arrays are read-only views of the memory map.
+    A cache that only matched by hash is rewritten with the new key.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                return None
+            header_size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            header = json.loads(f.read(header_size))
+    except (OSError, ValueError, IndexError):
+        return None
+    stale_key = source_key is not None and (header['mtime_ns'], header['size']) != tuple(source_key)
+    if stale_key and (source_hash is None or header['sha1'] != source_hash()):
+        return None
+
+    data_start = -(-(len(CACHE_MAGIC) + 8 + header_size) // _cache_alignment) * _cache_alignment
+    mesh_list = _unpack(np.memmap(path, dtype=np.uint8, mode='r')[data_start:], header['meshes'])
+    if stale_key:
+        # same content under a new mtime (e.g. a fresh checkout): re-key the cache
+        try:
+            write_mesh_cache(path, mesh_list, source_key, header['sha1'])
+        except OSError:
+            pass
+    return mesh_list
 
-        if values[0] == 'v':
-            vertices.append(list(map(float, values[1:4])))
-        elif values[0] == 'vn':
-            normals.append(list(map(float, values[1:4])))
-        elif values[0] == 'vt':
-            tex_coords.append(list(map(float, values[1:3])))
 
-        elif values[0] == 'mtllib':
-            material_abspath = os.path.join(location, values[1])
-            materials = load_material_library(filename=material_abspath)            
+def load_obj_file(filename, cache=True):
+    """parse_obj_file with a binary cache (`<filename>.meshcache`).
+
+    Repeat loads map the cached buffers instead of parsing. The cache is
+    rebuilt when the source's size and mtime change and its content hash
+    no longer matches; it is skipped if the directory is not writable.
+    """
+    if not cache:
+        return parse_obj_file(filename)
+    path = filename + '.meshcache'
+    source_key = _source_key(filename)
+    mesh_list = read_mesh_cache(path, source_key, lambda: _source_hash(filename))
+    if mesh_list is not None:
+        return mesh_list
+    mesh_list = parse_obj_file(filename)
+    try:
+        write_mesh_cache(path, mesh_list, source_key, _source_hash(filename))
+    except OSError:
+        pass
+    return mesh_list
 
-        elif values[0] in ('usemtl', 'usemat'):
-            material = materials.get(values[1])
-            if mesh is not None:
-                mesh.material = material
 
-        elif values[0] == 'o':
-            mesh = Mesh(name=values[1])
-            mesh.material = default_material
-            mesh_list.append(mesh)
-
-        elif values[0] == 'f':
-            if mesh is None:
-                mesh = Mesh(name='')
-                mesh_list.append(mesh)
-            if material is None:
-                material = default_material
-            if mesh.material is None:
-                mesh.material = material
-
-            # For fan triangulation, remember first and latest vertices
-            n1 = None
-            nlast = None
-            t1 = None
-            tlast = None
-            v1 = None
-            vlast = None
-
-            for i, v in enumerate(values[1:]):
-                v_i, t_i, n_i = (list(map(int, [j or 0 for j in v.split('/')])) + [0, 0])[:3]
-                if v_i < 0:
-                    v_i += len(vertices) - 1
-                if t_i < 0:
-                    t_i += len(tex_coords) - 1
-                if n_i < 0:
-                    n_i += len(normals) - 1
-
-                mesh.normals += normals[n_i]
-                mesh.tex_coords += tex_coords[t_i]
-                mesh.vertices += vertices[v_i]
-
-                if i >= 3:
-                    # Triangulate
-                    mesh.normals += n1 + nlast
-                    mesh.tex_coords += t1 + tlast
-                    mesh.vertices += v1 + vlast
-
-                if i == 0:
-                    n1 = normals[n_i]
-                    t1 = tex_coords[t_i]
-                    v1 = vertices[v_i]
-                nlast = normals[n_i]
-                tlast = tex_coords[t_i]
-                vlast = vertices[v_i]
+def _unlink_shared_memory(name):
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+def import_obj_files(filenames, workers=None, cache=True):
+    """Parse many OBJ files (and their MTL libraries) in a process pool.
+
+    Yields (filename, mesh_list) in the order the files finish. Each worker
+    packs a file's meshes into one shared memory block and sends back only
+    its layout, so no large lists are pickled; the block is copied into one
+    array in a single pass and freed, and the mesh arrays are views of that
+    array. If a file fails or the generator is closed early, the remaining
+    files are cancelled or waited for and their blocks freed. `workers`
+    defaults to the CPU count.
+    """
+    from model import obj_worker
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(obj_worker.parse_to_shared_memory, filename, cache): filename
+                   for filename in filenames}
+        consumed = set()
+        try:
+            for future in as_completed(futures):
+                consumed.add(future)
+                name, meshes = future.result()
+                block = shared_memory.SharedMemory(name=name)
+                try:
+                    buffer = np.frombuffer(block.buf, dtype=np.uint8).copy()
+                finally:
+                    block.close()
+                    block.unlink()
+                yield futures[future], _unpack(buffer, meshes)
+        finally:
+            # a worker raised or the caller stopped early: the workers gave up
+            # their blocks, so free those of the files that were never read
+            for future in futures:
+                if future in consumed or future.cancel():
+                    continue
+                try:
+                    name, _ = future.result()
+                except Exception:
+                    continue
+                _unlink_shared_memory(name)
+
+
+def load_obj_models(filenames, batch=None, group=None, workers=None, cache=True):
+    """Load many OBJ files into Models: files are parsed by import_obj_files
+    in worker processes and the main thread only creates the vertex lists.
+
+    Returns the models in the order of `filenames`.
+    """
+    if not batch:
+        batch = pyglet.graphics.Batch()
+    models = {}
+    for filename, mesh_list in import_obj_files(filenames, workers, cache):
+        models[filename] = create_model(mesh_list, batch, group)
+    return [models[filename] for filename in filenames]
+
+
+def create_model(mesh_list, batch, group=None):
+    """Upload parsed meshes into vertex lists of a Model."""
+    vertex_lists = []
+    groups = []
+
+    for mesh in mesh_list:
+        material = mesh.material
+        count = len(mesh.vertices) // 3
+        colors = np.tile(np.asarray(material.diffuse, dtype=np.float32), count)
+        if material.texture_name:
+            program = pyglet.model.get_default_textured_shader()
+            texture = pyglet.resource.texture(material.texture_name)
+            matgroup = TexturedMaterialGroup(material, program, texture, parent=group)
+            vertex_lists.append(program.vertex_list_indexed(count, GL_TRIANGLES, mesh.indices, batch, matgroup,
+                                                            position=('f', mesh.vertices),
+                                                            normals=('f', mesh.normals),
+                                                            tex_coords=('f', mesh.tex_coords),
+                                                            colors=('f', colors)))
+        else:
+            program = pyglet.model.get_default_shader()
+            matgroup = MaterialGroup(material, program, parent=group)
+            vertex_lists.append(program.vertex_list_indexed(count, GL_TRIANGLES, mesh.indices, batch, matgroup,
+                                                            position=('f', mesh.vertices),
+                                                            normals=('f', mesh.normals),
+                                                            colors=('f', colors)))
+        groups.append(matgroup)
 
-    return mesh_list
+    return Model(vertex_lists=vertex_lists, groups=groups, batch=batch)
 
 
 ###################################################
@@ -202,33 +699,12 @@ class OBJModelDecoder(ModelDecoder):
         if not batch:
             batch = pyglet.graphics.Batch()
 
-        mesh_list = parse_obj_file(filename=filename, file=file)
-
-        vertex_lists = []
-        groups = []
-
-        for mesh in mesh_list:
-            material = mesh.material
-            count = len(mesh.vertices) // 3
-            if material.texture_name:
-                program = pyglet.model.get_default_textured_shader()
-                texture = pyglet.resource.texture(material.texture_name)
-                matgroup = TexturedMaterialGroup(material, program, texture, parent=group)
-                vertex_lists.append(program.vertex_list(count, GL_TRIANGLES, batch, matgroup,
-                                                        position=('f', mesh.vertices),
-                                                        normals=('f', mesh.normals),
-                                                        tex_coords=('f', mesh.tex_coords),
-                                                        colors=('f', material.diffuse * count)))
-            else:
-                program = pyglet.model.get_default_shader()
-                matgroup = MaterialGroup(material, program, parent=group)
-                vertex_lists.append(program.vertex_list(count, GL_TRIANGLES, batch, matgroup,
-                                                        position=('f', mesh.vertices),
-                                                        normals=('f', mesh.normals),
-                                                        colors=('f', material.diffuse * count)))
-            groups.append(matgroup)
-
-        return Model(vertex_lists=vertex_lists, groups=groups, batch=batch)
+        if file is None:
+            mesh_list = load_obj_file(filename)
+        else:
+            mesh_list = parse_obj_file(filename=filename, file=file)
+
+        return create_model(mesh_list, batch, group)
 
 
 def get_decoders():
@@ -0,0 +1,31 @@
+"""Process pool side of model.obj.import_obj_files.
+
+Workers only parse, so pyglet must not create a GL context when model.obj
+imports pyglet.model. This module is imported (by reference to
+parse_to_shared_memory) before model.obj in spawned workers.
+"""
+import pyglet
+
+pyglet.options['shadow_window'] = False
+
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from model.obj import load_obj_file, _pack, _pack_layout
+
+
+def parse_to_shared_memory(filename, cache=True):
+    """Parse an OBJ file into a new shared memory block.
+
+    Returns the block name and its layout; the caller maps and unlinks it.
+    """
+    mesh_list = load_obj_file(filename, cache)
+    meshes, size = _pack_layout(mesh_list)
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    _pack(np.frombuffer(block.buf, dtype=np.uint8), mesh_list, meshes)
+    name = block.name
+    block.close()
+    # ownership passes to the caller, do not let this process' tracker unlink it
+    resource_tracker.unregister(block._name, 'shared_memory')
+    return name, meshes
@@ -3,42 +3,115 @@ from pyglet import window, app, shapes
 from pyglet.math import Mat4, Vec3, Vec4
 import math
 from pyglet.gl import *
+from pyglet.graphics.vertexdomain import IndexedVertexDomain
+import numpy as np
 
 import shader.shader as shader
+from assets import Asset
 from geometry import *
+from geometry.geom import encode_attribute, index_dtype
+from stats import frame_stats
+from transform import TransformStore
+
+# GL enums of the index types picked by index_dtype
+gl_index_types = {
+    np.uint8: GL_UNSIGNED_BYTE,
+    np.uint16: GL_UNSIGNED_SHORT,
+    np.uint32: GL_UNSIGNED_INT,
+}
+
+
+class CompactBatch(pyglet.graphics.Batch):
+    '''
+    pyglet.graphics.Batch always stores indices as GL_UNSIGNED_INT.
+    This batch gives indexed vertex lists of a group with an `index_type`
+    their own domain with that index type.
+    '''
+    def get_domain(self, indexed, instanced, mode, group, attributes):
+        index_type = getattr(group, 'index_type', GL_UNSIGNED_INT)
+        if not indexed or instanced or index_type == GL_UNSIGNED_INT:
+            return super().get_domain(indexed, instanced, mode, group, attributes)
+        if group not in self.group_map:
+            self._add_group(group)
+        domain_map = self.group_map[group]
+        # the second key field is the instance counter in Batch.get_domain, always 0 for non-instanced domains
+        key = (indexed, index_type, mode, str(attributes))
+        domain = domain_map.get(key)
+        if domain is None:
+            domain = IndexedVertexDomain(attributes, index_type)
+            domain_map[key] = domain
+            self._draw_list_dirty = True
+        return domain
+
 
 class CustomGroup(pyglet.graphics.Group):
     __totGroup__ = 0
+    # texture state shared by all groups, so unchanged state is not re-sent
+    bound_texture = None
+    configured_textures = set()
     '''
     To draw multiple 3D shapes in Pyglet, you should make a group for an object.
     '''
 
-    def __init__(self, texture:pyglet.image.Texture = None):
+    def __init__(self, texture:pyglet.image.Texture|Asset = None):
         super().__init__(CustomGroup.__totGroup__)
         CustomGroup.__totGroup__ += 1
         self.texture = texture
         '''
-        Create shader program for each shape
+        The shader program is shared by every group; per-object state
+        (model, color, textured) is uploaded in set_state
         '''
-        self.shader_program = shader.create_program(
+        self.shader_program = shader.get_program(
             shader.vertex_source_gouraud,
             shader.fragment_source_gouraud
         )
-        self.transform_mat = Mat4()
+        # world transform is read from node `node` of `store` (draw_world) at draw time
+        self.store: TransformStore = None
+        self.node = -1
+        self.color = Vec4(1,0,0,1)
         self.vlist = None
-        self.shader_program.use()
+        # index type of the vertex list (honoured by CompactBatch)
+        self.index_type = GL_UNSIGNED_INT
+        self.triangles = 0
+
+    @staticmethod
+    def reset_state_cache():
+        '''
+        Forget the bound texture, e.g. at the start of a frame
+        '''
+        CustomGroup.bound_texture = None
+
+    @staticmethod
+    def forget_texture(texture_id:int):
+        '''
+        Drop the cached state of a deleted texture; GL may reuse its id
+        '''
+        CustomGroup.configured_textures.discard(texture_id)
+        if CustomGroup.bound_texture == texture_id:
+            CustomGroup.bound_texture = None
 
     def set_state(self):
         self.shader_program.use()
-        model = self.transform_mat
-        self.shader_program['model'] = model
-        self.shader_program['textured'] = self.texture is not None
+        frame_stats.add('triangles', self.triangles)
+        # an asset that is still loading draws untextured until it arrives
+        texture = self.texture.value if isinstance(self.texture, Asset) else self.texture
+        model = self.store.draw_world[self.node].ravel().tolist()
+        shader.set_uniform(self.shader_program, 'model', model)
+        shader.set_uniform(self.shader_program, 'color', self.color)
+        shader.set_uniform(self.shader_program, 'textured', texture is not None)
         
-        if(self.texture is not None):
+        if(texture is not None and texture.id != CustomGroup.bound_texture):
             glActiveTexture(GL_TEXTURE0)
-            glTexParameterf(GL_TEXTURE_2D,GL_TEXTURE_MIN_FILTER,GL_NEAREST)
-            glTexParameterf(GL_TEXTURE_2D,GL_TEXTURE_MAG_FILTER,GL_NEAREST)
-            glBindTexture(self.texture.target, self.texture.id)
+            glBindTexture(texture.target, texture.id)
+            if texture.id not in CustomGroup.configured_textures:
+                # filters are per-texture state, set them once
+                glTexParameterf(GL_TEXTURE_2D,GL_TEXTURE_MIN_FILTER,GL_NEAREST)
+                glTexParameterf(GL_TEXTURE_2D,GL_TEXTURE_MAG_FILTER,GL_NEAREST)
+                # tiled geometry (Plane) uses uvs beyond [0, 1]
+                glTexParameteri(GL_TEXTURE_2D,GL_TEXTURE_WRAP_S,GL_REPEAT)
+                glTexParameteri(GL_TEXTURE_2D,GL_TEXTURE_WRAP_T,GL_REPEAT)
+                CustomGroup.configured_textures.add(texture.id)
+            CustomGroup.bound_texture = texture.id
 
     def unset_state(self):
         self.shader_program.stop()
@@ -53,58 +126,89 @@ class CustomGroup(pyglet.graphics.Group):
 
 
 class Object3D:
-    def __init__(self, geometry: Geometry, texture: pyglet.image.Texture = None, color: Vec4 = Vec4(255,0,0,255)):
-        self.group = CustomGroup(texture=texture)
+    # world transforms of all objects live in one flat array-backed store
+    store = TransformStore()
+
+    def __init__(self, geometry: Geometry, texture: pyglet.image.Texture|Asset = None, color: Vec4 = Vec4(255,0,0,255)):
+        '''
+        The group (and its shader program) is created in set_batch, so objects
+        that are never added to a renderer do not touch OpenGL at all.
+        '''
+        self.group: CustomGroup = None
+        self.texture = texture
         self.color = color
         self.geometry = geometry
         self.parent: Object3D = None
         self.children: list[Object3D] = []
         self.translate_mat: Mat4 = Mat4()
         self.rotation_mat: Mat4 = Mat4()
+        self.node = Object3D.store.allocate()
+        self.deleted = False
+        # set by FrustumCuller while the object is outside the view
+        self.culled = False
 
     def set_batch(self, batch: pyglet.graphics.Batch):
+        self.group = self.make_group(self.geometry, batch)
+
+    def make_group(self, geometry: Geometry, batch: pyglet.graphics.Batch) -> CustomGroup:
+        '''
+        A group drawing geometry with this object's transform, texture and color
+        '''
+        group = CustomGroup(texture=self.texture)
+        group.store = Object3D.store
+        group.node = self.node
         glLineWidth(10)
-        count = len(self.geometry.vertices)//3
+        count = len(geometry.vertices)//3
         args = {
             'count':count,
             'mode':GL_TRIANGLES,
             'batch':batch,
-            'group':self.group,
-            'vertices':('f', self.geometry.vertices),
+            'group':group,
+            'vertices':('f', geometry.vertices),
         }
-        if self.geometry.normals is not None:
-            args['normals']=('f', self.geometry.normals)
-        if self.geometry.uvs is not None:
-            args['uvs']=('f', self.geometry.uvs)
-            
-        if self.geometry.indices is not None:
-            args['indices']=self.geometry.indices
-            self.group.vlist = self.group.shader_program.vertex_list_indexed(**args)
+        if geometry.normals is not None:
+            args['normals']=(geometry.normal_format, encode_attribute(geometry.normals, geometry.normal_format))
+        if geometry.uvs is not None:
+            args['uvs']=(geometry.uv_format, encode_attribute(geometry.uvs, geometry.uv_format))
+        frame_stats.add('upload_bytes', geometry.upload_size())
+
+        if geometry.indices is not None:
+            # smallest index type for this vertex count
+            group.index_type = gl_index_types[index_dtype(count)]
+            args['indices']=geometry.indices
+            group.vlist = group.shader_program.vertex_list_indexed(**args)
+            group.triangles = len(geometry.indices)//3
         else:
-            self.group.vlist = self.group.shader_program.vertex_list(**args)
-        self.group.shader_program['color'] = self.color/255
+            group.vlist = group.shader_program.vertex_list(**args)
+            group.triangles = count//3
+        group.color = self.color/255
+        return group
+
+    @property
+    def transform_mat(self) -> Mat4:
+        '''
+        World transform as of the last TransformStore.update
+        '''
+        return Mat4(Object3D.store.world[self.node].ravel().tolist())
 
     def set_position(self, position: Vec3):
         self.translate_mat = Mat4.from_translation(vector=position)
+        Object3D.store.set_translation(self.node, position)
         
     def set_rotation(self, rotation: Mat4):
         self.rotation_mat = rotation
+        Object3D.store.set_rotation(self.node, rotation)
         
     def add_child(self, object):
         self.children.append(object)
         object.parent = self
+        Object3D.store.set_parent(object.node, self.node)
         
     def delete(self):
-        self.group.shader_program.delete()
-        self.group.shader_program = None
+        self.deleted = True
+        Object3D.store.free(self.node)
+        if self.group is None:
+            return
+        self.group.vlist.delete()
         self.group.visible = False
         self.group = None
-        
-    def calc_transform_mat(self):
-        parent_transform_mat = Mat4()
-        if self.parent is not None:
-            parent_transform_mat = self.parent.group.transform_mat
-        
-        self.group.transform_mat = parent_transform_mat @ self.translate_mat @ self.rotation_mat
-        for child in self.children:
-            child.calc_transform_mat()
@@ -6,6 +6,7 @@ from pyglet.gl import *
 
 import shader.shader as shader
 from object import Object3D
+from stats import frame_stats
 
 class CustomLineGroup(pyglet.graphics.Group):
     __totGroup__ = 0
@@ -16,18 +17,19 @@ class CustomLineGroup(pyglet.graphics.Group):
     def __init__(self):
         super().__init__(CustomLineGroup.__totGroup__)
         CustomLineGroup.__totGroup__ += 1
-        self.shader_program = shader.create_program(
+        self.shader_program = shader.get_program(
             shader.vertex_source_simple,
             shader.fragment_source_simple
         )
         self.transform_mat = Mat4()
+        self.color = Vec4(1,0,0,1)
         self.vlist = None
-        self.shader_program.use()
 
     def set_state(self):
         self.shader_program.use()
         model = self.transform_mat
-        self.shader_program['model'] = model
+        shader.set_uniform(self.shader_program, 'model', model)
+        shader.set_uniform(self.shader_program, 'color', self.color)
         glLineWidth(10)
 
     def unset_state(self):
@@ -44,15 +46,20 @@ class CustomLineGroup(pyglet.graphics.Group):
 
 class ObjectLine:
     def __init__(self, vertices: list[float], color: Vec4 = Vec4(255,0,0,255)):
-        self.group = CustomLineGroup()
+        self.group: CustomLineGroup = None
         self.color = color
         self.vertices = vertices
         self.parent: Object3D = None
         self.translate_mat: Mat4 = Mat4()
         self.rotation_mat: Mat4 = Mat4()
+        self.transform_mat: Mat4 = Mat4()
+        self.dirty = True
+        self.deleted = False
 
     def set_batch(self, batch: pyglet.graphics.Batch):
         self.batch = batch
+        self.group = CustomLineGroup()
+        self.group.transform_mat = self.transform_mat
         
         glPointSize(7)
         count = len(self.vertices)//3
@@ -64,21 +71,31 @@ class ObjectLine:
             'vertices':('f', self.vertices),
         }
         self.group.vlist = self.group.shader_program.vertex_list(**args)
-        self.group.shader_program['color'] = self.color/255
+        self.group.color = self.color/255
         
     def update(self):
+        if self.group is None:
+            return
         count = len(self.vertices)//3
         self.group.vlist.resize(count)
         self.group.vlist.set_attribute_data('vertices', self.vertices)
     
     def delete(self):
-        self.group.shader_program.delete()
-        self.group.shader_program = None
+        self.deleted = True
+        if self.group is None:
+            return
+        self.group.vlist.delete()
         self.group.visible = False
         self.group = None
         
-    def calc_transform_mat(self):
+    def calc_transform_mat(self, parent_changed: bool = False):
+        if not (self.dirty or parent_changed):
+            return
         parent_transform_mat = Mat4()
         if self.parent is not None:
-            parent_transform_mat = self.parent.group.transform_mat
-        self.group.transform_mat = parent_transform_mat @ self.translate_mat @ self.rotation_mat
+            parent_transform_mat = self.parent.transform_mat
+        self.transform_mat = parent_transform_mat @ self.translate_mat @ self.rotation_mat
+        if self.group is not None:
+            self.group.transform_mat = self.transform_mat
+        self.dirty = False
+        frame_stats.add('transforms_recomputed')
@@ -0,0 +1,194 @@
+import numpy as np
+
+from stats import frame_stats
+
+
+class ProjectilePool:
+    """
+    Structure-of-arrays storage for rigid spheres (bullets).
+    Every live projectile occupies one slot of the arrays below and the whole
+    pool is integrated with a single batched step per tick.
+    Drawing reads `draw_position`, blended by interpolate() from the
+    positions saved by snapshot().
+    Slots are handed out by acquire and returned by release. The arrays double
+    when they run out of slots, unless `recycle` is set: a full pool then
+    reuses the slot of its oldest projectile and deletes that owner, so the
+    capacity given here is all that is ever allocated.
+    """
+    def __init__(self, radius:float, gravity, drag:float, restitution:float = 0.8, capacity:int = 64, recycle:bool = False):
+        self.r = radius
+        self.g = np.array(gravity, dtype=np.float64)
+        self.d = drag
+        self.restitution = restitution
+
+        self.position = np.zeros((capacity, 3))
+        self.velocity = np.zeros((capacity, 3))
+        self.lifetime = np.zeros(capacity)
+        self.duration = np.full(capacity, np.inf)
+        self.color = np.zeros((capacity, 4))
+        self.alive = np.zeros(capacity, dtype=bool)
+        # id of whatever fired the projectile (-1: none), see CollisionWorld
+        self.source = np.full(capacity, -1, dtype=np.int64)
+        # acquisition order, the smallest live serial is the oldest projectile
+        self.serial = np.zeros(capacity, dtype=np.int64)
+        self.owners: list = [None] * capacity
+        # positions at the last snapshot, and which slots were live then
+        self.previous = np.zeros((capacity, 3))
+        self.snapped = np.zeros(capacity, dtype=bool)
+        self.blend: np.ndarray = None
+        self.recycle = recycle
+        # lifetime counters: slots acquired, served without allocating, taken from the oldest
+        self.acquired = 0
+        self.reused = 0
+        self.recycled = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.alive)
+
+    @property
+    def count(self) -> int:
+        return int(np.count_nonzero(self.alive))
+
+    @property
+    def utilization(self) -> float:
+        return self.count / self.capacity
+
+    @property
+    def draw_position(self) -> np.ndarray:
+        if self.blend is None:
+            return self.position
+        # slots acquired since the snapshot are drawn where they are
+        return np.where(self.snapped[:, None], self.blend, self.position)
+
+    def live_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.alive)
+
+    def snapshot(self):
+        '''
+        Save the current positions, before a simulation step
+        '''
+        np.copyto(self.previous, self.position)
+        self.snapped[:] = self.alive
+
+    def interpolate(self, alpha:float):
+        '''
+        draw_position = previous + alpha * (position - previous)
+        '''
+        self.blend = self.previous + alpha * (self.position - self.previous)
+
+    def _grow(self):
+        n = self.capacity
+        self.position = np.concatenate([self.position, np.zeros((n, 3))])
+        self.velocity = np.concatenate([self.velocity, np.zeros((n, 3))])
+        self.lifetime = np.concatenate([self.lifetime, np.zeros(n)])
+        self.duration = np.concatenate([self.duration, np.full(n, np.inf)])
+        self.color = np.concatenate([self.color, np.zeros((n, 4))])
+        self.alive = np.concatenate([self.alive, np.zeros(n, dtype=bool)])
+        self.source = np.concatenate([self.source, np.full(n, -1, dtype=np.int64)])
+        self.serial = np.concatenate([self.serial, np.zeros(n, dtype=np.int64)])
+        self.previous = np.concatenate([self.previous, np.zeros((n, 3))])
+        self.snapped = np.concatenate([self.snapped, np.zeros(n, dtype=bool)])
+        self.blend = None
+        self.owners += [None] * n
+
+    def _recycle_oldest(self) -> int:
+        live = self.live_slots()
+        slot = int(live[np.argmin(self.serial[live])])
+        owner = self.owners[slot]
+        if owner is not None:
+            # the owner releases its slot (and whatever else it holds)
+            owner.delete()
+        self.release(slot)
+        self.recycled += 1
+        frame_stats.add('projectiles_recycled')
+        return slot
+
+    def acquire(self, x0, v0, color = (255, 255, 255, 255), duration:float = np.inf, owner = None, source:int = -1) -> int:
+        free = np.flatnonzero(~self.alive)
+        if len(free):
+            slot = int(free[0])
+            self.reused += 1
+            frame_stats.add('allocations_avoided')
+        elif self.recycle:
+            slot = self._recycle_oldest()
+            self.reused += 1
+            frame_stats.add('allocations_avoided')
+        else:
+            slot = self.capacity
+            self._grow()
+        self.position[slot] = x0
+        self.velocity[slot] = v0
+        self.lifetime[slot] = 0.0
+        self.duration[slot] = duration
+        self.color[slot] = color
+        self.alive[slot] = True
+        self.source[slot] = source
+        self.serial[slot] = self.acquired
+        self.snapped[slot] = False
+        self.owners[slot] = owner
+        self.acquired += 1
+        return slot
+
+    def release(self, slot:int):
+        self.alive[slot] = False
+        self.owners[slot] = None
+
+    def step(self, dt:float, collisions = None, store = None) -> np.ndarray:
+        '''
+        Semi-explicit Euler step with gravity and quadratic drag, in the same
+        operation order as the former per-object RigidSphere.update.
+        The motion of each tick is swept against the ground plane and, when
+        given, the colliders of a CollisionWorld (placed by store). A sphere
+        hitting something during the tick bounces at the time of impact and
+        spends the rest of the tick moving with the reflected velocity.
+        Returns the slots whose lifetime exceeded their duration. They stay
+        alive until their owner frees them.
+        '''
+        idx = self.live_slots()
+        frame_stats.set('pool_utilization', len(idx) / self.capacity)
+        if len(idx) == 0:
+            return idx
+        x = self.position[idx]
+        v = self.velocity[idx]
+        start = x.copy()
+
+        x += v * dt
+        v_mag = np.sqrt(np.sum(v**2, axis=1))[:, None]
+        v += self.g * dt - v * v_mag**2 * self.d * dt
+
+        # time of impact as a fraction of the tick, inf for none
+        toi = np.full(len(idx), np.inf)
+        normal = np.zeros((len(idx), 3))
+        ground = (start[:, 1] >= self.r) & (x[:, 1] < self.r)
+        toi[ground] = (start[ground, 1] - self.r) / (start[ground, 1] - x[ground, 1])
+        normal[ground, 1] = 1
+        box = np.full(len(idx), -1, dtype=np.int64)
+        if collisions is not None:
+            box_toi, box_normal, box = collisions.sweep(self, store, idx, start, x)
+            first = box_toi < toi
+            toi[first] = box_toi[first]
+            normal[first] = box_normal[first]
+            box[~first] = -1
+
+        hit = toi <= 1
+        if np.any(hit):
+            t = toi[hit, None]
+            n = normal[hit]
+            reflected = v[hit] - n * ((1 + self.restitution) * np.minimum(np.sum(v[hit] * n, axis=1), 0))[:, None]
+            x[hit] = start[hit] + (x[hit] - start[hit]) * t + reflected * (1 - t) * dt
+            v[hit] = reflected
+            frame_stats.add('swept_hits', int(np.count_nonzero(hit)))
+
+        # spheres that started below the ground or were bounced into it
+        below = x[:, 1] < self.r
+        bounce = below & (v[:, 1] < 0)
+        v[bounce, 1] *= -self.restitution
+        x[below, 1] = self.r
+
+        self.position[idx] = x
+        self.velocity[idx] = v
+        self.lifetime[idx] += dt
+        if collisions is not None and np.any(box >= 0):
+            collisions.dispatch_box_hits(idx[box >= 0], box[box >= 0])
+        return idx[self.lifetime[idx] > self.duration[idx]]
@@ -0,0 +1,89 @@
+class ObjectRegistry:
+    """
+    Scene objects with stable handles and O(1) removal.
+    Objects live in a dense list, so iterating is a plain list walk (in no
+    particular order). A handle (slot, generation) names a slot and its generation,
+    so a handle kept past its object's removal never finds the object that
+    later reuses the slot.
+    remove() only queues; flush() applies the queued removals between frames
+    by moving the last dense entry into the hole, which makes it safe to
+    remove objects while iterating.
+    """
+    def __init__(self):
+        self.dense: list = []
+        self.dense_slots: list[int] = []
+        # per slot: dense position (-1 when free) and generation
+        self.index: list[int] = []
+        self.generation: list[int] = []
+        self.free_slots: list[int] = []
+        self.handles: dict[int, tuple[int, int]] = {}
+        self.pending: list[tuple[int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.dense)
+
+    def __iter__(self):
+        return iter(self.dense)
+
+    def __getitem__(self, position:int):
+        return self.dense[position]
+
+    def __contains__(self, object) -> bool:
+        return id(object) in self.handles
+
+    def add(self, object) -> tuple[int, int]:
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = len(self.index)
+            self.index.append(-1)
+            self.generation.append(0)
+        self.index[slot] = len(self.dense)
+        self.dense.append(object)
+        self.dense_slots.append(slot)
+        handle = (slot, self.generation[slot])
+        self.handles[id(object)] = handle
+        return handle
+
+    def get(self, handle:tuple[int, int]):
+        '''
+        The object of handle, None once it was removed
+        '''
+        slot, generation = handle
+        if generation != self.generation[slot] or self.index[slot] < 0:
+            return None
+        return self.dense[self.index[slot]]
+
+    def handle(self, object) -> tuple[int, int]:
+        return self.handles[id(object)]
+
+    def remove(self, handle:tuple[int, int]):
+        '''
+        Queue the removal of handle's object, applied by the next flush
+        '''
+        self.pending.append(handle)
+
+    def flush(self) -> list:
+        '''
+        Apply queued removals; returns the removed objects
+        '''
+        removed = []
+        for handle in self.pending:
+            object = self.get(handle)
+            if object is None:
+                continue
+            slot = handle[0]
+            position = self.index[slot]
+            last = self.dense.pop()
+            last_slot = self.dense_slots.pop()
+            if last_slot != slot:
+                self.dense[position] = last
+                self.dense_slots[position] = last_slot
+                self.index[last_slot] = position
+            self.index[slot] = -1
+            self.generation[slot] += 1
+            self.free_slots.append(slot)
+            del self.handles[id(object)]
+            removed.append(object)
+        self.pending.clear()
+        return removed
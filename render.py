@@ -7,8 +7,16 @@ from pyglet.gl import GL_TRIANGLES
 from pyglet.math import Mat4, Vec3, Vec4
 from pyglet.gl import *
 
-from object import Object3D
+import shader.shader as shader
+from object import Object3D, CustomGroup, CompactBatch
 from object_line import ObjectLine
+from instancing import InstancedMesh
+from lod import LODSystem, LODObject, LODInstancedMesh
+from culling import FrustumCuller
+from assets import Asset, AssetManager
+from registry import ObjectRegistry
+from scheduler import FixedStepScheduler
+from stats import frame_stats, count_gl_calls
 
 class RenderWindow(pyglet.window.Window):
     '''
@@ -16,7 +24,9 @@ class RenderWindow(pyglet.window.Window):
     '''
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.batch = pyglet.graphics.Batch()
+        # frame_stats 'gl_calls': every GL call, including pyglet's
+        count_gl_calls()
+        self.batch = CompactBatch()
         '''
         View (camera) parameters
         '''
@@ -38,7 +48,16 @@ class RenderWindow(pyglet.window.Window):
         self.dir_light = Vec3(-10, 12, 8).normalize()
         self.dot_light = Vec3(2, 3, 1)
         
-        self.objects: list[Object3D] = []
+        self.objects = ObjectRegistry()
+        self.instanced: list[InstancedMesh] = []
+        self.assets = AssetManager()
+        self.lod = LODSystem()
+        self.culler = FrustumCuller()
+        '''
+        Simulation: fixed_update at a constant 1/120 s, drawn interpolated
+        '''
+        self.scheduler = FixedStepScheduler(lambda dt: self.fixed_update(dt), dt=1/120, max_steps=8)
+        self.add_interpolated(Object3D.store)
         self.setup()
 
 
@@ -74,44 +93,98 @@ class RenderWindow(pyglet.window.Window):
         
         # 2. Calc a view_proj matrix
         self.view_proj = self.proj_mat @ self.view_mat
+        self.lod.set_camera(self.view_proj, self.proj_mat, self.get_framebuffer_size()[1])
+        self.culler.set_camera(self.view_proj)
 
     def on_draw(self) -> None:
         self.clear()
+        CustomGroup.reset_state_cache()
+        self.culler.cull(Object3D.store)
         self.batch.draw()
+        for mesh in self.instanced:
+            mesh.draw()
+        frame_stats.end_frame()
         
     def on_resize(self, width, height):
         glViewport(0, 0, *self.get_framebuffer_size())
         self.calc_matrices()
         return pyglet.event.EVENT_HANDLED
         
+    def load_texture(self, path:str) -> Asset:
+        '''
+        Decoded in the background and uploaded by update within a per-frame budget
+        '''
+        return self.assets.load_texture(path)
+
     def add_object(self, object:Object3D|ObjectLine):
         '''
         Assign a group for each object
         '''
         object.set_batch(self.batch)
-        self.objects.append(object)
+        self.objects.add(object)
+        if isinstance(object, Object3D):
+            self.culler.add(object)
+        if isinstance(object, LODObject):
+            self.lod.add(object)
+
+    def add_instanced(self, mesh:InstancedMesh):
+        '''
+        Instanced meshes are drawn after the batch, one draw call each
+        '''
+        mesh.create()
+        mesh.culler = self.culler
+        self.instanced.append(mesh)
+        if isinstance(mesh, LODInstancedMesh):
+            self.lod.add(mesh)
+
+    def add_interpolated(self, state):
+        '''
+        state (snapshot() before each step, interpolate(alpha) before drawing) is drawn between steps
+        '''
+        self.scheduler.before_step.append(state.snapshot)
+        self.scheduler.interpolators.append(state.interpolate)
 
     def update(self,dt) -> None:
+        self.assets.upload()
+        Object3D.store.update()
+        self.lod.update(Object3D.store)
         for object in self.objects:
             '''
             Update position/orientation in the scene. In the current setting, 
             objects created later rotate faster while positions are not changed.
+            Deleted objects are removed after the loop.
             '''
-            if(object.group is None):
-                self.objects.remove(object)
+            if(object.deleted):
+                self.objects.remove(self.objects.handle(object))
+                if isinstance(object, Object3D):
+                    self.culler.remove(object)
                 continue
-            if(object.parent is None):
+            if(isinstance(object, ObjectLine)):
                 object.calc_transform_mat()
-                
-            object.group.shader_program['view_proj'] = self.view_proj
-            if isinstance(object, Object3D):
-                object.group.shader_program['dir_light'] = self.dir_light
-                object.group.shader_program['dot_light'] = self.dot_light
+        self.objects.flush()
+        
+        for mesh in self.instanced:
+            mesh.update()
+        
+        '''
+        Camera and lighting are shared by every program; they are only
+        uploaded when they changed since the last frame.
+        '''
+        for program in shader.cached_programs():
+            shader.set_uniform(program, 'view_proj', self.view_proj)
+            shader.set_uniform(program, 'dir_light', self.dir_light)
+            shader.set_uniform(program, 'dot_light', self.dot_light)
 
-    def fixed_update(self,dt,mouse) -> None:
+    def fixed_update(self,dt) -> None:
         pass
+
+    def tick(self, dt) -> None:
+        '''
+        One frame: as many fixed steps as the elapsed time pays for, then the frame update
+        '''
+        self.scheduler.advance(dt)
+        self.update(dt)
         
     def run(self):
-        pyglet.clock.schedule_interval(self.fixed_update, 1/120)
-        pyglet.clock.schedule_interval(self.update, 1/60)
+        pyglet.clock.schedule_interval(self.tick, 1/60)
         pyglet.app.run()
\ No newline at end of file
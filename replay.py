@@ -0,0 +1,205 @@
+'''
+Input record & replay.
+A recording logs, for every fixed step, the inputs that step saw: cursor and
+target changes and queued commands. Steps have a constant dt and the bullet
+colors come from a seeded generator, so replaying the log reproduces the
+session exactly:
+
+    python3 main.py --record session.rbin
+    python3 replay.py session.rbin                     # headless, as fast as possible
+    python3 replay.py session.rbin --window --speed 4  # watch it at 4x
+
+The headless replay prints a digest of the final simulation state; pass it
+back with --expect to use a recording as a regression test or benchmark.
+'''
+import pyglet
+
+import argparse
+import hashlib
+import struct
+
+import numpy as np
+from pyglet.math import Vec3
+
+MAGIC = b'RBRP'
+VERSION = 1
+# magic, version, dt, seed, steps
+HEADER = struct.Struct('<4sHdQQ')
+# step, kind, x, y, z
+RECORD = struct.Struct('<IB3d')
+CURSOR, TARGET, COMMAND = 0, 1, 2
+# commands are logged as their index in this table (in x)
+COMMANDS = ('attack',)
+
+
+class InputRecorder:
+    """
+    Writes the inputs of a controller to a binary log, one capture() per
+    fixed step (RenderWindow.scheduler.before_step). cursor and target are
+    only logged when they change.
+    """
+    def __init__(self, path:str, controller, dt:float, seed:int):
+        self.file = open(path, 'wb')
+        self.controller = controller
+        self.dt = dt
+        self.seed = seed
+        self.step = 0
+        self.records = 0
+        self.last = {}
+        self.file.write(HEADER.pack(MAGIC, VERSION, dt, seed, 0))
+
+    def _write(self, kind:int, x:float, y:float = 0.0, z:float = 0.0):
+        self.file.write(RECORD.pack(self.step, kind, x, y, z))
+        self.records += 1
+
+    def capture(self):
+        for kind, name in ((CURSOR, "cursor"), (TARGET, "target")):
+            value = tuple(self.controller.data[name])
+            if value != self.last.get(name):
+                self._write(kind, *value)
+                self.last[name] = value
+        for command in self.controller.command_queue:
+            self._write(COMMAND, COMMANDS.index(command))
+        self.step += 1
+
+    def close(self):
+        '''
+        Store the number of recorded steps in the header and close the log
+        '''
+        if self.file.closed:
+            return
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.dt, self.seed, self.step))
+        self.file.close()
+
+
+def read_log(path:str) -> tuple[float, int, int, list[tuple]]:
+    '''
+    (dt, seed, steps, events) of a log; events are (step, name, value)
+    '''
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, version, dt, seed, steps = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} input log")
+    names = {CURSOR: "cursor", TARGET: "target"}
+    events = []
+    for step, kind, x, y, z in RECORD.iter_unpack(data[HEADER.size:]):
+        if kind == COMMAND:
+            events.append((step, COMMANDS[int(x)], None))
+        else:
+            events.append((step, names[kind], Vec3(x, y, z)))
+    return dt, seed, steps, events
+
+
+class ReplayControl:
+    """
+    Replaces Control with the events of an input log.
+    advance() is called once before every fixed step and applies the events
+    recorded for that step.
+    """
+    def __init__(self, events:list[tuple]):
+        self.events = events
+        self.cursor_index = 0
+        self.step = 0
+        self.setup()
+
+    def __getitem__(self, key):
+        return self.data.get(key, False)
+
+    def __getattr__(self, name):
+        return self.data.get(name, False)
+
+    def setup(self):
+        self.data = {
+            "cursor": Vec3(),
+            "target": Vec3()
+        }
+        self.command_queue = []
+
+    def advance(self, t:float = None):
+        while self.cursor_index < len(self.events) and self.events[self.cursor_index][0] <= self.step:
+            _, name, value = self.events[self.cursor_index]
+            if value is not None:
+                self.data[name] = value
+            else:
+                self.command_queue.append(name)
+            self.cursor_index += 1
+        self.step += 1
+
+
+def state_digest() -> str:
+    '''
+    Hash of the simulation state: world transforms and projectiles
+    '''
+    from object import Object3D
+    from robot import RigidSphere
+    store, pool = Object3D.store, RigidSphere.pool
+    digest = hashlib.sha1()
+    for array in (store.world[:store.size], store.alive[:store.size], pool.alive, pool.position, pool.velocity, pool.color):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def replay_headless(path:str) -> dict:
+    '''
+    Run a log without a window as fast as possible.
+    The replay starts from an empty scene (see HeadlessSimulation), so the
+    digest only depends on the log, not on what ran before in this process.
+    '''
+    from headless import HeadlessSimulation
+    dt, seed, steps, events = read_log(path)
+    simulation = HeadlessSimulation(dt=dt, controller=ReplayControl(events), seed=seed)
+    stats = simulation.run(steps)
+    stats["digest"] = state_digest()
+    simulation.close()
+    return stats
+
+
+def replay_window(path:str, speed:float = 1.0):
+    '''
+    Show a log in a window; speed > 1 fast-forwards. Window input is ignored.
+    '''
+    from render import RenderWindow
+    from engine import Engine
+    from robot import RigidSphere
+    dt, seed, steps, events = read_log(path)
+    RigidSphere.seed(seed)
+    renderer = RenderWindow(1280, 720, "Robot Shooting Simulator (replay)", resizable = True)
+    controller = ReplayControl(events)
+    Engine(renderer, controller)
+    scheduler = renderer.scheduler
+    scheduler.dt = dt
+    # fast-forwarding takes proportionally more steps per frame
+    scheduler.max_steps = int(np.ceil(scheduler.max_steps * max(speed, 1.0)))
+    scheduler.before_step.append(controller.advance)
+
+    def tick(elapsed):
+        # never step past the end of the log (1e-9 guards against rounding)
+        remaining = (steps - scheduler.total_steps) * dt - scheduler.accumulator + 1e-9
+        scheduler.advance(min(elapsed * speed, remaining))
+        renderer.update(elapsed)
+        if scheduler.total_steps >= steps:
+            pyglet.app.exit()
+    pyglet.clock.schedule_interval(tick, 1/60)
+    pyglet.app.run()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay an input log recorded with main.py --record.")
+    parser.add_argument("log")
+    parser.add_argument("--window", action="store_true", help="draw the replay instead of running it headless")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed of the windowed replay")
+    parser.add_argument("--expect", help="digest the final state must match")
+    args = parser.parse_args()
+
+    if args.window:
+        replay_window(args.log, args.speed)
+    else:
+        pyglet.options['shadow_window'] = False
+        stats = replay_headless(args.log)
+        print(f"{stats['steps']} steps, {stats['sim_time']:.1f}s simulated in {stats['wall_time']:.2f}s "
+              f"({stats['steps_per_sec']:.0f} steps/s)")
+        print(f"digest {stats['digest']}")
+        if args.expect is not None and args.expect != stats["digest"]:
+            raise SystemExit(f"state differs from the expected digest {args.expect}")
@@ -4,13 +4,20 @@ from pyglet.math import Mat4, Vec3, Vec4
 import numpy as np
 
 from object import Object3D
-from object_line import ObjectLine
+from lod import LODGeometry, LODObject, CYLINDER_LEVELS
+from projectile import ProjectilePool
+from collision import CollisionWorld
+from trail import TrailBuffer
 from render import RenderWindow
 from ulility import SecondOrderDynamics
 from geometry import *
 
 class RobotBody:
+    # robots are numbered so bullets can tell their own robot apart
+    count = 0
     def __init__(self, root:Object3D, renderer:RenderWindow, texture:pyglet.image.Texture):
+        self.id = RobotBody.count
+        RobotBody.count += 1
         # parameters
         support_w = 1.0
         support_h = 0.3
@@ -56,6 +63,12 @@ class RobotBody:
         self.weapon2.set_position((0,0,arm_offset))
     
         self.toggle = False
+        
+        self.weapon1.source = self.id
+        self.weapon2.source = self.id
+        self.parts = [support_obj, col_obj, head_obj, eye_obj,
+                      self.weapon1, self.weapon1.barrel, self.weapon2, self.weapon2.barrel]
+        RigidSphere.collisions.add_colliders(self.parts, self.id)
     
     def attack(self):
         if self.toggle:
@@ -67,98 +80,170 @@ class RobotBody:
     def update(self,dt):
         self.weapon1.update(dt)
         self.weapon2.update(dt)
+    
+    def delete(self):
+        '''
+        Remove the robot from the scene, with every collider registered under its id
+        '''
+        RigidSphere.collisions.remove_colliders(self.id)
+        for part in self.parts:
+            part.delete()
 
 class Weapon(Object3D):
     scale = Vec3(0.8,0.6,0.4)
     length = 1
     fire_speed = 50
     cooldown = 0.2
+    barrel_lod = LODGeometry(Cylinder, CYLINDER_LEVELS, radiusTop=0.15, radiusBottom=0.12, height=length)
     def __init__(self, parent:Object3D, renderer:RenderWindow, texture: pyglet.image.Texture = None, color: Vec4 = Vec4(255,0,0,255)):
-        weapon_geo = Cube(scale=Weapon.scale)
+        weapon_geo = get_geometry(Cube, scale=Weapon.scale)
         super().__init__(weapon_geo, texture, color)
         parent.add_child(self)
         renderer.add_object(self)
         self.renderer = renderer
         self.system = SecondOrderDynamics(1.0,0.2,1.0,0)
+        self.source = -1
+        self.barrel: Object3D = None
         self.setup()
         
     def setup(self):
-        barrel_geo = Cylinder(radiusTop=0.15, radiusBottom=0.12, height=Weapon.length)
-        barrel_text = pyglet.image.load("textures/blue.jpg").get_texture()
-        barrel_obj = Object3D(barrel_geo, texture=barrel_text)
+        barrel_text = self.renderer.load_texture("textures/blue.jpg")
+        self.barrel_texture = barrel_text
+        barrel_obj = LODObject(Weapon.barrel_lod, texture=barrel_text)
         barrel_obj.set_position((Weapon.scale.x/2+self.length/2, 0, 0))
         barrel_obj.set_rotation(Mat4.from_rotation(np.pi/2,Vec3(0,0,1)))
         self.add_child(barrel_obj)
         self.renderer.add_object(barrel_obj)
+        self.barrel = barrel_obj
         
     def fire(self):
         muzzle_pos = Vec3(Weapon.scale.x/2+Weapon.length,0,0)
-        t = self.group.transform_mat
+        t = self.transform_mat
         x0 = (t @ Vec4(*muzzle_pos,1)).xyz
         y0 = (t @ Vec4(1,0,0,0)).xyz * Weapon.fire_speed
-        bullet = Bullet(x0, y0)
-        self.renderer.add_object(bullet)
-        self.renderer.add_object(bullet.trajectory)
+        Bullet(x0, y0, self.source)
         self.system.yd = 3.0
     
+    def delete(self):
+        super().delete()
+        if self.barrel_texture is not None:
+            self.barrel_texture.release()
+    
     def update(self, dt):
         self.system.update(dt, 0)
         self.set_rotation(Mat4.from_rotation(self.system.y,Vec3(0,0,1)))
 
-class RigidSphere(Object3D):
+class RigidSphere:
+    '''
+    Handle to one slot of the shared projectile pool.
+    Spheres are not scene objects: they are drawn all at once by an
+    InstancedMesh fed from RigidSphere.instance_data. Trails (started by
+    Bullet) share the slots of the pool and one TrailBuffer.
+    '''
     r = 0.12
     g = Vec3(0, -9.8, 0)
     d = 0.01
-    instance_list = []
-    def __init__(self, x0:Vec3, v0:Vec3):
-        rand = np.random.rand(3)
+    # live spheres at most; firing beyond it recycles the oldest one
+    capacity = 256
+    pool = ProjectilePool(r, g, d, capacity=capacity, recycle=True)
+    collisions = CollisionWorld(cell_size=2*r)
+    trails = TrailBuffer(history=20, capacity=capacity)
+    # colors are drawn from here, see seed()
+    rng = np.random.default_rng()
+    def __init__(self, x0:Vec3, v0:Vec3, duration:float = np.inf, source:int = -1):
+        rand = RigidSphere.rng.random(3)
         rand /= np.linalg.norm(rand)
         rand = np.ones(3) - rand*0.3
         rand *= 255
         rand = rand.astype(int)
-        color = Vec4(*rand,255)
+        self.color = Vec4(*rand,255)
+        
+        self.slot = RigidSphere.pool.acquire(x0, v0, self.color, duration, owner=self, source=source)
+        self.deleted = False
         
-        bullet_geo = Sphere(radius=self.r)
-        super().__init__(geometry=bullet_geo, color=color)
-        RigidSphere.instance_list.append(self)
-        self.set_position(x0)
-        self.x:Vec3 = x0
-        self.v:Vec3 = v0
+    @classmethod
+    def seed(cls, seed:int):
+        '''
+        Make the sphere colors reproducible (e.g. for replays)
+        '''
+        cls.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def reset(cls, seed:int = None):
+        '''
+        Start over with an empty pool, collision world and trail buffer
+        (e.g. for the next headless simulation in the same process)
+        '''
+        cls.pool = ProjectilePool(cls.r, cls.g, cls.d, capacity=cls.capacity, recycle=True)
+        cls.collisions = CollisionWorld(cell_size=2*cls.r)
+        cls.trails = TrailBuffer(history=20, capacity=cls.capacity)
+        if seed is not None:
+            cls.seed(seed)
+
+    @classmethod
+    def step_all(cls, dt):
+        '''
+        Integrate every live sphere in one batched step (swept against the
+        registered robots), collide them with each other and with the robots,
+        record the trails, then let the handles react.
+        '''
+        cls.pool.step(dt, cls.collisions, Object3D.store)
+        cls.collisions.step(cls.pool, Object3D.store)
+        cls.trails.push(cls.pool.position)
+        for slot in cls.pool.live_slots():
+            cls.pool.owners[slot].update(dt)
+    
+    @classmethod
+    def instance_data(cls):
+        '''
+        Per-instance (offsets, scales, colors) of all live spheres, at their
+        interpolated positions. Spheres with a finite duration shrink as
+        s = 1 - (lifetime/duration)^3.
+        '''
+        pool = cls.pool
+        idx = pool.live_slots()
+        duration = pool.duration[idx]
+        finite = np.isfinite(duration)
+        scales = np.ones(len(idx))
+        scales[finite] = 1 - (pool.lifetime[idx][finite] / duration[finite]) ** 3
+        return pool.draw_position[idx], scales, pool.color[idx] / 255
+    
+    @property
+    def x(self) -> Vec3:
+        return Vec3(*RigidSphere.pool.position[self.slot])
+    
+    @property
+    def v(self) -> Vec3:
+        return Vec3(*RigidSphere.pool.velocity[self.slot])
+    
+    @property
+    def lifetime(self) -> float:
+        return RigidSphere.pool.lifetime[self.slot]
         
     def update(self, dt):
-        self.x += self.v * dt
-        v_mag = self.v.mag
-        self.v += self.g * dt - self.v * v_mag**2 * self.d * dt
-        if self.x.y < self.r:
-            if self.v.y < 0: self.v.y *= -0.8
-            self.x.y = self.r
-        self.set_position(self.x)
+        pass
         
     def delete(self):
-        RigidSphere.instance_list.remove(self)
-        super().delete()
+        # a recycled handle no longer owns its slot
+        if self.deleted:
+            return
+        RigidSphere.pool.release(self.slot)
+        self.deleted = True
         
 
 class Bullet(RigidSphere):
     dur = 3.0
-    def __init__(self, x0: Vec3, v0: Vec3):
-        super().__init__(x0, v0)
-        self.lifetime = 0
-        self.trajectory = ObjectLine([*x0],self.color)
+    def __init__(self, x0: Vec3, v0: Vec3, source:int = -1):
+        super().__init__(x0, v0, Bullet.dur, source)
+        RigidSphere.trails.start(self.slot, [*x0], self.color)
         
     def update(self, dt):
         super().update(dt)
-        self.lifetime += dt
-        s = self.lifetime / Bullet.dur
-        s = 1 - s ** 3
-        self.rotation_mat = Mat4().scale(Vec3(s,s,s))
-        self.trajectory.vertices.extend(self.x)
-        if len(self.trajectory.vertices) > 3 * 20:
-            self.trajectory.vertices = self.trajectory.vertices[3:]
-        self.trajectory.update()
         if self.lifetime > Bullet.dur:
             self.delete()
             
     def delete(self):
+        if self.deleted:
+            return
         super().delete()
-        self.trajectory.delete()
\ No newline at end of file
+        RigidSphere.trails.stop(self.slot)
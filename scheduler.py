@@ -0,0 +1,58 @@
+from stats import frame_stats
+
+
+class FixedStepScheduler:
+    """
+    Runs `step` with a constant dt however long the frames take.
+    Frame time is added to an accumulator, which is spent in whole steps. At
+    most `max_steps` are taken per frame: the rest of a long stall is dropped
+    (keeping the fraction of a step), so one slow frame does not cause more
+    slow frames.
+    Hooks in `before_step` run before every step, e.g. to save the state that
+    rendering blends from. Hooks in `interpolators` are then called with alpha,
+    the fraction of a step left in the accumulator, so that rendering can show
+    the state alpha of the way from the previous step to the last one.
+    """
+    def __init__(self, step, dt:float = 1/120, max_steps:int = 8):
+        self.step = step
+        self.dt = dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.before_step = []
+        self.interpolators = []
+        # metrics: steps taken in the last frame, totals over the run
+        self.steps = 0
+        self.frames = 0
+        self.total_steps = 0
+        self.dropped = 0.0
+
+    def advance(self, elapsed:float) -> int:
+        '''
+        Spend elapsed seconds of frame time; returns the number of steps taken
+        '''
+        self.accumulator += elapsed
+        steps = 0
+        while self.accumulator >= self.dt and steps < self.max_steps:
+            for hook in self.before_step:
+                hook()
+            self.step(self.dt)
+            self.accumulator -= self.dt
+            steps += 1
+        if self.accumulator >= self.dt:
+            dropped = self.accumulator - self.accumulator % self.dt
+            self.accumulator -= dropped
+            self.dropped += dropped
+            frame_stats.add('dropped_ms', dropped * 1000)
+        self.alpha = self.accumulator / self.dt
+        for interpolate in self.interpolators:
+            interpolate(self.alpha)
+        self.steps = steps
+        self.frames += 1
+        self.total_steps += steps
+        frame_stats.add('fixed_steps', steps)
+        return steps
+
+    @property
+    def steps_per_frame(self) -> float:
+        return self.total_steps / self.frames if self.frames else 0.0
@@ -0,0 +1,12 @@
+#version 330
+in vec4 color;
+in float light;
+
+out vec4 outColor;
+
+
+void main()
+{
+    outColor = color;
+    outColor.xyz *= light;
+}
\ No newline at end of file
@@ -1,5 +1,7 @@
 from pyglet.graphics.shader import Shader, ShaderProgram
 
+from stats import frame_stats
+
 # create vertex and fragment shader sources
 vertex_source_gouraud = open('shader/vert_shader_gouraud.glsl', 'r').read()
 fragment_source_gouraud = open('shader/frag_shader_gouraud.glsl', 'r').read()
@@ -7,9 +9,56 @@ vertex_source_phong = open('shader/vert_shader_phong.glsl', 'r').read()
 fragment_source_phong = open('shader/frag_shader_phong.glsl', 'r').read()
 vertex_source_simple = open('shader/vert_shader_simple.glsl', 'r').read()
 fragment_source_simple = open('shader/frag_shader_simple.glsl', 'r').read()
+vertex_source_instanced = open('shader/vert_shader_instanced.glsl', 'r').read()
+fragment_source_instanced = open('shader/frag_shader_instanced.glsl', 'r').read()
+vertex_source_trail = open('shader/vert_shader_trail.glsl', 'r').read()
+fragment_source_trail = open('shader/frag_shader_trail.glsl', 'r').read()
 
 def create_program(vs_source, fs_source):
     # compile the vertex and fragment sources to a shader program
     vert_shader = Shader(vs_source, 'vertex')
     frag_shader = Shader(fs_source, 'fragment')
-    return ShaderProgram(vert_shader, frag_shader)
\ No newline at end of file
+    return ShaderProgram(vert_shader, frag_shader)
+
+# compiled programs shared by every group, keyed by (vertex source, fragment source, defines)
+_program_cache: dict[tuple, ShaderProgram] = {}
+
+def _add_defines(source, defines):
+    if not defines:
+        return source
+    version, _, body = source.partition('\n')
+    lines = [f'#define {name} {value}' for name, value in defines]
+    return '\n'.join([version, *lines, body])
+
+def get_program(vs_source, fs_source, defines: dict = None):
+    # compile each variant once; later calls return the shared program
+    defines = tuple(sorted((defines or {}).items()))
+    key = (vs_source, fs_source, defines)
+    program = _program_cache.get(key)
+    if program is None:
+        program = create_program(_add_defines(vs_source, defines), _add_defines(fs_source, defines))
+        _program_cache[key] = program
+    return program
+
+def cached_programs():
+    return list(_program_cache.values())
+
+# last value uploaded for each (program, uniform), used to skip redundant uploads
+_uniform_values: dict[tuple, object] = {}
+_uniform_names: dict[int, set] = {}
+
+def set_uniform(program, name, value):
+    # upload only when the value differs from what the program already holds
+    names = _uniform_names.get(program.id)
+    if names is None:
+        names = _uniform_names[program.id] = set(program.uniforms)
+    if name not in names:
+        return False
+    key = (program.id, name)
+    cached = tuple(value) if hasattr(value, '__iter__') else value
+    if _uniform_values.get(key) == cached:
+        return False
+    program[name] = value
+    _uniform_values[key] = cached
+    frame_stats.add('uniform_uploads')
+    return True
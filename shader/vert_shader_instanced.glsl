@@ -0,0 +1,46 @@
+#version 330
+layout(location =0) in vec3 vertices;
+layout(location =1) in vec3 normals;
+layout(location =2) in vec2 uvs;
+// per-instance attributes
+layout(location =3) in vec4 offset_scale;
+layout(location =4) in vec4 instance_color;
+
+out vec4 color;
+out float light;
+
+uniform vec3 dot_light;
+uniform vec3 dir_light;
+uniform vec3 cam_eye;
+
+uniform mat4 view_proj;
+
+float ambient = 0.5f;
+float shininess = 100;
+
+void main()
+{
+    vec4 world_pos = vec4(vertices * offset_scale.w + offset_scale.xyz, 1.0f);
+    gl_Position = view_proj * world_pos; // local->world->vp
+    
+    vec3 normal = normals;
+    vec3 pos_to_light = dot_light - world_pos.xyz;
+    vec3 pos_to_eye = cam_eye - world_pos.xyz;
+    
+    vec3 pos_to_light_dir = normalize(pos_to_light);
+    vec3 pos_to_eye_dir = normalize(pos_to_eye);
+    vec3 half_dir = normalize(pos_to_eye_dir + pos_to_light_dir);
+    
+    float light1 = max(dot(normal, dir_light), 0.0f);
+    float light2 = max(dot(normal, pos_to_light_dir), 0.0f);
+    
+    float glare = dot(normal, half_dir);
+    float specular = 0.0f;
+    if (glare > 0.0f) {
+        specular = pow(dot(normal, half_dir), shininess);
+    }
+    
+    light = ambient + light1*0.5 + light2*0.5 + specular;
+    
+    color = instance_color;
+}
\ No newline at end of file
@@ -0,0 +1,13 @@
+#version 330
+layout(location =0) in vec3 vertices;
+layout(location =1) in vec4 colors;
+
+out vec4 color;
+
+uniform mat4 view_proj;
+
+void main()
+{
+    gl_Position = view_proj * vec4(vertices, 1.0f); // trail samples are in world space
+    color = colors;
+}
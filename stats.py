@@ -0,0 +1,57 @@
+from collections import defaultdict
+
+
+class FrameStats:
+    """
+    Named counters collected over one frame.
+    end_frame() is called once per rendered frame; the finished frame is kept in `last`.
+    """
+    def __init__(self):
+        self.current = defaultdict(int)
+        self.last = {}
+
+    def add(self, name:str, value = 1):
+        self.current[name] += value
+
+    def set(self, name:str, value):
+        '''
+        Gauge: the last value set during the frame is kept
+        '''
+        self.current[name] = value
+
+    def end_frame(self):
+        self.last = dict(self.current)
+        self.current.clear()
+
+    def get(self, name:str, default = 0):
+        return self.last.get(name, default)
+
+
+frame_stats = FrameStats()
+
+
+def count_gl_calls(stats:FrameStats = frame_stats):
+    '''
+    Count every call into pyglet.gl, ours and pyglet's own (e.g. the VAO
+    binds and draws of Batch.draw), as 'gl_calls' in stats.
+    pyglet links each GL function once as a ctypes function; its errcheck
+    runs after every call, so the counter is chained in front of pyglet's
+    (debug_gl) error check. glGetError, which that check calls, is not counted.
+    '''
+    import ctypes
+    from pyglet.gl import gl
+
+    if getattr(count_gl_calls, 'installed', False):
+        return
+    for name, function in vars(gl).items():
+        if not name.startswith('gl') or name == 'glGetError' or not isinstance(function, ctypes._CFuncPtr):
+            continue
+        function.errcheck = _counted(function.errcheck, stats)
+    count_gl_calls.installed = True
+
+
+def _counted(errcheck, stats:FrameStats):
+    def counted(result, function, arguments):
+        stats.add('gl_calls')
+        return result if errcheck is None else errcheck(result, function, arguments)
+    return counted
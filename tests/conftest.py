@@ -0,0 +1,11 @@
+import os
+import sys
+
+import pyglet
+# tests run without a window; GL tests start their own process
+pyglet.options['shadow_window'] = False
+
+# modules are imported (and shaders/textures loaded) relative to the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
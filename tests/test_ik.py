@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from ulility import IK2Link
+
+REACHABLE, UNREACHABLE, TOO_CLOSE, FOLDED, BOUNDARY = range(5)
+
+
+def draw_targets(rng:np.random.Generator, n:int):
+    '''
+    Random link lengths, targets and previous angles, n // 5 per branch of
+    set_target. Boundary targets are 1e-9 inside or outside reach, |l1 - l2|
+    or at r = 0; exactly on a boundary the scalar code itself flips branch on
+    1-ulp differences.
+    '''
+    branch = np.arange(n) % 5
+    l1 = rng.uniform(0.1, 2.0, n)
+    l2 = rng.uniform(0.1, 2.0, n)
+    # too close needs the first link longer, folded the second
+    long, short = np.maximum(l1, l2), np.minimum(l1, l2)
+    l1 = np.where(branch == TOO_CLOSE, long, np.where(branch == FOLDED, short, l1))
+    l2 = np.where(branch == TOO_CLOSE, short, np.where(branch == FOLDED, long, l2))
+    reach, gap = l1 + l2, np.abs(l1 - l2)
+    t = rng.random(n)
+    r = np.select(
+        [branch == REACHABLE, branch == UNREACHABLE, (branch == TOO_CLOSE) | (branch == FOLDED)],
+        [gap + t * (reach - gap), reach * (1 + 0.5 * t), t * gap],
+    )
+    boundary = np.stack([reach, gap, np.zeros(n)])[rng.integers(0, 3, n), np.arange(n)]
+    boundary += np.where(boundary > 0, rng.choice([-1e-9, 1e-9], n), 0)
+    r = np.where(branch == BOUNDARY, boundary, r)
+    phi = rng.uniform(-np.pi, np.pi, n)
+    prev1 = rng.uniform(-np.pi, np.pi, n)
+    prev2 = rng.uniform(-np.pi, np.pi, n)
+    return r * np.cos(phi), r * np.sin(phi), l1, l2, prev1, prev2, branch
+
+
+def solve_scalar(x, y, l1, l2, prev1, prev2):
+    th1, th2 = np.empty(len(x)), np.empty(len(x))
+    for i in range(len(x)):
+        ik = IK2Link(l1[i], l2[i])
+        ik._th1, ik._th2 = prev1[i], prev2[i]
+        ik.set_target(x[i], y[i])
+        th1[i], th2[i] = ik.th1, ik.th2
+    return th1, th2
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_scalar(seed):
+    '''
+    Same branch and angles within 1e-9 rad. They are not bit-identical: NumPy
+    squares arrays with x*x where the scalar code calls pow(), and vectorized
+    arccos/arctan2 may round the last bit differently.
+    '''
+    x, y, l1, l2, prev1, prev2, branch = draw_targets(np.random.default_rng(seed), 5000)
+    th1, th2 = IK2Link.solve_batch(x, y, l1, l2, prev1, prev2)
+    expected1, expected2 = solve_scalar(x, y, l1, l2, prev1, prev2)
+    np.testing.assert_allclose(th1, expected1, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(th2, expected2, rtol=0, atol=1e-9)
+    # the drawn targets really reach every branch
+    assert np.all(th2[branch == UNREACHABLE] == 0.0)
+    assert np.all(th2[(branch == TOO_CLOSE) | (branch == FOLDED)] == np.pi)
+    assert np.all(th2[branch == REACHABLE] < 0.0)
+
+
+def test_batch_broadcasts_link_lengths():
+    x, y, *_ = draw_targets(np.random.default_rng(0), 100)
+    th1, th2 = IK2Link.solve_batch(x, y, 0.7, 1.3)
+    expected1, expected2 = solve_scalar(x, y, np.full(100, 0.7), np.full(100, 1.3), np.zeros(100), np.zeros(100))
+    np.testing.assert_allclose(th1, expected1, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(th2, expected2, rtol=0, atol=1e-9)
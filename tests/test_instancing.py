@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+def test_instanced_mesh_draws_on_llvmpipe():
+    '''
+    One frame of InstancedMesh on the software rasterizer, in its own process
+    since it needs a GL context (see benchmark/instancing.py)
+    '''
+    env = dict(os.environ, LIBGL_ALWAYS_SOFTWARE='1')
+    result = subprocess.run([sys.executable, '-m', 'benchmark.instancing', '--instances', '100', '--frames', '1'],
+                            capture_output=True, text=True, env=env, timeout=300)
+    if "no OpenGL context" in result.stderr:
+        pytest.skip(result.stderr.strip())
+    assert result.returncode == 0, result.stderr
+    if "llvmpipe" not in result.stdout:
+        pytest.skip("Mesa's llvmpipe is not available")
+    assert "100 instances" in result.stdout
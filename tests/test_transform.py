@@ -0,0 +1,36 @@
+import numpy as np
+
+from transform import TransformStore
+
+
+def test_reused_node_does_not_adopt_old_children():
+    store = TransformStore()
+    parent = store.allocate()
+    child = store.allocate()
+    store.set_parent(child, parent)
+    store.set_translation(parent, (1, 0, 0))
+    store.set_translation(child, (0, 2, 0))
+    store.update()
+    np.testing.assert_allclose(store.world[child][3, :3], (1, 2, 0))
+
+    store.free(parent)
+    other = store.allocate()
+    assert other == parent
+    store.set_translation(other, (50, 50, 50))
+    store.update()
+    # the orphan is a root now: only its own translation applies
+    assert store.parent[child] == -1
+    np.testing.assert_allclose(store.world[child][3, :3], (0, 2, 0))
+
+
+def test_child_counts_follow_reparenting():
+    store = TransformStore()
+    a, b, child = store.allocate(), store.allocate(), store.allocate()
+    store.set_parent(child, a)
+    store.set_parent(child, b)
+    assert store.child_count[a] == 0 and store.child_count[b] == 1
+    store.free(child)
+    assert store.child_count[b] == 0
+    # a leaf is freed without touching other nodes
+    store.free(b)
+    assert store.parent[a] == -1 and store.alive[a]
@@ -0,0 +1,207 @@
+import ctypes
+
+import numpy as np
+from pyglet.gl import *
+from pyglet.graphics.vertexarray import VertexArray
+
+import shader.shader as shader
+from geometry.geom import index_dtype
+from object import gl_index_types
+from stats import frame_stats
+
+
+class TrailBuffer:
+    '''
+    Every trail in one NumPy ring buffer and one dynamic VBO, drawn with a
+    single glMultiDrawElementsBaseVertex call.
+    Samples are stored by row (tick % history) and column (trail slot). Each
+    row is kept twice, at r and r + history, so the newest samples of a trail
+    are always the consecutive rows [first, first + length) and a line strip
+    over them never wraps. A static index buffer steps through the rows and
+    the base vertex of each draw picks the trail's column.
+    Only the rows written since the last frame are uploaded, so the upload
+    does not depend on the history length.
+    `head`, if set, returns the positions the trails' objects are drawn at
+    (e.g. the interpolated ProjectilePool.draw_position). The newest sample
+    is drawn there, so a trail ends at its object, and restored to the pushed
+    sample before the next push.
+    '''
+    def __init__(self, history:int = 20, capacity:int = 64):
+        self.history = history
+        self.capacity = capacity
+        self.tick = 0
+        self.points = np.zeros((2 * history, capacity, 3), dtype=np.float32)
+        self.colors = np.zeros((2 * history, capacity, 4), dtype=np.uint8)
+        self.color = np.zeros((capacity, 4), dtype=np.uint8)
+        self.length = np.zeros(capacity, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+        # pushed newest sample of every trail, while the drawn one follows head
+        self.newest = np.zeros((capacity, 3), dtype=np.float32)
+        self.head = None
+        self.head_moved = False
+        self.dirty_rows: set[int] = set()
+        self.resized = True
+        self.count = 0
+        self.shader_program = None
+        self.vao = None
+        self.deleted = False
+        # set by RenderWindow.add_instanced; trails are not culled
+        self.culler = None
+
+    def _grow(self, capacity:int):
+        n = self.capacity
+        self.capacity = capacity
+        points = np.zeros((2 * self.history, capacity, 3), dtype=np.float32)
+        colors = np.zeros((2 * self.history, capacity, 4), dtype=np.uint8)
+        points[:, :n] = self.points
+        colors[:, :n] = self.colors
+        self.points, self.colors = points, colors
+        self.color = np.concatenate([self.color, np.zeros((capacity - n, 4), dtype=np.uint8)])
+        self.length = np.concatenate([self.length, np.zeros(capacity - n, dtype=np.int64)])
+        self.active = np.concatenate([self.active, np.zeros(capacity - n, dtype=bool)])
+        self.newest = np.concatenate([self.newest, np.zeros((capacity - n, 3), dtype=np.float32)])
+        self.resized = True
+
+    def _write(self, row:int, slots:np.ndarray, points:np.ndarray):
+        for r in (row, row + self.history):
+            self.points[r, slots] = points
+            self.colors[r, slots] = self.color[slots]
+        self.dirty_rows.add(row)
+
+    def start(self, slot:int, x0, color):
+        '''
+        Begin the trail of slot at x0 (as the newest sample); color is RGBA 0-255
+        '''
+        if slot >= self.capacity:
+            self._grow(max(2 * self.capacity, slot + 1))
+        self.active[slot] = True
+        self.color[slot] = color
+        self._write((self.tick - 1) % self.history, np.array([slot]), np.array([x0], dtype=np.float32))
+        self.newest[slot] = x0
+        self.length[slot] = 1
+
+    def stop(self, slot:int):
+        self.active[slot] = False
+        self.length[slot] = 0
+
+    def push(self, positions:np.ndarray):
+        '''
+        Append positions[slot] to every active trail, one tick
+        '''
+        if len(positions) > self.capacity:
+            self._grow(len(positions))
+        if self.head_moved:
+            drawn = np.flatnonzero(self.length)
+            self._write((self.tick - 1) % self.history, drawn, self.newest[drawn])
+            self.head_moved = False
+        slots = np.flatnonzero(self.active[:len(positions)])
+        self._write(self.tick % self.history, slots, positions[slots])
+        self.newest[slots] = positions[slots]
+        self.length[slots] = np.minimum(self.length[slots] + 1, self.history)
+        self.tick += 1
+
+    def create(self):
+        self.shader_program = shader.get_program(
+            shader.vertex_source_trail,
+            shader.fragment_source_trail
+        )
+        self.vao = VertexArray()
+        self.vao.bind()
+        self.point_buffer = GLuint()
+        self.color_buffer = GLuint()
+        self.index_buffer = GLuint()
+        glGenBuffers(1, self.point_buffer)
+        glBindBuffer(GL_ARRAY_BUFFER, self.point_buffer)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, 0)
+        glGenBuffers(1, self.color_buffer)
+        glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 4, GL_UNSIGNED_BYTE, GL_TRUE, 0, 0)
+        glGenBuffers(1, self.index_buffer)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        self.vao.unbind()
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.resized = True
+
+    def upload(self):
+        '''
+        Whole buffers after a resize, otherwise the dirty rows (both copies)
+        '''
+        uploaded = 0
+        if self.resized:
+            dtype = index_dtype(self.points.shape[0] * self.capacity)
+            rows = np.ascontiguousarray(np.arange(2 * self.history) * self.capacity, dtype=dtype)
+            self.index_type = gl_index_types[dtype]
+            self.index_size = rows.itemsize
+            # the element buffer binding is part of the VAO
+            self.vao.bind()
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, rows.nbytes, rows.ctypes.data, GL_STATIC_DRAW)
+            self.vao.unbind()
+            for buffer, data in ((self.point_buffer, self.points), (self.color_buffer, self.colors)):
+                glBindBuffer(GL_ARRAY_BUFFER, buffer)
+                glBufferData(GL_ARRAY_BUFFER, data.nbytes, data.ctypes.data, GL_DYNAMIC_DRAW)
+                uploaded += data.nbytes
+            self.resized = False
+        else:
+            for buffer, data in ((self.point_buffer, self.points), (self.color_buffer, self.colors)):
+                glBindBuffer(GL_ARRAY_BUFFER, buffer)
+                for row in self.dirty_rows:
+                    for r in (row, row + self.history):
+                        glBufferSubData(GL_ARRAY_BUFFER, data[r].nbytes * r, data[r].nbytes, data[r].ctypes.data)
+                        uploaded += data[r].nbytes
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.dirty_rows.clear()
+        frame_stats.add('trail_upload_bytes', uploaded)
+
+    def move_head(self):
+        '''
+        Draw the newest sample of every trail at head()
+        '''
+        positions = self.head()
+        slots = np.flatnonzero(self.length[:len(positions)])
+        self._write((self.tick - 1) % self.history, slots, positions[slots])
+        self.head_moved = True
+
+    def update(self):
+        '''
+        Upload the new samples and gather (first row, length, column) of every visible trail
+        '''
+        if self.vao is None:
+            return
+        if self.head is not None:
+            self.move_head()
+        self.upload()
+        slots = np.flatnonzero(self.length >= 2)
+        self.count = len(slots)
+        first = (self.tick - self.length[slots]) % self.history
+        self.counts = np.ascontiguousarray(self.length[slots], dtype=np.int32)
+        self.offsets = np.ascontiguousarray(first * self.index_size, dtype=np.intp)
+        self.base_vertices = np.ascontiguousarray(slots, dtype=np.int32)
+
+    def draw(self):
+        if self.count == 0:
+            return
+        self.shader_program.use()
+        self.vao.bind()
+        glLineWidth(10)
+        glMultiDrawElementsBaseVertex(
+            GL_LINE_STRIP,
+            self.counts.ctypes.data_as(ctypes.POINTER(GLsizei)),
+            self.index_type,
+            self.offsets.ctypes.data_as(ctypes.POINTER(GLvoid)),
+            self.count,
+            self.base_vertices.ctypes.data_as(ctypes.POINTER(GLint)),
+        )
+        self.vao.unbind()
+        self.shader_program.stop()
+
+    def delete(self):
+        self.deleted = True
+        if self.vao is None:
+            return
+        for buffer in (self.point_buffer, self.color_buffer, self.index_buffer):
+            glDeleteBuffers(1, buffer)
+        self.vao.delete()
+        self.vao = None
+        self.shader_program = None
@@ -0,0 +1,174 @@
+import numpy as np
+
+from stats import frame_stats
+
+
+class TransformStore:
+    """
+    Flat, array-backed transform hierarchy.
+    Node i has a parent index (-1 for roots), a local rotation (4x4), a local
+    translation and a world matrix. Matrices are kept in pyglet's column-major
+    layout (row 3 holds the translation), so world[i] matches Mat4 ordering
+    and `world` can be uploaded directly as an instance or uniform buffer.
+    World matrices are composed level by level with batched matmuls, and only
+    for nodes whose local transform (or an ancestor's) changed.
+    Drawing reads `draw_world`, which is `world` unless interpolate() blended
+    it with the world matrices saved by snapshot().
+    """
+    def __init__(self, capacity:int = 64):
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        # live children of each node, so freeing a leaf does not scan for them
+        self.child_count = np.zeros(capacity, dtype=np.int32)
+        self.rotation = np.tile(np.eye(4, dtype=np.float32), (capacity, 1, 1))
+        self.translation = np.zeros((capacity, 3), dtype=np.float32)
+        self.world = np.tile(np.eye(4, dtype=np.float32), (capacity, 1, 1))
+        self.dirty = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self.free_nodes: list[int] = []
+        self.levels: list[np.ndarray] = None
+        # world matrices at the last snapshot, and which nodes existed then
+        self.previous = self.world.copy()
+        self.snapped = np.zeros(capacity, dtype=bool)
+        self.blend: np.ndarray = None
+
+    @property
+    def capacity(self) -> int:
+        return len(self.parent)
+
+    def _grow(self):
+        n = self.capacity
+        eye = np.tile(np.eye(4, dtype=np.float32), (n, 1, 1))
+        self.parent = np.concatenate([self.parent, np.full(n, -1, dtype=np.int32)])
+        self.child_count = np.concatenate([self.child_count, np.zeros(n, dtype=np.int32)])
+        self.rotation = np.concatenate([self.rotation, eye])
+        self.translation = np.concatenate([self.translation, np.zeros((n, 3), dtype=np.float32)])
+        self.world = np.concatenate([self.world, eye])
+        self.dirty = np.concatenate([self.dirty, np.zeros(n, dtype=bool)])
+        self.alive = np.concatenate([self.alive, np.zeros(n, dtype=bool)])
+        self.previous = np.concatenate([self.previous, eye])
+        self.snapped = np.concatenate([self.snapped, np.zeros(n, dtype=bool)])
+
+    def allocate(self) -> int:
+        if self.free_nodes:
+            node = self.free_nodes.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            node = self.size
+            self.size += 1
+        self.parent[node] = -1
+        self.rotation[node] = np.eye(4)
+        self.translation[node] = 0
+        self.alive[node] = True
+        self.dirty[node] = True
+        self.snapped[node] = False
+        self.levels = None
+        self.blend = None
+        return node
+
+    @property
+    def draw_world(self) -> np.ndarray:
+        return self.world if self.blend is None else self.blend
+
+    def snapshot(self):
+        '''
+        Save the current world matrices, before a simulation step
+        '''
+        self.update()
+        np.copyto(self.previous, self.world)
+        self.snapped[:] = self.alive
+
+    def interpolate(self, alpha:float):
+        '''
+        draw_world = previous + alpha * (world - previous); nodes created
+        since the snapshot are drawn as they are
+        '''
+        self.update()
+        n = self.size
+        previous, world = self.previous[:n], self.world[:n]
+        self.blend = np.where(self.snapped[:n, None, None], previous + alpha * (world - previous), world)
+
+    def free(self, node:int):
+        '''
+        Return node for reuse. Children still alive become roots, so they do
+        not inherit the transform of whatever allocate() puts in the node next.
+        '''
+        self.set_parent(node, -1)
+        self.alive[node] = False
+        self.dirty[node] = False
+        if self.child_count[node]:
+            children = np.flatnonzero(self.parent[:self.size] == node)
+            self.parent[children] = -1
+            self.dirty[children] = True
+            self.child_count[node] = 0
+        self.free_nodes.append(node)
+        self.levels = None
+
+    def set_parent(self, node:int, parent:int):
+        if self.parent[node] >= 0:
+            self.child_count[self.parent[node]] -= 1
+        if parent >= 0:
+            self.child_count[parent] += 1
+        self.parent[node] = parent
+        self.dirty[node] = True
+        self.levels = None
+
+    def set_translation(self, node:int, position):
+        self.translation[node] = position
+        self.dirty[node] = True
+
+    def set_rotation(self, node:int, rotation):
+        self.rotation[node] = np.reshape(rotation, (4, 4))
+        self.dirty[node] = True
+
+    def set_local_batch(self, nodes:np.ndarray, rotations:np.ndarray = None, translations:np.ndarray = None):
+        '''
+        Write many local transforms at once; rotations are (n,4,4) column-major.
+        '''
+        if rotations is not None:
+            self.rotation[nodes] = rotations
+        if translations is not None:
+            self.translation[nodes] = translations
+        self.dirty[nodes] = True
+
+    def _build_levels(self):
+        n = self.size
+        parent = self.parent[:n]
+        alive = self.alive[:n]
+        depth = np.zeros(n, dtype=np.int32)
+        has_parent = parent >= 0
+        while True:
+            new_depth = np.where(has_parent, depth[parent] + 1, 0)
+            if np.array_equal(new_depth, depth):
+                break
+            depth = new_depth
+        self.levels = [np.flatnonzero(alive & (depth == d)) for d in range(depth.max(initial=0) + 1)]
+
+    def update(self) -> int:
+        '''
+        Recompute world matrices of dirty nodes and their descendants.
+        Returns the number of recomputed transforms.
+        '''
+        if self.levels is None:
+            self._build_levels()
+        dirty = self.dirty
+        parent = self.parent
+        count = 0
+        for depth, nodes in enumerate(self.levels):
+            if depth > 0:
+                dirty[nodes] |= dirty[parent[nodes]]
+            nodes = nodes[dirty[nodes]]
+            if len(nodes) == 0:
+                continue
+            local = self.rotation[nodes]
+            local[:, 3, :3] += self.translation[nodes]
+            if depth == 0:
+                self.world[nodes] = local
+            else:
+                # column-major storage: (P @ L)^T = L^T @ P^T
+                self.world[nodes] = np.matmul(local, self.world[parent[nodes]])
+            count += len(nodes)
+        dirty[:self.size] = False
+        frame_stats.add('transforms_recomputed', count)
+        return count
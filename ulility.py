@@ -30,6 +30,38 @@ class IK2Link:
         alpha = np.arccos(c)
         self._th1 = np.arctan2(y,x) + np.arctan2(l2*np.sin(alpha),l1-l2*np.cos(alpha))
         self._th2 = alpha - np.pi
+    
+    @staticmethod
+    def solve_batch(x, y, l1, l2, th1=None, th2=None):
+        """
+        Vectorized set_target for many legs at once.
+        All arguments broadcast against each other. th1/th2 are the previous
+        angles, kept where no branch applies (as the scalar version keeps its
+        state); they default to the initial 0.0. Returns new (th1, th2) arrays.
+        """
+        x, y, l1, l2 = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (x, y, l1, l2)))
+        th1 = np.zeros(x.shape) if th1 is None else np.broadcast_to(th1, x.shape)
+        th2 = np.zeros(x.shape) if th2 is None else np.broadcast_to(th2, x.shape)
+        r_sqr = x**2 + y**2
+        r = np.sqrt(r_sqr)
+        base = np.arctan2(y,x)
+        c = ((l1**2+l2**2)-r_sqr)/(2*l1*l2)
+        out = (c>1) | (c<-1)
+        
+        far = out & (r_sqr > (l1+l2)**2)
+        th1 = np.where(far, base, th1)
+        th2 = np.where(far, 0.0, th2)
+        folded = out & (l2 > r + l1)
+        th1 = np.where(folded, np.pi + base, th1)
+        th2 = np.where(folded, np.pi, th2)
+        close = out & (l1 > r + l2)
+        th1 = np.where(close, base, th1)
+        th2 = np.where(close, np.pi, th2)
+        
+        alpha = np.arccos(np.where(out, 1.0, c))
+        th1 = np.where(out, th1, base + np.arctan2(l2*np.sin(alpha),l1-l2*np.cos(alpha)))
+        th2 = np.where(out, th2, alpha - np.pi)
+        return th1, th2
         
     @property
     def th1(self):
@@ -68,4 +100,113 @@ class SecondOrderDynamics:
         return self._yd
     @yd.setter
     def yd(self, v):
-        self._yd = v
\ No newline at end of file
+        self._yd = v
+
+class SecondOrderBank:
+    """
+    Many SecondOrderDynamics advanced in one vectorized call.
+    f, z, r are scalars (shared) or arrays with one entry per system; the
+    state has shape (n, ...) with the system index first.
+    mode "euler" reproduces SecondOrderDynamics.update, including its
+    ceil(dt / dt_crit) semi-implicit Euler sub-steps per system.
+    mode "exact" treats the input as constant over the step and applies the
+    closed-form solution of the 2x2 linear system (its matrix exponential),
+    which is stable for any dt and needs no sub-steps.
+    """
+    def __init__(self, f, z, r, x0, mode:str = "exact"):
+        x0 = np.array(x0, dtype=np.float64)
+        n = x0.shape[0]
+        f, z, r = (np.broadcast_to(np.asarray(a, dtype=np.float64), (n,)) for a in (f, z, r))
+        self._k1 = z/(np.pi*f)
+        self._k2 = 1/((2*np.pi*f)**2)
+        self._k3 = r*z/(2*np.pi*f)
+        self._dt_crit = 0.8 * (np.sqrt(4*self._k2+self._k1**2)-self._k1)
+        self._xp = x0.copy() # previous input
+        self._y = x0.copy() # output position
+        self._yd = None # output velocity
+        self.mode = mode
+        self._phi_dt = None
+        self._phi = None
+        
+    def _per_system(self, a):
+        # (n,) -> (n, 1, ...) so it broadcasts against the state
+        return a.reshape(a.shape + (1,) * (self._y.ndim - 1))
+        
+    def update(self, dt:float, x):
+        x = np.array(x, dtype=np.float64)
+        xd = (x - self._xp) / dt
+        if self._yd is None: self._yd = xd
+        self._xp = x
+        if self.mode == "euler":
+            self._update_euler(dt, x, xd)
+        else:
+            self._update_exact(dt, x, xd)
+            
+    def _update_euler(self, dt, x, xd):
+        it = np.ceil(dt / self._dt_crit).astype(int)
+        h = self._per_system(dt / it)
+        k1 = self._per_system(self._k1)
+        k2 = self._per_system(self._k2)
+        k3 = self._per_system(self._k3)
+        active_it = self._per_system(it)
+        for i in range(it.max()):
+            active = i < active_it
+            y = self._y + self._yd * h
+            yd = self._yd + (x + xd*k3 - y - self._yd*k1) * h/k2
+            self._y = np.where(active, y, self._y)
+            self._yd = np.where(active, yd, self._yd)
+            
+    def _transition(self, dt):
+        '''
+        exp(A dt) for A = [[0, 1], [-1/k2, -k1/k2]], per system.
+        exp(A t) = e^(s t) [(cosh(q t) - s sinh(q t)/q) I + sinh(q t)/q A]
+        with s = -k1/(2 k2) and q^2 = s^2 - 1/k2.
+        '''
+        if self._phi_dt == dt:
+            return self._phi
+        k1, k2 = self._k1, self._k2
+        s = -k1/(2*k2)
+        q2 = s*s - 1/k2
+        q = np.sqrt(np.abs(q2))
+        qt = q*dt
+        small = qt < 1e-6
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            # overdamped: e^(st)cosh(qt) = (e^((s+q)t) + e^((s-q)t))/2, s+q <= 0 so nothing overflows
+            e1 = np.exp((s+q)*dt)
+            e2 = np.exp((s-q)*dt)
+            c_over = (e1+e2)/2
+            s_over = (e1-e2)/(2*q)
+            # underdamped: cosh(iwt) = cos(wt), sinh(iwt)/(iw) = sin(wt)/w
+            decay = np.exp(s*dt)
+            c_under = decay*np.cos(qt)
+            s_under = decay*np.sin(qt)/q
+        over = q2 > 0
+        c = np.where(over, c_over, c_under)
+        sh = np.where(over, s_over, s_under)
+        # critically damped (or nearly): sinh(qt)/q -> t
+        c = np.where(small, np.exp(s*dt), c)
+        sh = np.where(small, np.exp(s*dt)*dt, sh)
+        
+        diag = c - s*sh
+        self._phi = (diag, sh, -sh/k2, diag - sh*k1/k2)
+        self._phi_dt = dt
+        return self._phi
+        
+    def _update_exact(self, dt, x, xd):
+        p11, p12, p21, p22 = (self._per_system(p) for p in self._transition(dt))
+        # equilibrium for the held input is y = x + k3 xd, yd = 0
+        u = x + xd*self._per_system(self._k3)
+        e = self._y - u
+        self._y = u + p11*e + p12*self._yd
+        self._yd = p21*e + p22*self._yd
+        
+    @property
+    def y(self):
+        return self._y
+        
+    @property
+    def yd(self):
+        return self._yd
+    @yd.setter
+    def yd(self, v):
+        self._yd = v